@@ -13,40 +13,132 @@ Visit <https://github.com/jwodder/outgoing> or <https://outgoing.rtfd.io> for
 more information.
 """
 
+from __future__ import annotations
+
 __version__ = "0.6.3"
 __author__ = "John Thorvald Wodder II"
 __author_email__ = "outgoing@varonathe.org"
 __license__ = "MIT"
 __url__ = "https://github.com/jwodder/outgoing"
 
-from .config import (
-    DirectoryPath,
-    FilePath,
-    NetrcConfig,
-    Password,
-    Path,
-    StandardPassword,
-)
-from .core import (
-    DEFAULT_CONFIG_SECTION,
-    Sender,
-    from_config_file,
-    from_dict,
-    get_default_configpath,
-    lookup_netrc,
-    resolve_password,
-)
-from .errors import (
-    Error,
-    InvalidConfigError,
-    InvalidPasswordError,
-    MissingConfigError,
-    NetrcLookupError,
-    UnsupportedEmailError,
-)
-from .util import OpenClosable, resolve_path
+# Not imported from `typing`, as even that would slow down ``import outgoing``
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from typing import Any
+    from .config import (
+        DirectoryPath,
+        FilePath,
+        NetrcConfig,
+        Password,
+        Path,
+        StandardPassword,
+    )
+    from .core import (
+        DEFAULT_CONFIG_SECTION,
+        AsyncSender,
+        Sender,
+        from_config_file,
+        from_config_file_async,
+        from_dict,
+        from_dict_async,
+        get_default_configpath,
+        get_sender,
+        invalidate_config_cache,
+        invalidate_sender_cache,
+        lookup_netrc,
+        purge_password_cache,
+        refresh_registry,
+        register_async_sender,
+        register_password_scheme,
+        register_sender,
+        resolve_password,
+        send_many,
+        set_config_cache_size,
+        set_password_cache,
+        warmup,
+        warmup_async,
+    )
+    from .errors import (
+        Error,
+        InvalidConfigError,
+        InvalidPasswordError,
+        MissingConfigError,
+        NetrcLookupError,
+        UnsupportedEmailError,
+    )
+    from .util import (
+        AsyncOpenClosable,
+        OpenClosable,
+        ThreadedAsyncSender,
+        resolve_path,
+    )
+
+# The public names are imported from their submodules on first access (PEP
+# 562) so that ``import outgoing`` does not have to pay for importing pydantic
+# et alii until they're actually needed.
+_LAZY_IMPORTS = {
+    "AsyncOpenClosable": "util",
+    "AsyncSender": "core",
+    "DEFAULT_CONFIG_SECTION": "core",
+    "DirectoryPath": "config",
+    "Error": "errors",
+    "FilePath": "config",
+    "InvalidConfigError": "errors",
+    "InvalidPasswordError": "errors",
+    "MissingConfigError": "errors",
+    "NetrcConfig": "config",
+    "NetrcLookupError": "errors",
+    "OpenClosable": "util",
+    "Password": "config",
+    "Path": "config",
+    "Sender": "core",
+    "StandardPassword": "config",
+    "ThreadedAsyncSender": "util",
+    "UnsupportedEmailError": "errors",
+    "from_config_file": "core",
+    "from_config_file_async": "core",
+    "from_dict": "core",
+    "from_dict_async": "core",
+    "get_default_configpath": "core",
+    "get_sender": "core",
+    "invalidate_config_cache": "core",
+    "invalidate_sender_cache": "core",
+    "lookup_netrc": "core",
+    "purge_password_cache": "core",
+    "refresh_registry": "core",
+    "register_async_sender": "core",
+    "register_password_scheme": "core",
+    "register_sender": "core",
+    "resolve_password": "core",
+    "resolve_path": "util",
+    "send_many": "core",
+    "set_config_cache_size": "core",
+    "set_password_cache": "core",
+    "warmup": "core",
+    "warmup_async": "core",
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        modname = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{modname}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
+
 
 __all__ = [
+    "AsyncOpenClosable",
+    "AsyncSender",
     "DEFAULT_CONFIG_SECTION",
     "DirectoryPath",
     "Error",
@@ -61,11 +153,27 @@ __all__ = [
     "Path",
     "Sender",
     "StandardPassword",
+    "ThreadedAsyncSender",
     "UnsupportedEmailError",
     "from_config_file",
+    "from_config_file_async",
     "from_dict",
+    "from_dict_async",
     "get_default_configpath",
+    "get_sender",
+    "invalidate_config_cache",
+    "invalidate_sender_cache",
     "lookup_netrc",
+    "purge_password_cache",
+    "refresh_registry",
+    "register_async_sender",
+    "register_password_scheme",
+    "register_sender",
     "resolve_password",
     "resolve_path",
+    "send_many",
+    "set_config_cache_size",
+    "set_password_cache",
+    "warmup",
+    "warmup_async",
 ]
@@ -6,7 +6,7 @@ from email.message import EmailMessage
 import logging
 from pathlib import Path
 import sys
-from dotenv import find_dotenv, load_dotenv
+from typing import TYPE_CHECKING, TypeGuard
 from . import (
     DEFAULT_CONFIG_SECTION,
     __version__,
@@ -15,6 +15,9 @@ from . import (
 )
 from .errors import Error
 
+if TYPE_CHECKING:
+    from .senders.mailboxes import MailboxSender
+
 LOG_LEVELS = ["NOTSET", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
 
 
@@ -25,6 +28,7 @@ class Command:
     log_level: int
     section: str | None
     messages: list[str]
+    warmup: bool = False
 
     @classmethod
     def from_args(cls, argv: list[str] | None = None) -> Command:
@@ -77,6 +81,14 @@ class Command:
             const=None,
             help="Read configuration from the root of the config file",
         )
+        parser.add_argument(
+            "--warmup",
+            action="store_true",
+            help=(
+                "Connect to the server, create mailboxes, etc. before reading"
+                " any e-mails"
+            ),
+        )
         parser.add_argument(
             "-V", "--version", action="version", version=f"%(prog)s {__version__}"
         )
@@ -96,9 +108,12 @@ class Command:
             log_level=args.log_level,
             section=args.section,
             messages=args.messages,
+            warmup=args.warmup,
         )
 
     def run(self) -> int:
+        from dotenv import find_dotenv, load_dotenv
+
         if self.env is None:
             self.env = find_dotenv(usecwd=True)
         load_dotenv(self.env)
@@ -109,7 +124,7 @@ class Command:
         )
         try:
             with from_config_file(
-                self.config, section=self.section, fallback=False
+                self.config, section=self.section, fallback=False, warm=self.warmup
             ) as sender:
                 for path in self.messages:
                     if path == "-":
@@ -117,6 +132,11 @@ class Command:
                     else:
                         fp = open(path, "rb")
                     with fp:
+                        if _is_mailbox_sender(sender):
+                            # Copy the e-mail into the mailbox as-is rather
+                            # than parsing & regenerating it
+                            sender.send_file(fp)
+                            continue
                         msg = message_from_binary_file(fp, policy=policy.default)
                     assert isinstance(msg, EmailMessage)
                     sender.send(msg)
@@ -146,5 +166,15 @@ def parse_log_level(level: str) -> int:
             raise ValueError(f"Invalid log level: {level!r}")
 
 
+def _is_mailbox_sender(sender: object) -> TypeGuard[MailboxSender]:
+    """
+    Test whether ``sender`` is one of the built-in mailbox senders without
+    importing the mailbox module just to find out: if it hasn't been imported,
+    ``sender`` can't be an instance of any of its classes.
+    """
+    mailboxes = sys.modules.get("outgoing.senders.mailboxes")
+    return mailboxes is not None and isinstance(sender, mailboxes.MailboxSender)
+
+
 if __name__ == "__main__":
     sys.exit(main())  # pragma: no cover
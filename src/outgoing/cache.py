@@ -0,0 +1,185 @@
+from __future__ import annotations
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Generic, NamedTuple, TypeVar
+from .util import AnyPath
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+class FileStamp(NamedTuple):
+    """
+    The attributes of a file's ``stat()`` result used to detect whether the
+    file has changed since it was last read
+    """
+
+    mtime_ns: int
+    size: int
+    inode: int
+
+    @classmethod
+    def for_file(cls, path: AnyPath) -> FileStamp:
+        st = os.stat(path)
+        return cls(mtime_ns=st.st_mtime_ns, size=st.st_size, inode=st.st_ino)
+
+
+class FileCache(Generic[T]):
+    """
+    A thread-safe LRU cache of values computed from the contents of files.
+    Each value is stored along with the `FileStamp` of its file at the time it
+    was computed; when the value for a file is requested, the file is
+    ``stat()``-ed, and the value is only recomputed if the stamp has changed.
+
+    :param loader: a function that takes a file path and returns the value to
+        cache for that file
+    :param maxsize: the maximum number of files to hold values for; if more
+        are added, the least recently used entries are discarded.  `None`
+        means no limit, and 0 disables caching.
+    """
+
+    def __init__(
+        self, loader: Callable[[Path], T], maxsize: int | None = None
+    ) -> None:
+        self._loader = loader
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[FileStamp, T]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def maxsize(self) -> int | None:
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: int | None) -> None:
+        if value is not None and value < 0:
+            raise ValueError("maxsize must be nonnegative")
+        with self._lock:
+            self._maxsize = value
+            self._evict()
+
+    def get(self, path: Path) -> T:
+        """
+        Return the value for the file at ``path``, loading it if it's not
+        cached or if the file has changed since it was cached.
+
+        :raises OSError: if the file cannot be ``stat()``-ed (e.g., if it does
+            not exist)
+        """
+        key = os.path.realpath(path)
+        try:
+            stamp = FileStamp.for_file(key)
+        except OSError:
+            self.invalidate(path)
+            raise
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                return entry[1]
+        value = self._loader(path)
+        if self._maxsize != 0:
+            with self._lock:
+                self._entries[key] = (stamp, value)
+                self._entries.move_to_end(key)
+                self._evict()
+        return value
+
+    def invalidate(self, path: AnyPath | None = None) -> None:
+        """
+        Discard the cached value for the file at ``path``, or discard all
+        cached values if ``path`` is `None`
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.realpath(os.fsdecode(path)), None)
+
+    def _evict(self) -> None:
+        # Must be called with the lock held
+        if self._maxsize is not None:
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+
+class _Secret:
+    """
+    A container for a secret value that does not reveal it in its ``repr()``
+    """
+
+    __slots__ = ("_value",)
+
+    def __init__(self, value: str) -> None:
+        self._value = value
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}('**********')"
+
+    def get_secret_value(self) -> str:
+        return self._value
+
+
+class SecretCache(Generic[K]):
+    """
+    A thread-safe in-memory cache of secret strings, each of which expires
+    ``ttl`` seconds after it was stored.  If more than ``maxsize`` secrets are
+    stored, the least recently used ones are discarded.  Secrets are never
+    included in the ``repr()`` of the cache or its entries.
+    """
+
+    def __init__(self, ttl: float, maxsize: int | None = 128) -> None:
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.ttl: float = ttl
+        self.maxsize: int | None = maxsize
+        self._entries: OrderedDict[K, tuple[float, _Secret]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(ttl={self.ttl!r}, maxsize={self.maxsize!r},"
+            f" entries={len(self._entries)})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> str | None:
+        """
+        Return the unexpired secret stored under ``key``, or `None` if there is
+        none
+        """
+        with self._lock:
+            try:
+                expires, secret = self._entries[key]
+            except KeyError:
+                return None
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return secret.get_secret_value()
+
+    def put(self, key: K, value: str) -> None:
+        """Store ``value`` under ``key``"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, _Secret(value))
+            self._entries.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+    def purge(self) -> None:
+        """Discard all stored secrets"""
+        with self._lock:
+            self._entries.clear()
@@ -1,18 +1,21 @@
 from __future__ import annotations
-from collections.abc import Mapping
+from collections.abc import Iterable, Mapping
 from email.message import EmailMessage
-from importlib.metadata import entry_points
+from functools import lru_cache
+import hashlib
+from importlib.metadata import EntryPoint, entry_points
 import inspect
 import json
 from netrc import netrc
 import os
 from pathlib import Path
 import sys
+import threading
 from types import TracebackType
 from typing import TYPE_CHECKING, Any, Protocol, cast, runtime_checkable
-from platformdirs import user_config_path
 from . import errors
-from .util import AnyPath
+from .cache import FileCache, SecretCache
+from .util import AnyPath, ThreadedAsyncSender
 
 if sys.version_info[:2] >= (3, 11):
     from tomllib import load as toml_load
@@ -26,9 +29,129 @@ DEFAULT_CONFIG_SECTION = "outgoing"
 
 SENDER_GROUP = "outgoing.senders"
 
+ASYNC_SENDER_GROUP = "outgoing.async_senders"
+
 PASSWORD_SCHEME_GROUP = "outgoing.password_schemes"
 
 
+class Registry:
+    """
+    A process-wide cache of the objects available under the names in an entry
+    point group.  The entry points are scanned on first use, and each object is
+    loaded the first time it is looked up; after that, lookups are simple
+    `dict` lookups.  Objects can also be registered programmatically, in which
+    case they take precedence over entry points of the same name.
+    """
+
+    def __init__(self, group: str) -> None:
+        #: The name of the entry point group
+        self.group: str = group
+        self._entry_points: dict[str, EntryPoint] | None = None
+        self._loaded: dict[str, Any] = {}
+        self._registered: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.group!r})"
+
+    def get(self, name: str) -> Any:
+        """
+        Return the object registered under ``name``
+
+        :raises KeyError: if there is no such object
+        """
+        if not isinstance(name, str):
+            # Configuration files can contain any value here, including
+            # unhashable ones.
+            raise KeyError(name)
+        try:
+            return self._registered[name]
+        except KeyError:
+            pass
+        try:
+            return self._loaded[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if self._entry_points is None:
+                eps: dict[str, EntryPoint] = {}
+                for ep in entry_points(group=self.group):
+                    eps.setdefault(ep.name, ep)
+                self._entry_points = eps
+            ep = self._entry_points[name]
+        obj = ep.load()
+        self._loaded[name] = obj
+        return obj
+
+    def register(self, name: str, obj: Any) -> None:
+        """Register ``obj`` under ``name``"""
+        self._registered[name] = obj
+
+    def refresh(self) -> None:
+        """
+        Discard the cached entry points and loaded objects so that they will
+        be rescanned on next use.  Programmatic registrations are retained.
+        """
+        with self._lock:
+            self._entry_points = None
+            self._loaded.clear()
+
+
+sender_registry = Registry(SENDER_GROUP)
+
+async_sender_registry = Registry(ASYNC_SENDER_GROUP)
+
+password_scheme_registry = Registry(PASSWORD_SCHEME_GROUP)
+
+
+def register_sender(method: str, sender_cls: Any) -> None:
+    """
+    Register ``sender_cls`` as the implementation of the sending method named
+    ``method``, as though it had been declared in the ``outgoing.senders``
+    entry point group
+
+    .. versionadded:: 0.7.0
+    """
+    sender_registry.register(method, sender_cls)
+
+
+def register_async_sender(method: str, sender_cls: Any) -> None:
+    """
+    Register ``sender_cls`` as the asynchronous implementation of the sending
+    method named ``method``, as though it had been declared in the
+    ``outgoing.async_senders`` entry point group
+
+    .. versionadded:: 0.7.0
+    """
+    async_sender_registry.register(method, sender_cls)
+
+
+def register_password_scheme(scheme: str, func: Any) -> None:
+    """
+    Register ``func`` as the implementation of the password scheme named
+    ``scheme``, as though it had been declared in the
+    ``outgoing.password_schemes`` entry point group
+
+    .. versionadded:: 0.7.0
+    """
+    password_scheme_registry.register(scheme, func)
+
+
+def refresh_registry() -> None:
+    """
+    Rescan the entry points for sending methods & password schemes.  The
+    entry points are normally only scanned once per process, so this must be
+    called in order to use any packages installed after the first sender was
+    constructed.
+
+    .. versionadded:: 0.7.0
+    """
+    for reg in (sender_registry, async_sender_registry, password_scheme_registry):
+        reg.refresh()
+    # Don't keep the replaced scheme functions alive
+    _scheme_kwargs.cache_clear()
+
+
 @runtime_checkable
 class Sender(Protocol):
     """
@@ -40,6 +163,12 @@ class Sender(Protocol):
 
     - Within its own context, calling a sender's ``send(msg:
       email.message.EmailMessage)`` method sends the given e-mail.
+
+    Senders may optionally also define a ``send_many(msgs:
+    Iterable[email.message.EmailMessage]) -> list[Any]`` method for sending
+    multiple e-mails at once; see `send_many()`.  They may also define a
+    ``warmup()`` method for performing expensive setup ahead of time; see
+    `warmup()`.
     """
 
     def __enter__(self) -> Self: ...
@@ -56,11 +185,127 @@ class Sender(Protocol):
         ...
 
 
+@runtime_checkable
+class AsyncSender(Protocol):
+    """
+    `AsyncSender` is a `~typing.Protocol` implemented by asynchronous sender
+    objects.  The protocol requires the following behavior:
+
+    - Sender objects can be used as asynchronous context managers, and their
+      ``__aenter__`` methods return ``self``.
+
+    - Within its own context, awaiting a sender's ``send(msg:
+      email.message.EmailMessage)`` coroutine method sends the given e-mail.
+
+    Senders may optionally also define a ``warmup()`` coroutine method; see
+    `warmup_async()`.
+    """
+
+    async def __aenter__(self) -> Self: ...
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> bool | None: ...
+
+    async def send(self, msg: EmailMessage) -> Any:
+        """Send ``msg`` or raise an exception if that's not possible"""
+        ...
+
+
+def send_many(sender: Sender, msgs: Iterable[EmailMessage]) -> list[Any]:
+    """
+    Send each e-mail in ``msgs`` using ``sender`` and return a list containing,
+    for each e-mail in order, either the return value of sending it or the
+    `Exception` raised while trying to send it.  A failure to send one e-mail
+    does not stop the remaining e-mails from being sent.
+
+    If ``sender`` has a ``send_many()`` method, it is used to send the e-mails.
+    Otherwise, ``sender`` is entered as a context manager once for the whole
+    batch, and its ``send()`` method is called on each e-mail.  For
+    ``outgoing``'s built-in SMTP and mailbox senders, this means that the
+    whole batch is sent over a single SMTP session or while holding a single
+    lock on the mailbox, respectively.  The ``smtp-pool`` sender instead sends
+    each e-mail over a connection checked out of its pool and leaves the pool
+    open afterwards.
+
+    .. versionadded:: 0.7.0
+    """
+    try:
+        method = sender.send_many  # type: ignore[attr-defined]
+    except AttributeError:
+        return _send_each(sender, msgs)
+    else:
+        return cast("list[Any]", method(msgs))
+
+
+def _send_each(sender: Sender, msgs: Iterable[EmailMessage]) -> list[Any]:
+    results: list[Any] = []
+    with sender:
+        for msg in msgs:
+            try:
+                results.append(sender.send(msg))
+            except Exception as e:
+                results.append(e)
+    return results
+
+
+def warmup(sender: Sender) -> None:
+    """
+    Perform any expensive setup that ``sender`` would otherwise do when first
+    used — such as connecting & logging in to an SMTP server or creating
+    mailbox folders — so that the cost is paid now rather than when sending
+    the first e-mail.  If ``sender`` has no ``warmup()`` method, this does
+    nothing.
+
+    For ``outgoing``'s built-in senders:
+
+    - The ``smtp`` sender connects & logs in to the server, and the connection
+      is then used the next time the sender is opened (i.e., the next time its
+      context is entered or it sends an e-mail outside of a context).
+
+    - The ``smtp-pool`` sender fills its pool with ``pool_size`` connections.
+
+    - The mailbox senders create their mailboxes & folders if they do not
+      already exist.
+
+    Note that a warmed-up SMTP connection can be dropped by the server if it
+    goes unused for too long; set the ``keepalive`` option to have such
+    connections checked & replaced when they're used.
+
+    .. versionadded:: 0.7.0
+    """
+    try:
+        method = sender.warmup  # type: ignore[attr-defined]
+    except AttributeError:
+        return
+    method()
+
+
+async def warmup_async(sender: AsyncSender) -> None:
+    """
+    Like `warmup()`, but for an `AsyncSender`.  If ``sender`` has a
+    ``warmup()`` coroutine method, it is awaited; otherwise, this does
+    nothing.
+
+    .. versionadded:: 0.7.0
+    """
+    try:
+        method = sender.warmup  # type: ignore[attr-defined]
+    except AttributeError:
+        return
+    await method()
+
+
 def get_default_configpath() -> Path:
     """
     Returns the location of the default config file (regardless of whether it
     exists) as a `pathlib.Path` object
     """
+    from platformdirs import user_config_path
+
     return user_config_path("outgoing", "jwodder") / "outgoing.toml"
 
 
@@ -68,6 +313,7 @@ def from_config_file(
     path: AnyPath | None = None,
     section: str | None = DEFAULT_CONFIG_SECTION,
     fallback: bool = True,
+    warm: bool = False,
 ) -> Sender:
     """
     Read configuration from the table/field ``section`` (default
@@ -80,26 +326,59 @@ def from_config_file(
     exist or does not contain the given section, fall back to reading from the
     default section of the default config file.
 
+    If ``warm`` is true, `warmup()` is called on the sender before it is
+    returned.
+
+    .. versionchanged:: 0.7.0
+
+        ``warm`` argument added
+
+    :raises InvalidConfigError: if the configuration is invalid
+    :raises MissingConfigError: if no configuration file or section is present
+    """
+    data, configpath = _read_config_section(path, section, fallback)
+    sender = from_dict(data, configpath=configpath)
+    if warm:
+        warmup(sender)
+    return sender
+
+
+def from_config_file_async(
+    path: AnyPath | None = None,
+    section: str | None = DEFAULT_CONFIG_SECTION,
+    fallback: bool = True,
+) -> AsyncSender:
+    """
+    Like `from_config_file()`, but construct an `AsyncSender` instead.  See
+    `from_dict_async()` for details.
+
     :raises InvalidConfigError: if the configuration is invalid
     :raises MissingConfigError: if no configuration file or section is present
     """
+    data, configpath = _read_config_section(path, section, fallback)
+    return from_dict_async(data, configpath=configpath)
+
+
+def _read_config_section(
+    path: AnyPath | None, section: str | None, fallback: bool
+) -> tuple[Mapping[str, Any], Path]:
+    """
+    Read the given section of the given config file as described by
+    `from_config_file()` and return it along with the path of the file it was
+    read from
+    """
     if path is None:
         configpath = get_default_configpath()
     else:
         configpath = Path(os.fsdecode(path))
+    if configpath.suffix not in (".toml", ".json"):
+        raise errors.InvalidConfigError(
+            "Unsupported file extension",
+            configpath=configpath,
+        )
     data: Any
     try:
-        if configpath.suffix == ".toml":
-            with configpath.open("rb") as fb:
-                data = toml_load(fb)
-        elif configpath.suffix == ".json":
-            with configpath.open("r", encoding="utf-8") as fp:
-                data = json.load(fp)
-        else:
-            raise errors.InvalidConfigError(
-                "Unsupported file extension",
-                configpath=configpath,
-            )
+        data = config_cache.get(configpath)
     except FileNotFoundError:
         data = None
     if data is not None and section is not None:
@@ -112,7 +391,7 @@ def from_config_file(
     if data is None:
         if fallback and configpath != get_default_configpath():
             try:
-                return from_config_file(fallback=False)
+                return _read_config_section(None, DEFAULT_CONFIG_SECTION, False)
             except errors.MissingConfigError as e:
                 e.configpaths.append(configpath)
                 raise e
@@ -123,7 +402,148 @@ def from_config_file(
             "Section must be a dict/object",
             configpath=configpath,
         )
-    return from_dict(data, configpath=configpath)
+    return (data, configpath)
+
+
+def _load_config_file(configpath: Path) -> Any:
+    """Parse the TOML or JSON file at ``configpath``"""
+    if configpath.suffix == ".toml":
+        with configpath.open("rb") as fb:
+            return toml_load(fb)
+    else:
+        with configpath.open("r", encoding="utf-8") as fp:
+            return json.load(fp)
+
+
+#: A cache of parsed configuration files, shared by all sections of a file.
+#: Files are re-parsed when their modification time, size, or inode changes.
+config_cache: FileCache[Any] = FileCache(_load_config_file, maxsize=64)
+
+
+def invalidate_config_cache(path: AnyPath | None = None) -> None:
+    """
+    Discard the cached parsed contents of the configuration file at ``path``,
+    or of all configuration files if ``path`` is `None`.  This is only needed
+    if a file may have been modified without changing its modification time,
+    size, or inode.
+
+    .. versionadded:: 0.7.0
+    """
+    config_cache.invalidate(path)
+
+
+def set_config_cache_size(maxsize: int | None) -> None:
+    """
+    Set the maximum number of parsed configuration files that are kept in
+    memory for reuse by `from_config_file()`.  When the limit is exceeded, the
+    least recently used files are discarded.  `None` means no limit, and 0
+    disables caching.  The default is 64.
+
+    .. versionadded:: 0.7.0
+    """
+    config_cache.maxsize = maxsize
+
+
+class _MemoizedSender:
+    """An entry in the cache used by `get_sender()`"""
+
+    def __init__(
+        self, configpath: Path, data: Mapping[str, Any], digest: str, sender: Sender
+    ) -> None:
+        self.configpath = configpath
+        self.data = data
+        self.digest = digest
+        self.sender = sender
+
+
+_sender_cache: dict[tuple[str | None, str | None, bool], _MemoizedSender] = {}
+_sender_cache_lock = threading.Lock()
+
+
+def get_sender(
+    path: AnyPath | None = None,
+    section: str | None = DEFAULT_CONFIG_SECTION,
+    fallback: bool = True,
+) -> Sender:
+    """
+    Like `from_config_file()`, but memoized: the first call for a given
+    ``path``, ``section``, and ``fallback`` constructs a sender, and later
+    calls return the same sender instance for as long as the configuration it
+    was constructed from is unchanged.  If the file is modified, the section's
+    contents are compared by hash, and a new sender is only constructed if they
+    differ.
+
+    Because the sender is shared, callers should not modify it, and senders
+    that are not safe to use from multiple threads at once should not be used
+    from multiple threads at once.  Passwords and netrc entries are only
+    looked up when the sender is constructed; call `invalidate_sender_cache()`
+    to pick up changes to them.
+
+    .. versionadded:: 0.7.0
+
+    :raises InvalidConfigError: if the configuration is invalid
+    :raises MissingConfigError: if no configuration file or section is present
+    """
+    key = (None if path is None else os.fsdecode(path), section, fallback)
+    data, configpath = _read_config_section(path, section, fallback)
+    with _sender_cache_lock:
+        sender = _find_sender(key, configpath, data)
+    if sender is not None:
+        return sender
+    digest = _config_digest(data)
+    with _sender_cache_lock:
+        sender = _find_sender(key, configpath, data, digest)
+    if sender is not None:
+        return sender
+    # Constructing a sender can be slow (e.g., if it looks up a password), so
+    # it's done without holding the lock.  If another thread caches a sender
+    # for the same configuration in the meantime, that one is used instead.
+    new_sender = from_dict(data, configpath=configpath)
+    with _sender_cache_lock:
+        sender = _find_sender(key, configpath, data, digest)
+        if sender is None:
+            sender = new_sender
+            _sender_cache[key] = _MemoizedSender(configpath, data, digest, sender)
+    return sender
+
+
+def _find_sender(
+    key: tuple[str | None, str | None, bool],
+    configpath: Path,
+    data: Mapping[str, Any],
+    digest: str | None = None,
+) -> Sender | None:
+    """
+    Return the sender in the `get_sender()` cache for ``key`` if it was
+    constructed from the same configuration as ``data``, comparing by hash if
+    ``digest`` is given.  Must be called with ``_sender_cache_lock`` held.
+    """
+    entry = _sender_cache.get(key)
+    if entry is None or entry.configpath != configpath:
+        return None
+    if entry.data is data:
+        # The parsed document is still cached, so the file hasn't changed.
+        return entry.sender
+    if digest is not None and entry.digest == digest:
+        entry.data = data
+        return entry.sender
+    return None
+
+
+def invalidate_sender_cache() -> None:
+    """
+    Discard all senders memoized by `get_sender()`
+
+    .. versionadded:: 0.7.0
+    """
+    with _sender_cache_lock:
+        _sender_cache.clear()
+
+
+def _config_digest(data: Mapping[str, Any]) -> str:
+    """Compute a hash of a configuration section's contents"""
+    blob = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
 
 
 def from_dict(
@@ -141,6 +561,41 @@ def from_dict(
 
     :raises InvalidConfigError: if the configuration is invalid
     """
+    method, data = _get_method(data, configpath)
+    try:
+        sender_cls = sender_registry.get(method)
+    except KeyError:
+        raise errors.InvalidConfigError(
+            f"Unsupported method {method!r}",
+            configpath=configpath,
+        )
+    return cast(Sender, _instantiate(sender_cls, data, configpath))
+
+
+def from_dict_async(
+    data: Mapping[str, Any],
+    configpath: AnyPath | None = None,
+) -> AsyncSender:
+    """
+    Like `from_dict()`, but construct an `AsyncSender` instead.  If the
+    sending method has an asynchronous implementation registered in the
+    ``outgoing.async_senders`` entry point group, that implementation is used;
+    otherwise, a synchronous sender is constructed as by `from_dict()` and
+    wrapped in a `ThreadedAsyncSender`.
+
+    :raises InvalidConfigError: if the configuration is invalid
+    """
+    method, data = _get_method(data, configpath)
+    try:
+        sender_cls = async_sender_registry.get(method)
+    except KeyError:
+        return ThreadedAsyncSender(from_dict(data, configpath=configpath))
+    return cast(AsyncSender, _instantiate(sender_cls, data, configpath))
+
+
+def _get_method(
+    data: Mapping[str, Any], configpath: AnyPath | None
+) -> tuple[str, Mapping[str, Any]]:
     try:
         method = data["method"]
     except KeyError:
@@ -152,16 +607,14 @@ def from_dict(
         # TODO: Emit warning
         data = dict(data)
         data.pop("configpath", None)
+    return (method, data)
+
+
+def _instantiate(
+    sender_cls: Any, data: Mapping[str, Any], configpath: AnyPath | None
+) -> Any:
     try:
-        ep, *_ = entry_points(group=SENDER_GROUP, name=method)
-    except ValueError:
-        raise errors.InvalidConfigError(
-            f"Unsupported method {method!r}",
-            configpath=configpath,
-        )
-    sender_cls = ep.load()
-    try:
-        return cast(Sender, sender_cls(configpath=configpath, **data))
+        return sender_cls(configpath=configpath, **data)
     except (TypeError, ValueError) as e:
         raise errors.InvalidConfigError(str(e), configpath=configpath)
     except errors.InvalidConfigError as e:
@@ -188,6 +641,9 @@ def resolve_password(
     method) should be passed into this function so that they can be made
     available to any password scheme functions that need them.
 
+    If caching has been enabled with `set_password_cache()`, previously
+    resolved passwords are returned from the cache.
+
     :raises InvalidPasswordError:
         if ``password`` is invalid or cannot be resolved
     """
@@ -198,37 +654,111 @@ def resolve_password(
             "Password must be either a string or an object with exactly one field"
         )
     ((scheme, spec),) = password.items()
+    cache = _password_cache
+    if cache is not None:
+        key = _password_cache_key(scheme, spec, host, username, configpath)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
     try:
-        ep, *_ = entry_points(group=PASSWORD_SCHEME_GROUP, name=scheme)
-    except ValueError:
+        scheme_func = password_scheme_registry.get(scheme)
+    except KeyError:
         raise errors.InvalidPasswordError(
             f"Unsupported password scheme {scheme!r}",
             configpath=configpath,
         )
-    scheme_func = ep.load()
     available_kwargs = {
         "host": host,
         "username": username,
         "configpath": configpath,
     }
-    kwargs = {}
-    sig = inspect.signature(scheme_func)
-    for param in sig.parameters.values():
-        if (
-            param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY)
-            and param.name in available_kwargs
-        ):
-            kwargs[param.name] = available_kwargs[param.name]
-        elif param.kind is param.VAR_KEYWORD:
-            kwargs.update(available_kwargs)
+    kwargs = {
+        k: v for k, v in available_kwargs.items() if k in _scheme_kwargs(scheme_func)
+    }
     try:
-        return cast(str, scheme_func(spec=spec, **kwargs))
+        resolved = cast(str, scheme_func(spec=spec, **kwargs))
     except (TypeError, ValueError) as e:
         raise errors.InvalidPasswordError(str(e), configpath=configpath)
     except errors.InvalidPasswordError as e:
         if e.configpath is None:
             e.configpath = configpath
         raise e
+    if cache is not None:
+        cache.put(key, resolved)
+    return resolved
+
+
+_password_cache: SecretCache[tuple[str | None, ...]] | None = None
+
+
+def set_password_cache(ttl: float | None, maxsize: int | None = 128) -> None:
+    """
+    Configure caching of the passwords returned by `resolve_password()` for
+    password schemes.  Caching is disabled by default; when enabled, each
+    password is kept in memory for ``ttl`` seconds, keyed by the password
+    scheme & specifier and the ``host``, ``username``, and ``configpath``
+    values, so that subsequent lookups skip calling the scheme function (e.g.,
+    querying the system keyring).  At most ``maxsize`` passwords are cached
+    at once (`None` for no limit), with the least recently used discarded
+    first.  Passing `None` for ``ttl`` disables caching and discards all
+    cached passwords.
+
+    Cached passwords are never included in any ``repr()`` or log messages.
+
+    .. versionadded:: 0.7.0
+    """
+    global _password_cache
+    if ttl is None:
+        _password_cache = None
+    else:
+        _password_cache = SecretCache(ttl, maxsize)
+
+
+def purge_password_cache() -> None:
+    """
+    Discard all passwords cached by `resolve_password()`, leaving caching
+    enabled if it was enabled
+
+    .. versionadded:: 0.7.0
+    """
+    if _password_cache is not None:
+        _password_cache.purge()
+
+
+def _password_cache_key(
+    scheme: str,
+    spec: Any,
+    host: str | None,
+    username: str | None,
+    configpath: AnyPath | None,
+) -> tuple[str | None, ...]:
+    return (
+        scheme,
+        json.dumps(spec, sort_keys=True, default=str),
+        host,
+        username,
+        None if configpath is None else os.fsdecode(configpath),
+    )
+
+
+@lru_cache(maxsize=64)
+def _scheme_kwargs(scheme_func: Any) -> frozenset[str]:
+    """
+    Return the names of the optional arguments to `resolve_password()` that
+    the given password scheme function accepts
+    """
+    available = {"host", "username", "configpath"}
+    names: set[str] = set()
+    sig = inspect.signature(scheme_func)
+    for param in sig.parameters.values():
+        if (
+            param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY)
+            and param.name in available
+        ):
+            names.add(param.name)
+        elif param.kind is param.VAR_KEYWORD:
+            names.update(available)
+    return frozenset(names)
 
 
 def lookup_netrc(
@@ -244,11 +774,15 @@ def lookup_netrc(
         if no entry for ``host`` or the default entry is present in the netrc
         file; or if ``username`` differs from the username in the netrc file
     :raises netrc.NetrcParseError: if the `netrc` module encounters an error
+
+    .. versionchanged:: 0.7.0
+
+        Parsed netrc files are now cached and only re-read when they change
     """
     if path is None:
-        rc = netrc()
+        rc = default_netrc_cache.get(Path(os.path.expanduser("~"), ".netrc"))
     else:
-        rc = netrc(os.fsdecode(path))
+        rc = netrc_cache.get(Path(os.fsdecode(path)))
     auth = rc.authenticators(host)
     if auth is None:
         raise errors.NetrcLookupError(
@@ -264,3 +798,20 @@ def lookup_netrc(
         raise errors.NetrcLookupError("No password given in netrc entry")
     assert password is not None
     return (auth[0], password)
+
+
+def _load_netrc(path: Path) -> netrc:
+    return netrc(os.fspath(path))
+
+
+def _load_default_netrc(_path: Path) -> netrc:
+    # Let the netrc module find the file itself so that it performs its
+    # security checks on the file's ownership & permissions.
+    return netrc()
+
+
+#: Caches of parsed netrc files, re-read when their modification time, size,
+#: or inode changes.  Looking up a host in a parsed file is a `dict` lookup.
+netrc_cache: FileCache[netrc] = FileCache(_load_netrc, maxsize=16)
+
+default_netrc_cache: FileCache[netrc] = FileCache(_load_default_netrc, maxsize=1)
@@ -1,7 +1,10 @@
 from __future__ import annotations
 from collections.abc import Sequence
 import os
-from .util import AnyPath
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .util import AnyPath
 
 
 class Error(Exception):
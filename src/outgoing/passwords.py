@@ -3,17 +3,15 @@ from collections.abc import Mapping
 from contextlib import ExitStack
 import os
 import sys
-from typing import Any
-from dotenv import dotenv_values
-from keyring import get_keyring
-from keyring.backend import KeyringBackend
-from keyring.core import load_keyring
-from morecontext import additem
+from typing import TYPE_CHECKING, Any
 from pydantic import BaseModel, Field, ValidationError
 from .config import DirectoryPath, FilePath, Path
 from .errors import InvalidPasswordError
 from .util import AnyPath, resolve_path
 
+if TYPE_CHECKING:
+    from keyring.backend import KeyringBackend
+
 
 def env_scheme(spec: Any) -> str:
     if not isinstance(spec, str):
@@ -72,6 +70,8 @@ def dotenv_scheme(spec: Any, configpath: AnyPath | None = None) -> str:
             ds.file = resolve_path(".env", basepath=configpath)
         else:
             raise InvalidPasswordError("no 'file' or configpath given")
+    from dotenv import dotenv_values
+
     env = dotenv_values(ds.file)
     try:
         value = env[ds.key]
@@ -114,6 +114,10 @@ def keyring_scheme(
         raise InvalidPasswordError(
             f"Invalid 'keyring' password specifier: {e}", configpath=configpath
         )
+    from keyring import get_keyring
+    from keyring.core import load_keyring
+    from morecontext import additem
+
     with ExitStack() as stack:
         keyring: KeyringBackend
         if ks.backend is not None:
@@ -0,0 +1,157 @@
+from __future__ import annotations
+import asyncio
+from contextlib import suppress
+from email.message import EmailMessage
+import io
+import logging
+import subprocess
+from typing import IO, Any
+from pydantic import PrivateAttr
+from ..util import AsyncOpenClosable
+from .command import (
+    CHUNK_SIZE,
+    CommandConfig,
+    CommandError,
+    TailBuffer,
+    flatten_message,
+)
+
+log = logging.getLogger(__name__)
+
+
+class AsyncCommandSender(CommandConfig, AsyncOpenClosable):
+    """
+    An asynchronous counterpart to `CommandSender`.  Any number of calls to
+    ``send()`` may be in flight at once, but at most ``concurrency`` commands
+    are run at a time; the rest wait their turn.
+    """
+
+    _slots: asyncio.Semaphore | None = PrivateAttr(None)
+
+    async def open(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def send(self, msg: EmailMessage) -> subprocess.CompletedProcess[bytes]:
+        """
+        Run ``command`` with ``msg`` as its input and return the completed
+        process, including the captured tail of its stdout & stderr
+
+        :raises CommandError: if the command exits nonzero
+        :raises subprocess.TimeoutExpired: if ``timeout`` is set and the
+            command runs for longer than that many seconds, in which case it
+            is killed
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        async with self._slots:
+            log.info(
+                "Sending e-mail %r via command %r",
+                msg.get("Subject", "<NO SUBJECT>"),
+                self.command,
+            )
+            if isinstance(self.command, str):
+                proc = await asyncio.create_subprocess_shell(
+                    self.command,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                )
+            else:
+                proc = await asyncio.create_subprocess_exec(
+                    *self.command,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                )
+            stdout = TailBuffer(self.output_limit)
+            stderr = TailBuffer(self.output_limit)
+            assert proc.stdin is not None
+            assert proc.stdout is not None
+            assert proc.stderr is not None
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        _feed(proc.stdin, msg),
+                        _drain(proc.stdout, stdout),
+                        _drain(proc.stderr, stderr),
+                        proc.wait(),
+                    ),
+                    self.timeout,
+                )
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                assert self.timeout is not None
+                raise subprocess.TimeoutExpired(
+                    self.command,
+                    self.timeout,
+                    output=stdout.getvalue(),
+                    stderr=stderr.getvalue(),
+                )
+            except BaseException:
+                proc.kill()
+                await proc.wait()
+                raise
+        assert proc.returncode is not None
+        if proc.returncode != 0:
+            raise CommandError(
+                proc.returncode, self.command, stdout.getvalue(), stderr.getvalue()
+            )
+        return subprocess.CompletedProcess(
+            self.command, proc.returncode, stdout.getvalue(), stderr.getvalue()
+        )
+
+
+async def _feed(stdin: asyncio.StreamWriter, msg: EmailMessage) -> None:
+    # The e-mail is serialized by the synchronous `BytesGenerator` in a worker
+    # thread, which hands each chunk to the event loop and waits for it to be
+    # written to the pipe, so that only one chunk at a time is held in memory.
+    fp = io.BufferedWriter(
+        _StreamWriterIO(stdin, asyncio.get_running_loop()), CHUNK_SIZE
+    )
+    # If the command exits without reading all of its input, writing fails;
+    # its exit status will tell whether that's a problem.
+    with suppress(ConnectionError):
+        await asyncio.to_thread(_flatten_and_flush, fp, msg)
+    stdin.close()
+    with suppress(ConnectionError):
+        await stdin.wait_closed()
+
+
+def _flatten_and_flush(fp: IO[bytes], msg: EmailMessage) -> None:
+    flatten_message(fp, msg)
+    fp.flush()
+
+
+async def _drain(stream: asyncio.StreamReader, buf: TailBuffer) -> None:
+    while chunk := await stream.read(CHUNK_SIZE):
+        buf.write(chunk)
+
+
+class _StreamWriterIO(io.RawIOBase):
+    """
+    A synchronous raw binary file that writes to an `asyncio.StreamWriter`
+    belonging to an event loop running in another thread
+    """
+
+    def __init__(
+        self, writer: asyncio.StreamWriter, loop: asyncio.AbstractEventLoop
+    ) -> None:
+        super().__init__()
+        self._writer = writer
+        self._loop = loop
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        data = bytes(b)
+        asyncio.run_coroutine_threadsafe(self._write(data), self._loop).result()
+        return len(data)
+
+    async def _write(self, data: bytes) -> None:
+        self._writer.write(data)
+        await self._writer.drain()
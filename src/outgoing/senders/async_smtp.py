@@ -0,0 +1,482 @@
+from __future__ import annotations
+import asyncio
+from base64 import b64decode, b64encode
+from contextlib import suppress
+from email.message import EmailMessage
+import hmac
+import logging
+import re
+import smtplib
+import socket
+import ssl
+import time
+from pydantic import Field, PrivateAttr
+from ..util import AsyncOpenClosable
+from .smtp import STARTTLS, SMTPConfig, prepare_message
+
+log = logging.getLogger(__name__)
+
+CRLF = b"\r\n"
+
+#: Maximum length of a reply line accepted from the server, as in `smtplib`
+MAXLINE = 8192
+
+_local_hostname: str | None = None
+
+
+async def _get_local_hostname() -> str:
+    # socket.getfqdn() can block on DNS, so only call it once, and not in the
+    # event loop's thread.
+    global _local_hostname
+    if _local_hostname is None:
+        _local_hostname = await asyncio.to_thread(socket.getfqdn)
+    return _local_hostname
+
+
+class AsyncSMTPClient:
+    """
+    A minimal SMTP client built on `asyncio` streams, supporting STARTTLS,
+    ``AUTH`` (``CRAM-MD5``, ``PLAIN``, and ``LOGIN``), and SMTPUTF8.  Errors
+    are reported by raising the same exceptions as `smtplib`.
+    """
+
+    def __init__(
+        self, host: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.host = host
+        self.reader = reader
+        self.writer = writer
+        self.esmtp_features: dict[str, str] = {}
+        self.does_esmtp = False
+
+    @classmethod
+    async def connect(
+        cls, host: str, port: int, ssl_context: ssl.SSLContext | None = None
+    ) -> AsyncSMTPClient:
+        """
+        Connect to the SMTP server at ``host`` and ``port``, wrapping the
+        connection in TLS using ``ssl_context`` if it is not `None`
+        """
+        reader, writer = await asyncio.open_connection(
+            host,
+            port,
+            ssl=ssl_context,
+            server_hostname=host if ssl_context is not None else None,
+        )
+        client = cls(host, reader, writer)
+        try:
+            code, msg = await client.getreply()
+            if code != 220:
+                raise smtplib.SMTPConnectError(code, msg)
+            await client.ehlo()
+        except BaseException:
+            client.close()
+            raise
+        return client
+
+    def has_extn(self, name: str) -> bool:
+        return name.lower() in self.esmtp_features
+
+    async def getreply(self) -> tuple[int, bytes]:
+        lines: list[bytes] = []
+        while True:
+            try:
+                line = await self.reader.readline()
+            except (OSError, ValueError) as e:
+                self.close()
+                raise smtplib.SMTPServerDisconnected(
+                    f"Connection unexpectedly closed: {e}"
+                )
+            if not line:
+                self.close()
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+            if len(line) > MAXLINE:
+                self.close()
+                raise smtplib.SMTPResponseException(500, "Line too long.")
+            lines.append(line[4:].strip(b" \t\r\n"))
+            try:
+                code = int(line[:3])
+            except ValueError:
+                code = -1
+                break
+            if line[3:4] != b"-":
+                break
+        return (code, b"\n".join(lines))
+
+    async def putcmd(self, cmd: str, args: str = "") -> None:
+        line = f"{cmd} {args}".strip() + "\r\n"
+        encoding = "utf-8" if self.has_extn("smtputf8") else "ascii"
+        await self.write(line.encode(encoding))
+
+    async def write(self, data: bytes) -> None:
+        if self.writer.is_closing():
+            raise smtplib.SMTPServerDisconnected("please run connect() first")
+        try:
+            self.writer.write(data)
+            await self.writer.drain()
+        except OSError as e:
+            self.close()
+            raise smtplib.SMTPServerDisconnected(f"Server not connected: {e}")
+
+    async def docmd(self, cmd: str, args: str = "") -> tuple[int, bytes]:
+        await self.putcmd(cmd, args)
+        return await self.getreply()
+
+    async def ehlo(self) -> None:
+        hostname = await _get_local_hostname()
+        code, msg = await self.docmd("EHLO", hostname)
+        self.esmtp_features = {}
+        if code == 250:
+            self.does_esmtp = True
+            for line in msg.decode("latin-1").split("\n")[1:]:
+                m = re.match(r"(?P<feature>[A-Za-z0-9][A-Za-z0-9\-]*) ?", line)
+                if m:
+                    feature = m["feature"].lower()
+                    params = line[m.end("feature") :].strip()
+                    if feature == "auth":
+                        params = " ".join(
+                            filter(None, [self.esmtp_features.get("auth"), params])
+                        )
+                    self.esmtp_features[feature] = params
+        else:
+            self.does_esmtp = False
+            code, msg = await self.docmd("HELO", hostname)
+            if code != 250:
+                raise smtplib.SMTPHeloError(code, msg)
+
+    async def starttls(self, ctx: ssl.SSLContext) -> None:
+        if not self.has_extn("starttls"):
+            raise smtplib.SMTPNotSupportedError(
+                "STARTTLS extension not supported by server."
+            )
+        code, msg = await self.docmd("STARTTLS")
+        if code != 220:
+            raise smtplib.SMTPResponseException(code, msg)
+        if hasattr(self.writer, "start_tls"):  # Python 3.11+
+            await self.writer.start_tls(ctx, server_hostname=self.host)
+        else:  # pragma: no cover
+            transport = self.writer.transport
+            protocol = transport.get_protocol()
+            loop = asyncio.get_running_loop()
+            new_transport = await loop.start_tls(
+                transport, protocol, ctx, server_hostname=self.host
+            )
+            # This is what StreamWriter.start_tls() does in Python 3.11+:
+            self.writer._transport = new_transport  # type: ignore[attr-defined]
+            protocol._transport = new_transport  # type: ignore[attr-defined]
+            protocol._over_ssl = True  # type: ignore[attr-defined]
+        # RFC 3207 requires forgetting everything learned before STARTTLS
+        self.esmtp_features = {}
+        self.does_esmtp = False
+        await self.ehlo()
+
+    async def login(self, username: str, password: str) -> None:
+        if not self.has_extn("auth"):
+            raise smtplib.SMTPNotSupportedError(
+                "SMTP AUTH extension not supported by server."
+            )
+        # Try mechanisms in the same order of preference as smtplib
+        mechanisms = self.esmtp_features["auth"].upper().split()
+        if "CRAM-MD5" in mechanisms:
+            code, msg = await self.docmd("AUTH", "CRAM-MD5")
+            if code == 334:
+                digest = hmac.HMAC(
+                    password.encode("utf-8"), b64decode(msg), "md5"
+                ).hexdigest()
+                await self.write(b64encode(f"{username} {digest}".encode()) + CRLF)
+                code, msg = await self.getreply()
+        elif "PLAIN" in mechanisms:
+            token = b64encode(f"\0{username}\0{password}".encode("utf-8"))
+            code, msg = await self.docmd("AUTH", "PLAIN " + token.decode("ascii"))
+        elif "LOGIN" in mechanisms:
+            code, msg = await self.docmd(
+                "AUTH", "LOGIN " + b64encode(username.encode("utf-8")).decode("ascii")
+            )
+            if code == 334:
+                await self.write(b64encode(password.encode("utf-8")) + CRLF)
+                code, msg = await self.getreply()
+        else:
+            raise smtplib.SMTPException("No suitable authentication method found.")
+        if code not in (235, 503):
+            raise smtplib.SMTPAuthenticationError(code, msg)
+
+    async def rset(self) -> None:
+        try:
+            await self.docmd("RSET")
+        except smtplib.SMTPServerDisconnected:
+            pass
+
+    async def send_message(self, msg: EmailMessage) -> dict[str, tuple[int, bytes]]:
+        """
+        Send ``msg`` following the same rules as
+        `smtplib.SMTP.send_message()`, returning a `dict` of refused
+        recipients
+        """
+        env = prepare_message(msg)
+        if env.international and not self.has_extn("smtputf8"):
+            raise smtplib.SMTPNotSupportedError(
+                "One or more source or delivery addresses require"
+                " internationalized email support, but the server does not"
+                " advertise the required SMTPUTF8 capability"
+            )
+        opts = env.mail_options(self.esmtp_features) if self.does_esmtp else []
+        code, resp = await self.docmd(
+            "MAIL", " ".join([f"FROM:{smtplib.quoteaddr(env.from_addr)}", *opts])
+        )
+        if code != 250:
+            if code == 421:
+                self.close()
+            else:
+                await self.rset()
+            raise smtplib.SMTPSenderRefused(code, resp, env.from_addr)
+        refused: dict[str, tuple[int, bytes]] = {}
+        for addr in env.to_addrs:
+            code, resp = await self.docmd("RCPT", f"TO:{smtplib.quoteaddr(addr)}")
+            if code not in (250, 251):
+                refused[addr] = (code, resp)
+            if code == 421:
+                self.close()
+                raise smtplib.SMTPRecipientsRefused(refused)
+        if len(refused) == len(env.to_addrs):
+            await self.rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+        code, resp = await self.docmd("DATA")
+        if code != 354:
+            await self.rset()
+            raise smtplib.SMTPDataError(code, resp)
+        data = re.sub(rb"(?m)^\.", b"..", env.data)
+        if not data.endswith(CRLF):
+            data += CRLF
+        await self.write(data + b"." + CRLF)
+        code, resp = await self.getreply()
+        if code != 250:
+            if code == 421:
+                self.close()
+            else:
+                await self.rset()
+            raise smtplib.SMTPDataError(code, resp)
+        return refused
+
+    async def noop(self) -> tuple[int, bytes]:
+        return await self.docmd("NOOP")
+
+    async def quit(self) -> None:
+        try:
+            await self.docmd("QUIT")
+        finally:
+            self.close()
+            with suppress(OSError):
+                await self.writer.wait_closed()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncSMTPSender(SMTPConfig, AsyncOpenClosable):
+    """
+    An asynchronous SMTP sender.  Within its context, a single SMTP session is
+    used, and concurrent calls to ``send()`` wait their turn; outside of a
+    context, each call to ``send()`` uses its own session, so any number of
+    them can be in flight at once.
+    """
+
+    _client: AsyncSMTPClient | None = PrivateAttr(None)
+    _lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+    # A session opened by warmup() for the next open() or send() to use
+    _warm: AsyncSMTPClient | None = PrivateAttr(None)
+
+    async def open(self) -> None:
+        self._client = await self._take_connection()
+
+    async def warmup(self) -> None:
+        """
+        Connect & log in to the server ahead of time.  The session is used by
+        the next call to ``open()`` or, outside of a context, ``send()``.
+        Does nothing if the sender is already open or warmed up.
+        """
+        if self._client is None and self._warm is None:
+            self._warm = await self._connect()
+
+    async def _take_connection(self) -> AsyncSMTPClient:
+        if self._warm is not None:
+            client = self._warm
+            self._warm = None
+            return client
+        return await self._connect()
+
+    async def _connect(self) -> AsyncSMTPClient:
+        if self.ssl is True:
+            log.debug(
+                "Connecting to SMTP server at %s, port %d, using TLS",
+                self.host,
+                self.port,
+            )
+        else:
+            log.debug("Connecting to SMTP server at %s, port %d", self.host, self.port)
+        client = await AsyncSMTPClient.connect(
+            self.host,
+            self.port,
+            ssl_context=self.get_ssl_context() if self.ssl is True else None,
+        )
+        try:
+            if self.ssl == STARTTLS:
+                log.debug("Enabling STARTTLS")
+                await client.starttls(self.get_ssl_context())
+            if self.username is not None:
+                assert self.password is not None
+                log.debug("Logging in as %r", self.username)
+                await client.login(self.username, self.password.get_secret_value())
+        except BaseException:
+            client.close()
+            raise
+        self._save_session(client)
+        return client
+
+    def _save_session(self, client: AsyncSMTPClient) -> None:
+        if self.ssl and self._ssl_context is not None:
+            self._ssl_context.save_session(client.writer.get_extra_info("ssl_object"))
+
+    async def close(self) -> None:
+        if self._client is None:
+            raise ValueError("AsyncSMTPSender is not open")
+        log.debug("Closing connection to %s", self.host)
+        client = self._client
+        self._client = None
+        self._save_session(client)
+        await client.quit()
+
+    async def send(self, msg: EmailMessage) -> None:
+        if self._client is None:
+            client = await self._take_connection()
+            try:
+                await self._send(client, msg)
+            except BaseException:
+                client.close()
+                raise
+            log.debug("Closing connection to %s", self.host)
+            self._save_session(client)
+            await client.quit()
+        else:
+            async with self._lock:
+                await self._send(self._client, msg)
+
+    async def _send(self, client: AsyncSMTPClient, msg: EmailMessage) -> None:
+        log.info("Sending e-mail %r via SMTP", msg.get("Subject", "<NO SUBJECT>"))
+        await client.send_message(msg)
+
+
+class AsyncSMTPPoolSender(AsyncSMTPSender):
+    """
+    An asynchronous counterpart to `SMTPPoolSender`: a bounded pool of SMTP
+    sessions is kept open between calls to ``send()``, and concurrent sends
+    are made over separate sessions.
+    """
+
+    pool_size: int = Field(4, ge=1)
+    idle_timeout: float = Field(60, gt=0)
+    _idle: list[tuple[AsyncSMTPClient, float]] = PrivateAttr(default_factory=list)
+    _slots: asyncio.Semaphore | None = PrivateAttr(None)
+
+    async def open(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        idle = self._idle
+        self._idle = []
+        for client, _ in idle:
+            await self._disconnect(client)
+
+    async def warmup(self) -> None:
+        """
+        Open & log in enough sessions to bring the pool up to ``pool_size``
+        open sessions, counting both idle sessions and those currently in use
+        by ``send()``
+        """
+        # As in `SMTPPoolSender.warmup()`, reserve every free slot; acquiring
+        # a semaphore that isn't locked never suspends.
+        slots = self._get_slots()
+        reserved = 0
+        while not slots.locked():
+            await slots.acquire()
+            reserved += 1
+        try:
+            missing = reserved - len(self._idle)
+            for _ in range(reserved - max(missing, 0)):
+                slots.release()
+                reserved -= 1
+            while reserved:
+                client = await self._connect()
+                self._idle.append((client, time.monotonic()))
+                reserved -= 1
+                slots.release()
+        finally:
+            for _ in range(reserved):
+                slots.release()
+
+    async def send(self, msg: EmailMessage) -> None:
+        async with self._get_slots():
+            client = await self._checkout()
+            try:
+                await self._send(client, msg)
+            except smtplib.SMTPServerDisconnected:
+                client.close()
+                raise
+            except smtplib.SMTPException:
+                # The server refused the e-mail, but the session is still
+                # good.  (`SMTPException` is a subclass of `OSError`, so this
+                # has to come before the next clause.)
+                await self._reset(client)
+                raise
+            except OSError:
+                client.close()
+                raise
+            except BaseException:
+                self._idle.append((client, time.monotonic()))
+                raise
+            else:
+                self._idle.append((client, time.monotonic()))
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+        return self._slots
+
+    async def _checkout(self) -> AsyncSMTPClient:
+        while self._idle:
+            client, last_used = self._idle.pop()
+            if time.monotonic() - last_used > self.idle_timeout:
+                await self._disconnect(client)
+                continue
+            try:
+                code, _ = await client.noop()
+            except (smtplib.SMTPException, OSError):
+                code = -1
+            if code == 250:
+                return client
+            log.debug("Discarding dead connection to %s", self.host)
+            client.close()
+        return await self._connect()
+
+    async def _reset(self, client: AsyncSMTPClient) -> None:
+        """
+        Reset the transaction on a session after an SMTP error and return it
+        to the pool, or discard it if it was closed or cannot be reset
+        """
+        # The client closes the session if the server replied with 421.
+        if not client.writer.is_closing():
+            try:
+                code, _ = await client.docmd("RSET")
+            except (smtplib.SMTPException, OSError):
+                code = -1
+            if code == 250:
+                self._idle.append((client, time.monotonic()))
+                return
+        client.close()
+
+    async def _disconnect(self, client: AsyncSMTPClient) -> None:
+        log.debug("Closing connection to %s", self.host)
+        self._save_session(client)
+        try:
+            await client.quit()
+        except (smtplib.SMTPException, OSError):
+            client.close()
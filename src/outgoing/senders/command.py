@@ -1,34 +1,489 @@
+from __future__ import annotations
+from collections.abc import Callable, Iterable
+from email.generator import BytesGenerator
 from email.message import EmailMessage
 import logging
+import queue
+import shutil
 import subprocess
-from pydantic import Field
+import tempfile
+import threading
+import time
+from typing import IO, Any, Literal
+from pydantic import BaseModel, Field, PrivateAttr
+from .. import core
 from ..config import Path
+from ..errors import UnsupportedEmailError
 from ..util import OpenClosable
 
 log = logging.getLogger(__name__)
 
+#: The size of the chunks in which commands' output is read
+CHUNK_SIZE = 65536
+
+#: The size above which e-mails being framed for a persistent command are
+#: spooled to disk instead of being held in memory
+SPOOL_SIZE = 1 << 20
+
+
+class TailBuffer:
+    """
+    A ring buffer of bytes that only keeps the last ``maxsize`` bytes written
+    to it
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        #: The total number of bytes written, including those discarded
+        self.total = 0
+        self._buf = bytearray()
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        self._buf += data[-self.maxsize :]
+        if len(self._buf) > self.maxsize:
+            del self._buf[: len(self._buf) - self.maxsize]
+
+    def getvalue(self) -> bytes:
+        return bytes(self._buf)
+
+
+class CommandError(subprocess.CalledProcessError):
+    """
+    A `subprocess.CalledProcessError` raised when a command exits nonzero.
+    Its ``stdout`` and ``stderr`` attributes contain at most the last
+    ``output_limit`` bytes of the command's output, and the tail of its stderr
+    is included in the error message.
+    """
+
+    def __str__(self) -> str:
+        s = super().__str__()
+        if self.stderr:
+            tail = self.stderr.decode("utf-8", "replace").rstrip()
+            s += f"  Last output on stderr:\n{tail}"
+        return s
+
+
+def run_command(
+    command: str | list[str],
+    write_input: Callable[[IO[bytes]], None],
+    output_limit: int,
+    timeout: float | None = None,
+) -> subprocess.CompletedProcess[bytes]:
+    """
+    Run ``command`` (through the shell if it is a string), passing its stdin
+    pipe to ``write_input`` so that the input can be written to it piece by
+    piece rather than all at once.  Only the last ``output_limit`` bytes of
+    each of the command's stdout & stderr are kept.
+
+    :raises CommandError: if the command exits nonzero
+    :raises subprocess.TimeoutExpired: if ``timeout`` is not `None` and the
+        command runs for longer than that many seconds, in which case it is
+        killed
+    """
+    stdout = TailBuffer(output_limit)
+    stderr = TailBuffer(output_limit)
+    with subprocess.Popen(
+        command,
+        shell=isinstance(command, str),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    ) as proc:
+        assert proc.stdin is not None
+        assert proc.stdout is not None
+        assert proc.stderr is not None
+        readers = [
+            threading.Thread(target=_drain, args=(proc.stdout, stdout), daemon=True),
+            threading.Thread(target=_drain, args=(proc.stderr, stderr), daemon=True),
+        ]
+        for t in readers:
+            t.start()
+        timed_out = threading.Event()
+
+        def expire() -> None:
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, expire) if timeout is not None else None
+        if timer is not None:
+            timer.start()
+        try:
+            # If the command exits without reading all of its input, writing
+            # fails with BrokenPipeError; its exit status will tell whether
+            # that's a problem.
+            try:
+                write_input(proc.stdin)
+            except BrokenPipeError:
+                pass
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            for t in readers:
+                t.join()
+            proc.wait()
+        except BaseException:
+            proc.kill()
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+    if timed_out.is_set():
+        assert timeout is not None
+        raise subprocess.TimeoutExpired(
+            command, timeout, output=stdout.getvalue(), stderr=stderr.getvalue()
+        )
+    if proc.returncode != 0:
+        raise CommandError(
+            proc.returncode, command, stdout.getvalue(), stderr.getvalue()
+        )
+    return subprocess.CompletedProcess(
+        command, proc.returncode, stdout.getvalue(), stderr.getvalue()
+    )
+
+
+class CommandRejectedError(Exception):
+    """
+    Raised when a persistent command replies to an e-mail with something
+    other than an acknowledgement
+    """
+
+    def __init__(self, reply: str) -> None:
+        #: The command's reply, without the trailing newline
+        self.reply = reply
+        super().__init__(reply)
+
+    def __str__(self) -> str:
+        return f"Command rejected e-mail: {self.reply}"
+
+
+class PersistentCommand:
+    """
+    A long-lived command process that is sent a series of e-mails on its
+    stdin, each one framed as specified by ``framing``, and that acknowledges
+    each one with a line on its stdout.  A line starting with "``ok``"
+    (case-insensitive) means that the e-mail was accepted; any other line
+    means that it was rejected.
+    """
+
+    def __init__(
+        self,
+        command: str | list[str],
+        framing: Literal["length", "nul"],
+        output_limit: int,
+    ) -> None:
+        self.command = command
+        self.framing = framing
+        #: The tail of the command's stderr
+        self.stderr = TailBuffer(output_limit)
+        self.proc = subprocess.Popen(
+            command,
+            shell=isinstance(command, str),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        assert self.proc.stdout is not None
+        assert self.proc.stderr is not None
+        self._replies: queue.Queue[bytes] = queue.Queue()
+        self._threads = [
+            threading.Thread(
+                target=self._read_replies, args=(self.proc.stdout,), daemon=True
+            ),
+            threading.Thread(
+                target=_drain, args=(self.proc.stderr, self.stderr), daemon=True
+            ),
+        ]
+        for t in self._threads:
+            t.start()
+
+    def _read_replies(self, fp: IO[bytes]) -> None:
+        for line in fp:
+            self._replies.put(line)
+        # Signal EOF:
+        self._replies.put(b"")
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def send(self, msg: EmailMessage, timeout: float | None = None) -> str:
+        """
+        Send ``msg`` to the command, wait for its reply, and return the reply
+        (without the trailing newline) if it is an acknowledgement
+
+        :raises BrokenPipeError: if the command exited before the e-mail could
+            be written in full, in which case the command did not receive it
+        :raises CommandError: if the command exited without replying
+        :raises CommandRejectedError: if the command rejected the e-mail
+        :raises subprocess.TimeoutExpired: if ``timeout`` is not `None` and
+            the command did not reply within that many seconds, in which case
+            it is killed
+        :raises UnsupportedEmailError: if ``framing`` is ``"nul"`` and the
+            serialized e-mail contains a NUL byte
+        """
+        assert self.proc.stdin is not None
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+            flatten_message(spool, msg)  # type: ignore[arg-type]
+            size = spool.tell()
+            spool.seek(0)
+            if self.framing == "nul":
+                while chunk := spool.read(CHUNK_SIZE):
+                    if b"\0" in chunk:
+                        raise UnsupportedEmailError(
+                            "E-mail contains a NUL byte and so cannot be sent"
+                            " with NUL framing"
+                        )
+                spool.seek(0)
+            else:
+                self.proc.stdin.write(b"%d\n" % size)
+            shutil.copyfileobj(spool, self.proc.stdin, CHUNK_SIZE)
+        if self.framing == "nul":
+            self.proc.stdin.write(b"\0")
+        self.proc.stdin.flush()
+        try:
+            reply = self._replies.get(timeout=timeout)
+        except queue.Empty:
+            self.kill()
+            assert timeout is not None
+            raise subprocess.TimeoutExpired(
+                self.command, timeout, stderr=self.stderr.getvalue()
+            )
+        if not reply:
+            self.proc.wait()
+            raise CommandError(
+                self.proc.returncode, self.command, stderr=self.stderr.getvalue()
+            )
+        text = reply.decode("utf-8", "replace").rstrip("\r\n")
+        if text[:2].lower() == "ok":
+            return text
+        else:
+            raise CommandRejectedError(text)
+
+    def close(self, timeout: float | None = None) -> None:
+        """
+        Close the command's stdin and wait for it to exit, killing it if it
+        does not exit within ``timeout`` seconds
+        """
+        assert self.proc.stdin is not None
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        try:
+            self.proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            log.warning("Command %r did not exit; killing", self.command)
+            self.kill()
+        self._cleanup()
+
+    def kill(self) -> None:
+        self.proc.kill()
+        self.proc.wait()
+        self._cleanup()
+
+    def _cleanup(self) -> None:
+        for t in self._threads:
+            t.join()
+        assert self.proc.stdout is not None
+        assert self.proc.stderr is not None
+        self.proc.stdout.close()
+        self.proc.stderr.close()
+        if self.proc.stdin is not None:
+            try:
+                self.proc.stdin.close()
+            except BrokenPipeError:
+                pass
+
+
+def _drain(fp: IO[bytes], buf: TailBuffer) -> None:
+    while chunk := fp.read1(CHUNK_SIZE):  # type: ignore[attr-defined]
+        buf.write(chunk)
+
+
+def flatten_message(fp: IO[bytes], msg: EmailMessage) -> None:
+    """
+    Write ``bytes(msg)`` to ``fp`` without first building the whole
+    serialization in memory
+    """
+    BytesGenerator(fp, mangle_from_=False, policy=msg.policy).flatten(msg)
+
+
+class CommandConfig(BaseModel):
+    """
+    Configuration fields shared by the synchronous & async command senders
+    """
 
-class CommandSender(OpenClosable):
     configpath: Path | None = None
     command: str | list[str] = Field(default_factory=lambda: ["sendmail", "-i", "-t"])
+    concurrency: int = Field(1, ge=1)
+    timeout: float | None = Field(None, gt=0)
+    output_limit: int = Field(65536, gt=0)
+
+
+class CommandSender(CommandConfig, OpenClosable):
+    batch_command: str | list[str] | None = None
+    persistent: bool = False
+    framing: Literal["length", "nul"] = "length"
+    _process: PersistentCommand | None = PrivateAttr(None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
 
     def open(self) -> None:
-        pass
+        if self.persistent:
+            with self._lock:
+                self._process = self._start()
 
     def close(self) -> None:
-        pass
+        with self._lock:
+            if self._process is not None:
+                log.debug("Closing command %r", self.command)
+                self._process.close(self.timeout)
+                self._process = None
+
+    def _start(self) -> PersistentCommand:
+        log.debug("Starting persistent command %r", self.command)
+        return PersistentCommand(self.command, self.framing, self.output_limit)
 
-    def send(self, msg: EmailMessage) -> None:
+    def send(self, msg: EmailMessage) -> Any:
+        """
+        Run ``command`` with ``msg`` as its input and return the completed
+        process, including the captured tail of its stdout & stderr.
+
+        If ``persistent`` is true, ``msg`` is instead sent to the command
+        process that is kept running for the duration of the sender's context,
+        and the command's acknowledgement line is returned.
+
+        :raises CommandError: if the command exits nonzero
+        :raises CommandRejectedError: if ``persistent`` is true and the
+            command rejected the e-mail
+        :raises subprocess.TimeoutExpired: if ``timeout`` is set and the
+            command runs (or, if ``persistent`` is true, takes to reply) for
+            longer than that many seconds, in which case it is killed
+        """
         log.info(
             "Sending e-mail %r via command %r",
             msg.get("Subject", "<NO SUBJECT>"),
             self.command,
         )
-        subprocess.run(
+        if self.persistent:
+            with self:
+                return self._send_persistent(msg)
+        return run_command(
             self.command,
-            shell=isinstance(self.command, str),
-            input=bytes(msg),
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            lambda fp: flatten_message(fp, msg),
+            output_limit=self.output_limit,
+            timeout=self.timeout,
+        )
+
+    def send_many(self, msgs: Iterable[EmailMessage]) -> list[Any]:
+        """
+        Send multiple e-mails.  If ``batch_command`` is set, all of the
+        e-mails are passed to a single invocation of it as an mbox; otherwise,
+        ``command`` is run once per e-mail, with up to ``concurrency``
+        processes running at once.  In the latter case, the result for each
+        e-mail is either the `subprocess.CompletedProcess` returned by
+        ``send()`` or the exception it raised.
+        """
+        if self.batch_command is None:
+            if self.concurrency == 1 or self.persistent:
+                return core._send_each(self, msgs)
+            else:
+                return self._send_concurrently(msgs)
+        msglist = list(msgs)
+        if not msglist:
+            return []
+        log.info(
+            "Sending %d e-mail(s) via batch command %r",
+            len(msglist),
+            self.batch_command,
         )
+
+        def write_mbox(fp: IO[bytes]) -> None:
+            for msg in msglist:
+                write_mbox_message(fp, msg)
+
+        try:
+            run_command(
+                self.batch_command,
+                write_mbox,
+                output_limit=self.output_limit,
+                timeout=self.timeout,
+            )
+        except Exception as e:
+            return [e] * len(msglist)
+        else:
+            return [None] * len(msglist)
+
+    def _send_persistent(self, msg: EmailMessage) -> str:
+        with self._lock:
+            retried = False
+            while True:
+                if self._process is None or not self._process.alive():
+                    if self._process is not None:
+                        log.info(
+                            "Command %r exited with status %d; restarting",
+                            self.command,
+                            self._process.proc.returncode,
+                        )
+                        self._process.kill()
+                    self._process = self._start()
+                try:
+                    return self._process.send(msg, self.timeout)
+                except BrokenPipeError:
+                    # The command exited before receiving the whole e-mail,
+                    # so it's safe to send it again to a new process.
+                    if retried:
+                        raise
+                    retried = True
+                    self._process.kill()
+                    self._process = None
+                except subprocess.TimeoutExpired:
+                    self._process = None
+                    raise
+
+    def _send_concurrently(self, msgs: Iterable[EmailMessage]) -> list[Any]:
+        # The threads spend nearly all of their time waiting on their
+        # subprocesses, so the GIL is not a bottleneck here.
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [pool.submit(self.send, msg) for msg in msgs]
+        results: list[Any] = []
+        for fut in futures:
+            try:
+                results.append(fut.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+def write_mbox_message(fp: IO[bytes], msg: EmailMessage) -> None:
+    """
+    Write ``msg`` to ``fp`` as an entry in an mbox file.  ``fp`` need not be
+    seekable.
+    """
+    from_line = msg.get_unixfrom()
+    if from_line is None:
+        from_line = "From MAILER-DAEMON " + time.asctime(time.gmtime())
+    fp.write(from_line.encode("ascii") + b"\n")
+    tracker = _LastByteTracker(fp)
+    BytesGenerator(tracker, mangle_from_=True).flatten(msg)
+    if tracker.last not in (b"", b"\n"):
+        fp.write(b"\n")
+    fp.write(b"\n")
+
+
+class _LastByteTracker:
+    """
+    A wrapper around a binary file that remembers the last byte written
+    through it
+    """
+
+    def __init__(self, fp: IO[bytes]) -> None:
+        self.fp = fp
+        self.last = b""
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self.last = data[-1:]
+        return self.fp.write(data)
@@ -1,17 +1,708 @@
 from __future__ import annotations
 from abc import abstractmethod
+from contextlib import suppress
 from email.message import EmailMessage
+import errno
+from functools import cache
+import io
+import itertools
 import logging
 import mailbox
-from pydantic import PrivateAttr
+import os
+import shutil
+import socket
+import stat
+import threading
+import time
+from typing import IO, TYPE_CHECKING, Any, Callable, ClassVar, Literal, TypeAlias
+from pydantic import Field, PrivateAttr, model_validator
 from ..config import Path
 from ..util import OpenClosable
 
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
 log = logging.getLogger(__name__)
 
+#: How carefully a `MaildirSender` or `MHSender` syncs e-mails to disk
+Durability: TypeAlias = Literal["none", "per-message", "group"]
+
+#: A compression method for mbox files
+Compression: TypeAlias = Literal["gzip", "bz2", "xz"]
+
+#: The file extensions for files compressed with each compression method
+COMPRESSED_EXTENSIONS: dict[Compression, str] = {
+    "gzip": ".gz",
+    "bz2": ".bz2",
+    "xz": ".xz",
+}
+
+#: The highest message number known to be in use in each MH folder that
+#: e-mails have been added to, keyed by the folder's real path
+_mh_last_keys: dict[str, int] = {}
+_mh_last_keys_lock = threading.Lock()
+
+#: How many consecutive message numbers claimed by other processes
+#: `_AppendOnlyMH` will skip over before rescanning the folder
+MH_RESCAN_AFTER = 100
+
+#: The size of the chunks in which e-mail files are copied when they can't be
+#: copied by the kernel
+CHUNK_SIZE = 65536
+
+#: The maximum number of bytes to copy in one `os.copy_file_range()` or
+#: `os.sendfile()` call
+_KERNEL_COPY_SIZE = 1 << 30
+
+#: Errors from `os.copy_file_range()` & `os.sendfile()` that mean that the
+#: function can't be used for the given files
+_KERNEL_COPY_UNSUPPORTED = {
+    getattr(errno, name)
+    for name in ["EBADF", "EINVAL", "ENOSYS", "ENOTSOCK", "ENOTSUP", "EOPNOTSUPP"]
+    + ["EXDEV"]
+    if hasattr(errno, name)
+}
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def _open_compressed(
+    file: str | IO[bytes], method: Compression, mode: Literal["rb", "wb"] = "wb"
+) -> io.BufferedIOBase:
+    """
+    Open a compressed file (or wrap a binary file object) for reading or
+    writing.  When writing to a file object, closing the returned object
+    finishes the compressed data without closing the file object.
+    """
+    # The compression modules are only imported when needed.
+    if method == "gzip":
+        import gzip
+
+        return gzip.open(file, mode)
+    elif method == "bz2":
+        import bz2
+
+        return bz2.open(file, mode)
+    else:
+        import lzma
+
+        return lzma.open(file, mode)
+
+
+def _count_from_lines(fp: IO[bytes] | io.BufferedIOBase) -> int:
+    """Count the From_ lines in the rest of the mbox data in ``fp``"""
+    count = 0
+    # The last few bytes of the previous chunk are kept so that From_ lines
+    # split across chunks are counted; the data is treated as though it were
+    # preceded by a newline so that a From_ line at the start is counted.
+    tail = b"\n"
+    while chunk := fp.read(CHUNK_SIZE):
+        buf = tail + chunk
+        count += buf.count(b"\nFrom ")
+        tail = buf[-5:]
+    return count
+
+
+def _kernel_copy(src_fd: int, offset: int, dst_fd: int) -> int:
+    """
+    Copy data from ``src_fd``, starting at ``offset``, to the current position
+    of ``dst_fd`` within the kernel, returning the number of bytes copied, or
+    0 if kernel copying isn't supported for the given files
+    """
+    copiers: list[Callable[[int], int]] = []
+    if hasattr(os, "copy_file_range"):
+        copiers.append(
+            lambda off: os.copy_file_range(src_fd, dst_fd, _KERNEL_COPY_SIZE, off)
+        )
+    if hasattr(os, "sendfile"):
+        copiers.append(lambda off: os.sendfile(dst_fd, src_fd, off, _KERNEL_COPY_SIZE))
+    for copier in copiers:
+        copied = 0
+        try:
+            while n := copier(offset + copied):
+                copied += n
+        except OSError as e:
+            if copied or e.errno not in _KERNEL_COPY_UNSUPPORTED:
+                raise
+            continue
+        return copied
+    return 0
+
+
+def _copy_to_fd(src: IO[bytes], dst_fd: int) -> None:
+    """
+    Copy the rest of ``src``, from its current position, to the current
+    position of the file descriptor ``dst_fd``.  If ``src`` is a regular file,
+    the data is copied by the kernel with `os.copy_file_range()` or
+    `os.sendfile()` where possible; otherwise, it is read & written in chunks.
+    """
+    try:
+        src_fd = src.fileno()
+        offset = src.tell()
+        regular = stat.S_ISREG(os.fstat(src_fd).st_mode)
+    except (AttributeError, OSError, ValueError):
+        regular = False
+    if regular:
+        copied = _kernel_copy(src_fd, offset, dst_fd)
+        if copied:
+            src.seek(offset + copied)
+    while chunk := src.read(CHUNK_SIZE):
+        _write_all(dst_fd, chunk)
+
+
+def _copy_message_to_fd(src: IO[bytes], dst_fd: int) -> None:
+    """
+    Like `_copy_to_fd()`, but skip a leading mbox From_ line, which is not
+    part of the e-mail, as when parsing the e-mail
+    """
+    first = src.readline()
+    if not first.startswith(b"From "):
+        _write_all(dst_fd, first)
+    _copy_to_fd(src, dst_fd)
+
+
+def _strip_from_line(data: bytes) -> bytes:
+    """Remove a leading mbox From_ line from a serialized e-mail"""
+    if data.startswith(b"From "):
+        data = data.partition(b"\n")[2]
+    return data
+
+
+class _AppendOnlyMailbox(mailbox._mboxMMDF):
+    """
+    A single-file mailbox that never reads the existing contents of its file.
+    The stdlib implementation scans the entire file to build a table of
+    contents before it will add a message; as the senders only ever append,
+    the scan can be skipped, making the cost of ``add()`` independent of the
+    size of the file.  Methods for reading or removing messages are not
+    supported.
+    """
+
+    # `_file`, `_toc`, etc. are private attributes of the stdlib classes that
+    # typeshed doesn't declare.
+    _file: Any
+    _toc: dict[int, tuple[int, int]]
+    _next_key: int
+    _file_length: int
+    _pending_sync: bool
+    _locked: bool
+    _mangle_from_: bool
+    _append_newline: bool
+    _lookup: Any
+    _install_message: Any
+    _pre_message_hook: Any
+    _post_message_hook: Any
+
+    def _generate_toc(self) -> None:
+        self._toc = {}
+        self._next_key = 0
+        self._file.seek(0, 2)
+        self._file_length = self._file.tell()
+
+    def lock(self) -> None:
+        if self._locked:
+            return
+        while True:
+            super().lock()
+            # If the file was renamed (e.g., rotated by a `MboxSender` in
+            # another process) before we got the lock, switch to the file now
+            # at the mailbox's path so that nothing is added to the old one.
+            try:
+                current = os.stat(self._path)
+            except FileNotFoundError:
+                pass
+            else:
+                if os.path.samestat(os.fstat(self._file.fileno()), current):
+                    return
+            self.unlock()
+            self._file.close()
+            try:
+                self._file = open(self._path, "rb+")
+            except FileNotFoundError:
+                self._file = open(self._path, "ab+")
+            self._generate_toc()
+
+    @property
+    def size(self) -> int:
+        """The current size of the mailbox file"""
+        return os.fstat(self._file.fileno()).st_size
+
+    def add_file(self, fp: IO[bytes]) -> int:
+        """
+        Append the e-mail in the binary file ``fp``, from its current position
+        to its end, without parsing it.  If the e-mail starts with a "From "
+        line, that line is used as the message's From_ line, as with
+        ``add()``.  Requires the platform's line separator to be LF.
+        """
+        self._lookup()
+        self._toc[self._next_key] = self._append(lambda: self._install_file(fp))
+        self._next_key += 1
+        self._pending_sync = True
+        return self._next_key - 1
+
+    def _append_message(self, message: Any) -> tuple[int, int]:
+        # Called by the stdlib's `add()`
+        return self._append(lambda: self._install_message(message))
+
+    def _append(self, install: Callable[[], tuple[int, int]]) -> tuple[int, int]:
+        """
+        Append a message to the end of the file by calling ``install()`` to
+        write it between the pre- and post-message hooks, truncating the file
+        if anything fails, and return the message's offsets
+        """
+        self._file.seek(0, 2)
+        before = self._file.tell()
+        # The mbox & MMDF `_pre_mailbox_hook()`s do nothing, so they're not
+        # called here.
+        try:
+            self._pre_message_hook(self._file)
+            offsets = install()
+            self._post_message_hook(self._file)
+        except BaseException:
+            self._file.truncate(before)
+            raise
+        self._file.flush()
+        self._file_length = self._file.tell()
+        return offsets
+
+    def _install_file(self, fp: IO[bytes]) -> tuple[int, int]:
+        """
+        The counterpart of the stdlib's ``_install_message()`` for
+        ``add_file()``
+        """
+        start = self._file.tell()
+        first = fp.readline()
+        if first.startswith(b"From "):
+            from_line = first.removesuffix(b"\n")
+            first = b""
+        else:
+            from_line = b"From MAILER-DAEMON " + time.asctime(time.gmtime()).encode()
+        self._file.write(from_line + b"\n")
+        self._copy_body(first, fp)
+        stop = self._file.tell()
+        return (start, stop)
+
+    def _copy_body(self, first: bytes, fp: IO[bytes]) -> None:
+        """
+        Write the line ``first`` (if nonempty) and the rest of ``fp`` to the
+        mailbox file, escaping "From " lines and ending the message with a
+        newline where the stdlib's ``add()`` would, so that the file ends up
+        the same as if the e-mail had been passed to ``add()`` as bytes
+        """
+        # Every line has to be checked for "From " in order to escape it, so
+        # the body can't be copied wholesale.
+        last = b""
+        for line in itertools.chain([first], fp):
+            if self._mangle_from_ and line.startswith(b"From "):
+                line = b">" + line
+            self._file.write(line)
+            if line:
+                last = line
+        if self._append_newline and last and not last.endswith(b"\n"):
+            self._file.write(b"\n")
+
+
+class _AppendOnlyMbox(_AppendOnlyMailbox, mailbox.mbox):
+    #: The number of messages in the file before the first ``add()``, or
+    #: `None` if not counted yet
+    _counted: int | None = None
+
+    def _generate_toc(self) -> None:
+        super()._generate_toc()
+        self._counted = None
+
+    def message_count(self) -> int:
+        """
+        Return the number of messages in the file.  The first call scans the
+        file for From_ lines; after that, only messages added through this
+        object are counted.
+        """
+        if self._counted is None:
+            self._counted = self._scan() - self._next_key
+        return self._counted + self._next_key
+
+    def _scan(self) -> int:
+        self._file.seek(0)
+        try:
+            return _count_from_lines(self._file)
+        finally:
+            self._file.seek(0, 2)
+
+
+class _CompressedMbox(_AppendOnlyMbox):
+    """
+    An append-only mbox file in which each message (with its From_ line and
+    trailing blank line) is compressed as a separate gzip member, bzip2
+    stream, or xz stream.  Decompressing the whole file gives an ordinary
+    mbox, as all three formats decompress concatenated members/streams to
+    the concatenation of their contents, and adding a message never touches
+    what's already in the file.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], compression: Compression) -> None:
+        self.compression = compression
+        super().__init__(path)
+
+    def _append(self, install: Callable[[], tuple[int, int]]) -> tuple[int, int]:
+        # Like the base method, but with `_file` temporarily replaced by a
+        # compressor writing to the real file.  The offsets returned are those
+        # of the compressed member.
+        real = self._file
+        real.seek(0, 2)
+        start = real.tell()
+        try:
+            with _open_compressed(real, self.compression) as z:
+                self._file = z
+                try:
+                    self._pre_message_hook(z)
+                    install()
+                    self._post_message_hook(z)
+                finally:
+                    self._file = real
+        except BaseException:
+            real.truncate(start)
+            raise
+        real.flush()
+        self._file_length = real.tell()
+        return (start, self._file_length)
+
+    def _scan(self) -> int:
+        with _open_compressed(self._path, self.compression, "rb") as fp:
+            return _count_from_lines(fp)
+
+
+class _AppendOnlyMMDF(_AppendOnlyMailbox, mailbox.MMDF):
+    pass
+
+
+def _fsync_file(path: str) -> None:
+    # Windows can only sync files that are open for writing
+    fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(path: str) -> None:
+    # Directories cannot be opened (and thus synced) on Windows
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@cache
+def _maildir_hostname() -> str:
+    # Escaped the same way as by the stdlib
+    return socket.gethostname().replace("/", r"\057").replace(":", r"\072")
+
+
+#: Sequence numbers for naming Maildir message files; `next()` on an
+#: `itertools.count` is atomic, so no two threads ever get the same number.
+_maildir_seq = itertools.count()
+
+_MAILDIR_TMP_FLAGS = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+
+
+class _AppendOnlyMaildir(mailbox.Maildir):
+    """
+    A Maildir mailbox optimized for adding messages, which may be done from
+    any number of threads (and processes) at once.
+
+    Each message file is named
+    :samp:`{secs}.M{usecs}P{pid}Q{seq}.{hostname}`, where :samp:`{seq}` is a
+    process-wide counter, so names never collide within a process, and
+    different processes on the same host never have the same PID at the same
+    time.  Files are nevertheless created exclusively, and a fresh name is
+    tried if one does exist.
+
+    E-mails are synced to disk according to ``durability``.  With ``"none"``,
+    nothing is synced.  With ``"per-message"``, each e-mail's file and the
+    directory it's moved into are synced before ``add()`` returns.  With
+    ``"group"``, e-mails are left in :file:`tmp/` until the mailbox is
+    flushed, at which point they are all synced and moved into :file:`new/`
+    together, followed by a single sync of the directory.
+
+    Only plain e-mails are supported; `mailbox.MaildirMessage` subdirectories
+    & info are ignored.
+    """
+
+    _dump_message: Any
+
+    def __init__(self, dirname: str, durability: Durability) -> None:
+        super().__init__(dirname, factory=None)
+        self.durability = durability
+        self._pending: list[str] = []
+        self._pending_lock = threading.Lock()
+
+    def add(self, message: Any) -> str:
+        buf = io.BytesIO()
+        self._dump_message(message, buf)
+        return self.add_bytes(buf.getvalue())
+
+    def add_bytes(self, data: bytes) -> str:
+        """
+        Add a message that has already been serialized to bytes (with the
+        platform's line endings), minus any leading mbox From_ line, and return
+        its key
+        """
+        data = _strip_from_line(data)
+        return self._add_with(lambda fd: _write_all(fd, data))
+
+    def add_file(self, fp: IO[bytes]) -> str:
+        """
+        Add the message in the binary file ``fp``, from its current position to
+        its end, minus any leading mbox From_ line, and return its key
+        """
+        return self._add_with(lambda fd: _copy_message_to_fd(fp, fd))
+
+    def _add_with(self, write: Callable[[int], None]) -> str:
+        fd, tmppath = self._create_tmp_fd()
+        try:
+            write(fd)
+            if self.durability == "per-message":
+                os.fsync(fd)
+        except BaseException:
+            os.close(fd)
+            os.remove(tmppath)
+            raise
+        os.close(fd)
+        if self.durability == "group":
+            with self._pending_lock:
+                self._pending.append(tmppath)
+        else:
+            self._deliver(tmppath)
+            if self.durability == "per-message":
+                _fsync_dir(os.path.join(self._path, "new"))
+        return os.path.basename(tmppath)
+
+    def _create_tmp_fd(self) -> tuple[int, str]:
+        while True:
+            now = time.time()
+            uniq = (
+                f"{int(now)}.M{int(now % 1 * 1e6)}P{os.getpid()}"
+                f"Q{next(_maildir_seq)}.{_maildir_hostname()}"
+            )
+            path = os.path.join(self._path, "tmp", uniq)
+            try:
+                fd = os.open(path, _MAILDIR_TMP_FLAGS, 0o666)
+            except FileExistsError:
+                continue
+            return (fd, path)
+
+    def _deliver(self, tmppath: str) -> None:
+        dest = os.path.join(self._path, "new", os.path.basename(tmppath))
+        try:
+            try:
+                os.link(tmppath, dest)
+            except (AttributeError, PermissionError):
+                os.rename(tmppath, dest)
+            else:
+                os.remove(tmppath)
+        except OSError as e:
+            os.remove(tmppath)
+            if e.errno == errno.EEXIST:
+                raise mailbox.ExternalClashError(
+                    f"Name clash with existing message: {dest}"
+                )
+            else:
+                raise
+
+    def flush(self) -> None:
+        super().flush()
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            for p in pending:
+                _fsync_file(p)
+            for p in pending:
+                self._deliver(p)
+            _fsync_dir(os.path.join(self._path, "new"))
+
+
+class _AppendOnlyMH(mailbox.MH):
+    """
+    An MH mailbox optimized for adding messages.
+
+    The stdlib implementation lists the whole folder on every ``add()`` in
+    order to pick the next message number.  This class instead remembers the
+    highest number used in each folder (across all instances in the process),
+    lists the folder only the first time, and claims each new number by
+    creating its file exclusively, moving on to the next number if another
+    process got there first.
+
+    E-mails are synced to disk according to ``durability``.  With ``"none"``,
+    nothing is synced.  With ``"per-message"``, each e-mail's file and the
+    folder directory are synced before ``add()`` returns.  With ``"group"``,
+    the files added since the last flush and the folder directory are synced
+    when the mailbox is flushed.
+
+    If ``sequences`` is false, the folder's :file:`.mh_sequences` file is
+    never opened, locked, or written to, and the ``lock()`` and ``unlock()``
+    methods do nothing.
+    """
+
+    _dump_message: Any
+    _dump_sequences: Any
+    _locked: bool
+
+    def __init__(
+        self, path: str, durability: Durability, sequences: bool = True
+    ) -> None:
+        super().__init__(path, factory=None)
+        self.durability = durability
+        self.sequences = sequences
+        self._pending: list[str] = []
+
+    def lock(self) -> None:
+        if self.sequences:
+            super().lock()
+
+    def unlock(self) -> None:
+        if self.sequences:
+            super().unlock()
+
+    def _last_key(self) -> int:
+        # typeshed declares MH keys as strings, but they're actually ints.
+        return max(map(int, self.keys()), default=0)
+
+    def _claim_key(self) -> tuple[int, str, IO[bytes]]:
+        """
+        Create & open the file for a new message number, returning the number,
+        the file's path, and the file
+        """
+        folder = os.path.realpath(self._path)
+        with _mh_last_keys_lock:
+            last = _mh_last_keys.get(folder)
+            if last is None:
+                last = self._last_key()
+            clashes = 0
+            while True:
+                last += 1
+                path = os.path.join(self._path, str(last))
+                try:
+                    f = open(path, "xb+")
+                except FileExistsError:
+                    clashes += 1
+                    if clashes % MH_RESCAN_AFTER == 0:
+                        last = max(last, self._last_key())
+                    continue
+                _mh_last_keys[folder] = last
+                return (last, path, f)
+
+    def add(self, message: Any) -> int:  # type: ignore[override]
+        if isinstance(message, bytes):
+            message = _strip_from_line(message)
+        return self._add_with(lambda f: self._dump_message(message, f), message)
+
+    def add_file(self, fp: IO[bytes]) -> int:
+        """
+        Add the message in the binary file ``fp``, from its current position to
+        its end, minus any leading mbox From_ line, and return its key
+        """
+
+        def write(f: IO[bytes]) -> None:
+            f.flush()
+            _copy_message_to_fd(fp, f.fileno())
+
+        return self._add_with(write)
+
+    def _add_with(self, write: Callable[[IO[bytes]], None], message: Any = None) -> int:
+        new_key, new_path, f = self._claim_key()
+        try:
+            with f:
+                if self._locked:
+                    mailbox._lock_file(f)  # type: ignore[attr-defined]
+                try:
+                    write(f)
+                    if self.sequences and isinstance(message, mailbox.MHMessage):
+                        self._dump_sequences(message, new_key)
+                finally:
+                    if self._locked:
+                        mailbox._unlock_file(f)  # type: ignore[attr-defined]
+                f.flush()
+                if self.durability == "per-message":
+                    os.fsync(f.fileno())
+        except BaseException:
+            os.remove(new_path)
+            raise
+        if self.durability == "per-message":
+            _fsync_dir(self._path)
+        elif self.durability == "group":
+            self._pending.append(new_path)
+        return new_key
+
+    def flush(self) -> None:
+        super().flush()
+        if self._pending:
+            pending, self._pending = self._pending, []
+            for p in pending:
+                _fsync_file(p)
+            _fsync_dir(self._path)
+
+
+class _Babyl(mailbox.Babyl):
+    """A Babyl mailbox that drops a leading From_ line from serialized e-mails"""
+
+    def add(self, message: Any) -> str:
+        if isinstance(message, bytes):
+            message = _strip_from_line(message)
+        return super().add(message)
+
+
+def _compress_segment(path: str, method: Compression) -> None:
+    """
+    Compress the rotated mbox segment at ``path`` to a new file and delete the
+    original.  The compressed data is written to a temporary file that is
+    only renamed into place once complete & synced.  Errors are logged, and
+    they leave the original file in place.
+    """
+    dest = path + COMPRESSED_EXTENSIONS[method]
+    part = dest + ".part"
+    log.debug("Compressing %s to %s", path, dest)
+    try:
+        with open(path, "rb") as src, _open_compressed(part, method) as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        _fsync_file(part)
+        os.replace(part, dest)
+        _fsync_dir(os.path.dirname(dest) or os.curdir)
+        os.unlink(path)
+    except Exception:
+        log.exception("Failed to compress mbox segment %s", path)
+        with suppress(FileNotFoundError):
+            os.unlink(part)
+
+
+def _add_file(box: mailbox.Mailbox, fp: IO[bytes]) -> None:
+    add_file = getattr(box, "add_file", None)
+    if add_file is not None and mailbox.linesep == b"\n":
+        add_file(fp)
+    else:
+        # Let the mailbox convert the line endings to the platform's
+        box.add(fp.read())
+
 
 class MailboxSender(OpenClosable):  # ABC inherited from OpenClosable
+    locking: Literal["context", "message"] = "context"
+    flush_every: int | None = Field(None, gt=0)
+    flush_interval: float | None = Field(None, gt=0)
     _mbox: mailbox.Mailbox | None = PrivateAttr(None)
+    _unflushed: int = PrivateAttr(0)
+    _last_flush: float = PrivateAttr(0.0)
+    #: A timer for flushing e-mails added since the last flush once
+    #: ``flush_interval`` is up, if no more e-mails are added before then
+    _flush_timer: threading.Timer | None = PrivateAttr(None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    #: Whether the mailbox's ``add()`` method is thread-safe
+    _concurrent_adds: ClassVar[bool] = False
 
     @abstractmethod
     def _makebox(self) -> mailbox.Mailbox: ...
@@ -22,53 +713,311 @@ class MailboxSender(OpenClosable):  # ABC inherited from OpenClosable
     def open(self) -> None:
         log.debug("Opening %s", self._describe())
         self._mbox = self._makebox()
-        self._mbox.lock()
+        if self.locking == "context":
+            self._mbox.lock()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
 
     def close(self) -> None:
         if self._mbox is None:
             raise ValueError("Mailbox is not open")
         log.debug("Closing %s", self._describe())
-        self._mbox.unlock()
-        self._mbox.close()
-        self._mbox = None
+        with self._lock:
+            self._cancel_flush_timer()
+            # Flush before unlocking so that the mailbox is synced to disk
+            # before any other process can get at it
+            self._mbox.flush()
+            if self.locking == "context":
+                self._mbox.unlock()
+            self._mbox.close()
+            self._mbox = None
+
+    def warmup(self) -> None:
+        """Create the mailbox and any folders if they do not already exist"""
+        if self._mbox is None:
+            log.debug("Preparing %s", self._describe())
+            self._makebox().close()
 
     def send(self, msg: EmailMessage) -> None:
+        subject = msg.get("Subject", "<NO SUBJECT>")
+        self._deliver(f"e-mail {subject!r}", lambda box: box.add(msg))
+
+    def send_bytes(self, data: bytes) -> None:
+        """
+        Add an e-mail that has already been serialized to bytes to the mailbox
+        without parsing it or regenerating it; the bytes are copied into the
+        mailbox as-is, apart from any escaping required by the mailbox format.
+        If the e-mail starts with an mbox From_ line, mbox & MMDF mailboxes use
+        it as the message's From_ line, and the other formats drop it.
+
+        .. versionadded:: 0.7.0
+        """
+        self._deliver(f"{len(data)}-byte e-mail", lambda box: box.add(data))
+
+    def send_file(self, fp: IO[bytes]) -> None:
+        """
+        Add the e-mail in the binary file ``fp``, from its current position to
+        its end, to the mailbox without parsing it or regenerating it; the
+        result is the same as passing the file's contents to `send_bytes()`.
+        For Maildir & MH mailboxes, the contents of ``fp`` are copied directly
+        into the mailbox by the kernel with `os.copy_file_range()` or
+        `os.sendfile()` where possible; for mbox & MMDF mailboxes, the e-mail
+        is copied line by line in order to escape "From " lines.
+
+        .. versionadded:: 0.7.0
+        """
+        name = getattr(fp, "name", "<file>")
+        self._deliver(f"e-mail from {name!r}", lambda box: _add_file(box, fp))
+
+    def _deliver(self, what: str, add: Callable[[mailbox.Mailbox], object]) -> None:
         with self:
-            assert self._mbox is not None
-            log.info(
-                "Adding e-mail %r to %s",
-                msg.get("Subject", "<NO SUBJECT>"),
-                self._describe(),
-            )
-            self._mbox.add(msg)
+            self._add(what, add)
+
+    def _add(self, what: str, add: Callable[[mailbox.Mailbox], object]) -> None:
+        box = self._mbox
+        assert box is not None
+        log.info("Adding %s to %s", what, self._describe())
+        if self._concurrent_adds:
+            add(box)
+        else:
+            with self._lock:
+                if self.locking == "message":
+                    box.lock()
+                try:
+                    self._before_add()
+                    box = self._mbox
+                    assert box is not None
+                    add(box)
+                finally:
+                    if self.locking == "message":
+                        assert self._mbox is not None
+                        self._mbox.unlock()
+        with self._lock:
+            self._unflushed += 1
+            self._maybe_flush()
+
+    def _before_add(self) -> None:
+        """
+        Called with the lock held (and the mailbox locked) just before an
+        e-mail is added to a mailbox whose ``add()`` isn't thread-safe.  This
+        may replace ``_mbox`` with a new mailbox, locked in the same way.
+        """
+        pass
+
+    def _maybe_flush(self) -> None:
+        # Must be called with the lock held
+        assert self._mbox is not None
+        if (
+            self.flush_every is not None and self._unflushed >= self.flush_every
+        ) or (
+            self.flush_interval is not None
+            and time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self._flush()
+        elif self.flush_interval is not None and self._flush_timer is None:
+            # Make sure that the e-mail gets flushed in time even if nothing
+            # else is added after it
+            delay = self._last_flush + self.flush_interval - time.monotonic()
+            self._flush_timer = threading.Timer(delay, self._flush_on_timer)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush(self) -> None:
+        # Must be called with the lock held
+        assert self._mbox is not None
+        log.debug("Flushing %d e-mail(s) to %s", self._unflushed, self._describe())
+        self._cancel_flush_timer()
+        self._mbox.flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def _flush_on_timer(self) -> None:
+        with self._lock:
+            if threading.current_thread() is not self._flush_timer:
+                # The mailbox was flushed or closed in the meantime.
+                return
+            self._flush_timer = None
+            if self._mbox is not None and self._unflushed:
+                self._flush()
+
+    def _cancel_flush_timer(self) -> None:
+        # Must be called with the lock held
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
 
 
 class MboxSender(MailboxSender):
+    """
+    A sender that appends e-mails to an mbox file.  If any of the ``rotate_*``
+    options are set, the file is renamed to a "segment" with a suffix (and
+    optionally compressed in a background thread) whenever it gets too big,
+    holds too many e-mails, or the time period it was started in ends, and a
+    new file is started in its place.  Closing the sender waits for any
+    compression still in progress to finish.
+    """
+
     configpath: Path | None = None
     path: Path
+    rotate_bytes: int | None = Field(None, gt=0)
+    rotate_messages: int | None = Field(None, gt=0)
+    rotate_time: str | None = Field(None, min_length=1)
+    rotate_compress: Compression | None = None
+    compression: Compression | None = None
+    #: The value of ``rotate_time`` formatted for the time at which the
+    #: current file was started
+    _period: str | None = PrivateAttr(None)
+    _compressors: list[threading.Thread] = PrivateAttr(default_factory=list)
+
+    @model_validator(mode="after")
+    def _validate(self) -> Self:
+        if self.compression is not None and self.rotate_compress is not None:
+            raise ValueError("rotate_compress cannot be set when compression is set")
+        return self
 
     # <https://github.com/python/typeshed/issues/14935>
     def _makebox(self) -> mailbox.mbox:  # type: ignore[override]
-        return mailbox.mbox(self.path)
+        box: _AppendOnlyMbox
+        if self.compression is not None:
+            box = _CompressedMbox(self.path, self.compression)
+        else:
+            box = _AppendOnlyMbox(self.path)
+        if self.rotate_time is not None:
+            # A preexisting file is taken to have been started in the period
+            # in which it was last modified.
+            when = time.localtime(os.stat(self.path).st_mtime if box.size else None)
+            self._period = time.strftime(self.rotate_time, when)
+        return box
+
+    def close(self) -> None:
+        super().close()
+        self.wait()
+
+    def wait(self) -> None:
+        """
+        Wait for the compression of any rotated segments to finish
+
+        .. versionadded:: 0.7.0
+        """
+        with self._lock:
+            compressors = self._compressors
+            self._compressors = []
+        for t in compressors:
+            t.join()
+
+    def _before_add(self) -> None:
+        box = self._mbox
+        assert isinstance(box, _AppendOnlyMbox)
+        period: str | None = None
+        if self.rotate_time is not None:
+            period = time.strftime(self.rotate_time)
+        if not box.size:
+            self._period = period
+            return
+        if self.rotate_bytes is not None and box.size >= self.rotate_bytes:
+            why = f"reached {self.rotate_bytes} bytes"
+        elif (
+            self.rotate_messages is not None
+            and box.message_count() >= self.rotate_messages
+        ):
+            why = f"reached {self.rotate_messages} e-mails"
+        elif period != self._period:
+            why = "time period ended"
+        else:
+            return
+        self._rotate(why)
+        self._period = period
+
+    def _rotate(self, why: str) -> None:
+        # Must be called with the lock held and the mailbox locked
+        box = self._mbox
+        assert box is not None
+        segment = self._segment_path()
+        log.info("Rotating %s to %s (%s)", self._describe(), segment, why)
+        box.flush()
+        # The file is renamed while it's still locked so that nothing can be
+        # added to it afterwards; anyone waiting for the lock will reopen the
+        # mailbox path once they get it.
+        os.rename(self.path, segment)
+        box.unlock()
+        box.close()
+        self._mbox = self._makebox()
+        self._mbox.lock()
+        self._unflushed = 0
+        if self.rotate_compress is not None:
+            self._compressors = [t for t in self._compressors if t.is_alive()]
+            t = threading.Thread(
+                target=_compress_segment,
+                args=(segment, self.rotate_compress),
+                name=f"outgoing-compress-{os.path.basename(segment)}",
+            )
+            t.start()
+            self._compressors.append(t)
+
+    def _segment_path(self) -> str:
+        if self.rotate_time is not None:
+            assert self._period is not None
+            suffix = self._period
+        else:
+            suffix = time.strftime("%Y%m%dT%H%M%S")
+        base = f"{self.path}.{suffix}"
+        segment = base
+        n = 0
+        # Segments of a compressed mbox are named with the compression's
+        # extension; segments to be compressed by `rotate_compress` are given
+        # it once compressed.  Either way, the name must not collide with any
+        # segment, compressed or not.
+        while any(
+            os.path.lexists(segment + ext)
+            for ext in ["", *COMPRESSED_EXTENSIONS.values()]
+        ):
+            n += 1
+            segment = f"{base}.{n}"
+        if self.compression is not None:
+            segment += COMPRESSED_EXTENSIONS[self.compression]
+        return segment
 
     def _describe(self) -> str:
         return f"mbox at {self.path}"
 
 
 class MaildirSender(MailboxSender):
+    """
+    A sender that adds e-mails to a Maildir mailbox.  While the sender's
+    context is open, ``send()`` may be called from any number of threads at
+    once, and the e-mails are written concurrently.
+    """
+
     configpath: Path | None = None
     path: Path
     folder: str | None = None
+    durability: Durability = "per-message"
+    _folder_path: str | None = PrivateAttr(None)
+    # Maildir locking is a no-op, and `_AppendOnlyMaildir.add()` is
+    # thread-safe.
+    _concurrent_adds: ClassVar[bool] = True
 
     # <https://github.com/python/typeshed/issues/14935>
     def _makebox(self) -> mailbox.Maildir:  # type: ignore[override]
+        # Looking up the folder is only done once, unless the folder is
+        # deleted in the meantime.
+        if self._folder_path is not None and os.path.isdir(self._folder_path):
+            return _AppendOnlyMaildir(self._folder_path, self.durability)
         box = mailbox.Maildir(self.path)
         if self.folder is not None:
             try:
                 box = box.get_folder(self.folder)
             except mailbox.NoSuchMailboxError:
                 box = box.add_folder(self.folder)
-        return box
+        self._folder_path = box._path
+        return _AppendOnlyMaildir(box._path, self.durability)
+
+    def _deliver(self, what: str, add: Callable[[mailbox.Mailbox], object]) -> None:
+        if self._mbox is not None:
+            # Don't touch the context depth, which isn't thread-safe
+            self._add(what, add)
+        else:
+            super()._deliver(what, add)
 
     def _describe(self) -> str:
         if self.folder is None:
@@ -82,9 +1031,16 @@ class MHSender(MailboxSender):
     configpath: Path | None = None
     path: Path
     folder: str | list[str] | None = None
+    durability: Durability = "per-message"
+    sequences: bool = True
+    _folder_path: str | None = PrivateAttr(None)
 
     # <https://github.com/python/typeshed/issues/14935>
     def _makebox(self) -> mailbox.MH:  # type: ignore[override]
+        # Walking the folder path is only done once, unless the folder is
+        # deleted in the meantime.
+        if self._folder_path is not None and os.path.isdir(self._folder_path):
+            return _AppendOnlyMH(self._folder_path, self.durability, self.sequences)
         box = mailbox.MH(self.path)
         if self.folder is not None:
             folders: list[str]
@@ -97,7 +1053,8 @@ class MHSender(MailboxSender):
                     box = box.get_folder(f)
                 except mailbox.NoSuchMailboxError:
                     box = box.add_folder(f)
-        return box
+        self._folder_path = box._path
+        return _AppendOnlyMH(box._path, self.durability, self.sequences)
 
     def _describe(self) -> str:
         if self.folder is None:
@@ -115,7 +1072,7 @@ class MMDFSender(MailboxSender):
 
     # <https://github.com/python/typeshed/issues/14935>
     def _makebox(self) -> mailbox.MMDF:  # type: ignore[override]
-        return mailbox.MMDF(self.path)
+        return _AppendOnlyMMDF(self.path)
 
     def _describe(self) -> str:
         return f"MMDF mailbox at {self.path}"
@@ -127,7 +1084,7 @@ class BabylSender(MailboxSender):
 
     # <https://github.com/python/typeshed/issues/14935>
     def _makebox(self) -> mailbox.Babyl:  # type: ignore[override]
-        return mailbox.Babyl(self.path)
+        return _Babyl(self.path)
 
     def _describe(self) -> str:
         return f"Babyl mailbox at {self.path}"
@@ -1,21 +1,188 @@
 from __future__ import annotations
+from collections.abc import Iterable
+import copy
+from dataclasses import dataclass
+from email.generator import BytesGenerator
 from email.message import EmailMessage
+from email.utils import getaddresses
+from io import BytesIO
 import logging
+import re
 import smtplib
-from typing import Literal
-from pydantic import Field, PrivateAttr, ValidationInfo, field_validator
-from ..config import NetrcConfig
+import ssl
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Literal
+from pydantic import (
+    Field,
+    PrivateAttr,
+    ValidationInfo,
+    field_validator,
+    model_validator,
+)
+from ..config import FilePath, NetrcConfig
 from ..util import OpenClosable
 
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
 STARTTLS = "starttls"
 
 log = logging.getLogger(__name__)
 
 
-class SMTPSender(NetrcConfig, OpenClosable):
+@dataclass
+class Envelope:
+    """An e-mail serialized for transmission over SMTP"""
+
+    from_addr: str
+    to_addrs: list[str]
+    data: bytes
+    #: Whether the addresses or message require the SMTPUTF8 extension
+    international: bool
+    #: Whether ``data`` contains the unencoded contents of ``binary`` parts
+    #: and thus requires the BINARYMIME extension
+    binary: bool = False
+
+    def mail_options(self, esmtp_features: dict[str, str]) -> list[str]:
+        """
+        Return the parameters to pass to the MAIL command when sending to a
+        server with the given ESMTP features
+        """
+        opts = []
+        if "size" in esmtp_features:
+            opts.append(f"size={len(self.data)}")
+        if self.international:
+            opts.append("SMTPUTF8")
+        if self.binary:
+            opts.append("BODY=BINARYMIME")
+        elif self.international:
+            opts.append("BODY=8BITMIME")
+        return opts
+
+
+def prepare_message(msg: EmailMessage, binary: bool = False) -> Envelope:
+    """
+    Determine the envelope sender & recipients for ``msg`` and serialize it,
+    following the same rules as `smtplib.SMTP.send_message()`.  If ``binary``
+    is true, the payloads of any parts with a ``Content-Transfer-Encoding`` of
+    ``binary`` are written out as-is rather than having their line endings
+    converted.
+    """
+    resent = msg.get_all("Resent-Date")
+    if resent is None:
+        header_prefix = ""
+    elif len(resent) == 1:
+        header_prefix = "Resent-"
+    else:
+        raise ValueError("message has more than one 'Resent-' header block")
+    if header_prefix + "Sender" in msg:
+        from_header = msg[header_prefix + "Sender"]
+    else:
+        from_header = msg[header_prefix + "From"]
+    from_addr = getaddresses([from_header])[0][1]
+    addr_fields = [
+        f
+        for f in (
+            msg[header_prefix + "To"],
+            msg[header_prefix + "Bcc"],
+            msg[header_prefix + "Cc"],
+        )
+        if f is not None
+    ]
+    to_addrs = [a[1] for a in getaddresses(addr_fields)]
+    msg_copy = copy.copy(msg)
+    del msg_copy["Bcc"]
+    del msg_copy["Resent-Bcc"]
+    try:
+        "".join([from_addr, *to_addrs]).encode("ascii")
+    except UnicodeEncodeError:
+        international = True
+    else:
+        international = False
+    gencls = _BinaryGenerator if binary else BytesGenerator
+    with BytesIO() as fp:
+        if international:
+            g = gencls(fp, policy=msg.policy.clone(utf8=True))  # type: ignore[call-arg]
+        else:
+            g = gencls(fp)
+        g.flatten(msg_copy, linesep="\r\n")
+        data = fp.getvalue()
+    return Envelope(
+        from_addr=from_addr,
+        to_addrs=to_addrs,
+        data=data,
+        international=international,
+        binary=binary,
+    )
+
+
+class _BinaryGenerator(BytesGenerator):
+    """
+    A `BytesGenerator` that writes the payloads of parts with a
+    ``Content-Transfer-Encoding`` of ``binary`` verbatim
+    """
+
+    # Private attributes of the stdlib class that typeshed doesn't declare
+    _fp: Any
+
+    def _handle_text(self, msg: Any) -> None:
+        payload = msg._payload
+        if (
+            isinstance(payload, str)
+            and msg.get("Content-Transfer-Encoding", "").lower() == "binary"
+        ):
+            # Binary payloads are stored as strings decoded with
+            # surrogateescape.
+            self._fp.write(payload.encode("utf-8", "surrogateescape"))
+        else:
+            super()._handle_text(msg)  # type: ignore[misc]
+
+    _writeBody = _handle_text
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """
+    An `ssl.SSLContext` that remembers a TLS session and offers it for
+    resumption whenever it wraps a new client connection, letting reconnects
+    to the same server skip the full handshake
+    """
+
+    #: The session to offer when wrapping the next client connection
+    session: ssl.SSLSession | None = None
+
+    def wrap_socket(self, *args: Any, **kwargs: Any) -> ssl.SSLSocket:
+        if kwargs.get("session") is None and not kwargs.get("server_side"):
+            kwargs["session"] = self.session
+        return super().wrap_socket(*args, **kwargs)
+
+    def wrap_bio(self, *args: Any, **kwargs: Any) -> ssl.SSLObject:
+        if kwargs.get("session") is None and not kwargs.get("server_side"):
+            kwargs["session"] = self.session
+        return super().wrap_bio(*args, **kwargs)
+
+    def save_session(self, sslobj: ssl.SSLSocket | ssl.SSLObject | None) -> None:
+        """
+        Remember the session of ``sslobj`` (if it is an established TLS
+        connection) for use by the next connection
+        """
+        if isinstance(sslobj, (ssl.SSLSocket, ssl.SSLObject)):
+            session = sslobj.session
+            if session is not None:
+                self.session = session
+
+
+class SMTPConfig(NetrcConfig):
+    """Configuration fields shared by the synchronous & async SMTP senders"""
+
     ssl: Literal[False, True, "starttls"] = False
     port: int = Field(0, ge=0, validate_default=True)
-    _client: smtplib.SMTP | None = PrivateAttr(None)
+    ssl_verify: bool = False
+    ssl_cafile: FilePath | None = None
+    ssl_certfile: FilePath | None = None
+    ssl_keyfile: FilePath | None = None
+    ssl_ciphers: str | None = None
+    _ssl_context: ResumingSSLContext | None = PrivateAttr(None)
 
     @field_validator("port")
     @classmethod
@@ -31,36 +198,479 @@ class SMTPSender(NetrcConfig, OpenClosable):
         else:
             return v
 
+    @model_validator(mode="after")
+    def _validate_ssl(self) -> Self:
+        if self.ssl_cafile is not None and not self.ssl_verify:
+            raise ValueError("ssl_cafile cannot be set unless ssl_verify is true")
+        return self
+
+    def get_ssl_context(self) -> ResumingSSLContext:
+        """
+        Return the `ssl.SSLContext` used for all of the sender's TLS
+        connections, creating it on first use.  Reusing a single context (and
+        the TLS session it remembers) means that certificates are only loaded
+        once and that reconnects can resume the previous TLS session.
+
+        :raises ssl.SSLError: if the certificates or ciphers are invalid
+        """
+        if self._ssl_context is None:
+            ctx = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            if self.ssl_verify:
+                if self.ssl_cafile is not None:
+                    ctx.load_verify_locations(cafile=self.ssl_cafile)
+                else:
+                    ctx.load_default_certs()
+            else:
+                # Match smtplib, which does not verify server certificates by
+                # default
+                ctx.check_hostname = False
+                ctx.verify_mode = ssl.CERT_NONE
+            if self.ssl_certfile is not None:
+                ctx.load_cert_chain(self.ssl_certfile, self.ssl_keyfile)
+            if self.ssl_ciphers is not None:
+                ctx.set_ciphers(self.ssl_ciphers)
+            self._ssl_context = ctx
+        return self._ssl_context
+
+
+def send_message(
+    client: smtplib.SMTP,
+    msg: EmailMessage,
+    pipelining: bool = True,
+    chunk_size: int | None = None,
+) -> dict[str, tuple[int, bytes]]:
+    """
+    Send ``msg`` over ``client`` like `smtplib.SMTP.send_message()`, but make
+    use of the following SMTP extensions when the server supports them:
+
+    - If ``pipelining`` is true and the server supports PIPELINING
+      (:rfc:`2920`), the MAIL, RCPT, and DATA commands are sent in a single
+      batch, and only then are their replies read.
+
+    - If ``chunk_size`` is not `None` and the server supports CHUNKING
+      (:rfc:`3030`), the message is sent with BDAT commands in chunks of at
+      most ``chunk_size`` bytes instead of with DATA, avoiding the need to
+      dot-stuff the message.  If the server also supports BINARYMIME and the
+      message contains any parts with a ``Content-Transfer-Encoding`` of
+      ``binary``, the contents of those parts are sent unaltered.
+
+    Errors are reported in the same way as ``send_message()``: a `dict` of
+    refused recipients is returned if at least one recipient was accepted, and
+    an `smtplib.SMTPException` is raised otherwise.
+    """
+    client.ehlo_or_helo_if_needed()
+    pipelining = pipelining and client.has_extn("pipelining")
+    chunking = chunk_size is not None and client.has_extn("chunking")
+    if not (pipelining or chunking):
+        return client.send_message(msg)
+    binary = chunking and client.has_extn("binarymime") and _has_binary_parts(msg)
+    env = prepare_message(msg, binary=binary)
+    if env.international:
+        if not client.has_extn("smtputf8"):
+            raise smtplib.SMTPNotSupportedError(
+                "One or more source or delivery addresses require"
+                " internationalized email support, but the server does not"
+                " advertise the required SMTPUTF8 capability"
+            )
+        encoding = "utf-8"
+    else:
+        encoding = "ascii"
+    mail = " ".join(
+        [f"MAIL FROM:{smtplib.quoteaddr(env.from_addr)}"]
+        + env.mail_options(client.esmtp_features)
+    )
+    commands = [mail] + [f"RCPT TO:{smtplib.quoteaddr(a)}" for a in env.to_addrs]
+    if not chunking:
+        commands.append("DATA")
+    encoded = [(c + "\r\n").encode(encoding) for c in commands]
+    if pipelining:
+        client.send(b"".join(encoded))
+    else:
+        client.send(encoded[0])
+    mail_reply = client.getreply()
+    if mail_reply[0] != 250 and not pipelining:
+        _abort(client, [mail_reply[0]])
+        raise smtplib.SMTPSenderRefused(*mail_reply, env.from_addr)
+    refused: dict[str, tuple[int, bytes]] = {}
+    for addr, rcpt in zip(env.to_addrs, encoded[1:]):
+        if not pipelining:
+            client.send(rcpt)
+        code, resp = client.getreply()
+        if code not in (250, 251):
+            refused[addr] = (code, resp)
+    if chunking:
+        if mail_reply[0] != 250:
+            _abort(client, [mail_reply[0]])
+            raise smtplib.SMTPSenderRefused(*mail_reply, env.from_addr)
+        elif len(refused) == len(env.to_addrs):
+            _abort(client, [code for code, _ in refused.values()])
+            raise smtplib.SMTPRecipientsRefused(refused)
+        assert chunk_size is not None
+        data_code, data_resp = _send_chunks(client, env.data, chunk_size, pipelining)
+        if data_code == 250:
+            return refused
+        _abort(client, [data_code])
+        raise smtplib.SMTPDataError(data_code, data_resp)
+    data_code, data_resp = client.getreply()
+    if data_code == 354:
+        # The server will take the data no matter what, so it must be sent
+        # even if the message ends up being discarded.
+        if mail_reply[0] != 250 or len(refused) == len(env.to_addrs):
+            client.send(b".\r\n")
+            client.getreply()
+        else:
+            q = re.sub(rb"(?m)^\.", b"..", env.data)
+            if q[-2:] != b"\r\n":
+                q += b"\r\n"
+            client.send(q + b".\r\n")
+            data_code, data_resp = client.getreply()
+            if data_code == 250:
+                return refused
+    if mail_reply[0] != 250:
+        _abort(client, [mail_reply[0]])
+        raise smtplib.SMTPSenderRefused(*mail_reply, env.from_addr)
+    elif len(refused) == len(env.to_addrs):
+        _abort(client, [code for code, _ in refused.values()])
+        raise smtplib.SMTPRecipientsRefused(refused)
+    else:
+        _abort(client, [data_code])
+        raise smtplib.SMTPDataError(data_code, data_resp)
+
+
+def _send_chunks(
+    client: smtplib.SMTP, data: bytes, chunk_size: int, pipelining: bool
+) -> tuple[int, bytes]:
+    """
+    Send ``data`` with BDAT commands and return the first unsuccessful reply,
+    or the reply to the last command if all were successful.  If
+    ``pipelining`` is true, all of the chunks are sent before any replies are
+    read.
+    """
+    view = memoryview(data)
+    offsets = range(0, max(len(view), 1), chunk_size)
+    for start in offsets:
+        chunk = view[start : start + chunk_size]
+        last = " LAST" if start + chunk_size >= len(view) else ""
+        client.send(f"BDAT {len(chunk)}{last}\r\n".encode("ascii"))
+        client.send(chunk)
+        if not pipelining:
+            reply = client.getreply()
+            if reply[0] != 250:
+                return reply
+    if pipelining:
+        replies = [client.getreply() for _ in offsets]
+        for reply in replies:
+            if reply[0] != 250:
+                return reply
+    return reply
+
+
+def _has_binary_parts(msg: EmailMessage) -> bool:
+    return any(
+        part.get("Content-Transfer-Encoding", "").lower() == "binary"
+        for part in msg.walk()
+    )
+
+
+def _abort(client: smtplib.SMTP, codes: list[int]) -> None:
+    """
+    Clean up after a failed transaction the same way that `smtplib` does:
+    close the connection if the server replied that it is shutting down, and
+    reset the transaction otherwise
+    """
+    if 421 in codes:
+        client.close()
+    else:
+        try:
+            client.rset()
+        except smtplib.SMTPServerDisconnected:
+            pass
+
+
+class SMTPSender(SMTPConfig, OpenClosable):
+    pipelining: bool = False
+    chunking: bool = False
+    chunk_size: int = Field(1 << 20, gt=0)
+    keepalive: float | None = Field(None, gt=0)
+    _client: smtplib.SMTP | None = PrivateAttr(None)
+    _last_used: float = PrivateAttr(0)
+    # A connection made by warmup() for the next open() to use, along with
+    # the time it was made
+    _warm: tuple[smtplib.SMTP, float] | None = PrivateAttr(None)
+
     def open(self) -> None:
+        if self._warm is not None:
+            self._client, self._last_used = self._warm
+            self._warm = None
+        else:
+            self._client = self._connect()
+            self._last_used = time.monotonic()
+
+    def warmup(self) -> None:
+        """
+        Connect & log in to the server ahead of time.  The connection is used
+        the next time the sender is opened; if the sender is closed without
+        having been opened, the connection is closed instead.  Does nothing if
+        the sender is already open or warmed up.
+        """
+        if self._client is None and self._warm is None:
+            self._warm = (self._connect(), time.monotonic())
+
+    def __del__(self) -> None:
+        # Don't leak a connection from warmup() that was never used
+        try:
+            warm = self._warm
+        except AttributeError:
+            # Validation failed before the private attributes were set
+            return
+        if warm is not None:
+            warm[0].close()
+
+    def _connect(self) -> smtplib.SMTP:
         # We need to pass the host & port to the constructor instead of calling
         # connect() later due to <https://bugs.python.org/issue36094>.
+        client: smtplib.SMTP
         if self.ssl is True:
             log.debug(
                 "Connecting to SMTP server at %s, port %d, using TLS",
                 self.host,
                 self.port,
             )
-            self._client = smtplib.SMTP_SSL(self.host, self.port)
+            client = smtplib.SMTP_SSL(
+                self.host, self.port, context=self.get_ssl_context()
+            )
         else:
             log.debug("Connecting to SMTP server at %s, port %d", self.host, self.port)
-            self._client = smtplib.SMTP(self.host, self.port)
-        if self.ssl == STARTTLS:
-            log.debug("Enabling STARTTLS")
-            self._client.starttls()
-        if self.username is not None:
-            assert self.password is not None
-            log.debug("Logging in as %r", self.username)
-            self._client.login(self.username, self.password.get_secret_value())
+            client = smtplib.SMTP(self.host, self.port)
+        try:
+            if self.ssl == STARTTLS:
+                log.debug("Enabling STARTTLS")
+                client.starttls(context=self.get_ssl_context())
+            if self.username is not None:
+                assert self.password is not None
+                log.debug("Logging in as %r", self.username)
+                client.login(self.username, self.password.get_secret_value())
+        except BaseException:
+            client.close()
+            raise
+        self._save_session(client)
+        return client
 
     def close(self) -> None:
         if self._client is None:
-            raise ValueError("SMTPSender is not open")
-        log.debug("Closing connection to %s", self.host)
-        self._client.quit()
+            if self._warm is None:
+                raise ValueError("SMTPSender is not open")
+            client, _ = self._warm
+            self._warm = None
+            self._disconnect(client)
+            return
+        self._disconnect(self._client)
         self._client = None
 
     def send(self, msg: EmailMessage) -> None:
         with self:
             assert self._client is not None
             log.info("Sending e-mail %r via SMTP", msg.get("Subject", "<NO SUBJECT>"))
-            self._client.send_message(msg)
+            if self.keepalive is None:
+                self._send_message(self._client, msg)
+                return
+            if time.monotonic() - self._last_used >= self.keepalive and not (
+                self._is_alive(self._client)
+            ):
+                self._client = self._connect()
+            try:
+                self._send_message(self._client, msg)
+            except smtplib.SMTPServerDisconnected:
+                log.info("Connection to %s lost; reconnecting", self.host)
+                self._client.close()
+                self._client = self._connect()
+                self._send_message(self._client, msg)
+            self._last_used = time.monotonic()
+
+    def _send_message(self, client: smtplib.SMTP, msg: EmailMessage) -> None:
+        if self.pipelining or self.chunking:
+            send_message(
+                client,
+                msg,
+                pipelining=self.pipelining,
+                chunk_size=self.chunk_size if self.chunking else None,
+            )
+        else:
+            client.send_message(msg)
+
+    def _is_alive(self, client: smtplib.SMTP) -> bool:
+        try:
+            code, _ = client.noop()
+        except (smtplib.SMTPException, OSError):
+            code = -1
+        if code == 250:
+            return True
+        else:
+            log.debug("Discarding dead connection to %s", self.host)
+            client.close()
+            return False
+
+    def _disconnect(self, client: smtplib.SMTP) -> None:
+        log.debug("Closing connection to %s", self.host)
+        # TLS 1.3 servers may only send session tickets after the handshake,
+        # so check for a fresher session before closing.
+        self._save_session(client)
+        try:
+            client.quit()
+        except (smtplib.SMTPException, OSError):
+            client.close()
+
+    def _save_session(self, client: smtplib.SMTP) -> None:
+        if self.ssl and self._ssl_context is not None:
+            self._ssl_context.save_session(getattr(client, "sock", None))
+
+
+class SMTPPoolSender(SMTPSender):
+    """
+    An SMTP sender that keeps a bounded pool of authenticated connections
+    open between calls to ``send()``.  ``send()`` is thread-safe, and
+    concurrent calls are made over separate connections.  Pooled connections
+    are closed when the sender's context is exited or ``close()`` is called.
+    """
+
+    pool_size: int = Field(4, ge=1)
+    idle_timeout: float = Field(60, gt=0)
+    _idle: list[tuple[smtplib.SMTP, float]] = PrivateAttr(default_factory=list)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _slots: threading.BoundedSemaphore = PrivateAttr()
+
+    def model_post_init(self, context: Any, /) -> None:
+        super().model_post_init(context)
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+
+    def open(self) -> None:
+        pass
+
+    def close(self) -> None:
+        with self._lock:
+            idle = self._idle
+            self._idle = []
+        for client, _ in idle:
+            self._disconnect(client)
+
+    def warmup(self) -> None:
+        """
+        Open & log in enough connections to bring the pool up to
+        ``pool_size`` open connections, counting both idle connections and
+        those currently in use by ``send()``
+        """
+        # Every connection in use holds a slot, so reserving all of the free
+        # slots (without waiting for any) leaves us with one per connection
+        # that is either idle or can still be opened.
+        reserved = 0
+        while self._slots.acquire(blocking=False):
+            reserved += 1
+        try:
+            with self._lock:
+                missing = reserved - len(self._idle)
+            # Let concurrent sends use the idle connections while we connect.
+            for _ in range(reserved - max(missing, 0)):
+                self._slots.release()
+                reserved -= 1
+            while reserved:
+                client = self._connect()
+                reserved -= 1
+                self._checkin(client)
+        finally:
+            for _ in range(reserved):
+                self._slots.release()
+
+    def send(self, msg: EmailMessage) -> None:
+        client = self._checkout()
+        log.info("Sending e-mail %r via SMTP", msg.get("Subject", "<NO SUBJECT>"))
+        retry = self.keepalive is not None
+        while True:
+            try:
+                self._send_message(client, msg)
+            except smtplib.SMTPServerDisconnected:
+                client.close()
+                if not retry:
+                    self._slots.release()
+                    raise
+                retry = False
+                log.info("Connection to %s lost; reconnecting", self.host)
+                try:
+                    client = self._connect()
+                except BaseException:
+                    self._slots.release()
+                    raise
+            except smtplib.SMTPException:
+                # The server refused the e-mail, but the connection is still
+                # good.  (`SMTPException` is a subclass of `OSError`, so this
+                # has to come before the next clause.)
+                self._reset(client)
+                raise
+            except OSError:
+                client.close()
+                self._slots.release()
+                raise
+            except BaseException:
+                self._checkin(client)
+                raise
+            else:
+                self._checkin(client)
+                return
+
+    def send_many(self, msgs: Iterable[EmailMessage]) -> list[Any]:
+        """
+        Send multiple e-mails over connections checked out of the pool, as
+        ``send()`` does.  Unlike the generic batch path of `send_many()`, this
+        does not enter or exit the sender's context, so the pool keeps its
+        connections afterwards, and batches can be sent from multiple threads
+        at once.
+        """
+        results: list[Any] = []
+        for msg in msgs:
+            try:
+                self.send(msg)
+            except Exception as e:
+                results.append(e)
+            else:
+                results.append(None)
+        return results
+
+    def _checkout(self) -> smtplib.SMTP:
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    client, last_used = self._idle.pop()
+                idle = time.monotonic() - last_used
+                if idle > self.idle_timeout:
+                    self._disconnect(client)
+                elif self.keepalive is not None and idle < self.keepalive:
+                    return client
+                elif self._is_alive(client):
+                    return client
+            return self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, client: smtplib.SMTP) -> None:
+        with self._lock:
+            self._idle.append((client, time.monotonic()))
+        self._slots.release()
+
+    def _reset(self, client: smtplib.SMTP) -> None:
+        """
+        Reset the transaction on a connection after an SMTP error and check it
+        back in, or discard it if it was closed or cannot be reset
+        """
+        # `smtplib` closes the connection if the server replied with 421.
+        if client.sock is not None:
+            try:
+                client.rset()
+            except (smtplib.SMTPException, OSError):
+                client.close()
+            else:
+                self._checkin(client)
+                return
+        self._slots.release()
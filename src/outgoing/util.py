@@ -1,13 +1,15 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from email.message import EmailMessage
 import os
 from pathlib import Path
 from types import TracebackType
-from typing import TYPE_CHECKING, TypeAlias
+from typing import TYPE_CHECKING, Any, TypeAlias
 from pydantic import BaseModel, PrivateAttr
 
 if TYPE_CHECKING:
     from typing_extensions import Self
+    from .core import Sender
 
 AnyPath: TypeAlias = str | bytes | os.PathLike[str] | os.PathLike[bytes]
 
@@ -32,6 +34,16 @@ class OpenClosable(ABC, BaseModel):
     @abstractmethod
     def close(self) -> None: ...
 
+    def warmup(self) -> None:
+        """
+        Perform any expensive setup that the sender would otherwise do when
+        first opened or used, so that the first e-mail sent does not have to
+        pay for it.  The default implementation does nothing.
+
+        .. versionadded:: 0.7.0
+        """
+        pass
+
     def __enter__(self) -> Self:
         if self._context_depth == 0:
             self.open()
@@ -49,6 +61,100 @@ class OpenClosable(ABC, BaseModel):
             self.close()
 
 
+class AsyncOpenClosable(ABC, BaseModel):
+    """
+    An asynchronous counterpart to `OpenClosable`.  A concrete subclass must
+    define ``async`` ``open()`` and ``close()`` methods; `AsyncOpenClosable`
+    will then define ``__aenter__`` and ``__aexit__`` methods that call
+    ``open()`` and ``close()`` only when entering & exiting the outermost
+    ``async with``.
+    """
+
+    _context_depth: int = PrivateAttr(0)
+
+    @abstractmethod
+    async def open(self) -> None: ...
+
+    @abstractmethod
+    async def close(self) -> None: ...
+
+    async def warmup(self) -> None:
+        """
+        An asynchronous counterpart to `OpenClosable.warmup()`.  The default
+        implementation does nothing.
+
+        .. versionadded:: 0.7.0
+        """
+        pass
+
+    async def __aenter__(self) -> Self:
+        if self._context_depth == 0:
+            await self.open()
+        self._context_depth += 1
+        return self
+
+    async def __aexit__(
+        self,
+        _exc_type: type[BaseException] | None,
+        _exc_val: BaseException | None,
+        _exc_tb: TracebackType | None,
+    ) -> None:
+        self._context_depth -= 1
+        if self._context_depth == 0:
+            await self.close()
+
+
+class ThreadedAsyncSender:
+    """
+    Wraps a synchronous `Sender` so that it can be used as an `AsyncSender`.
+    The wrapped sender's methods are run in a worker thread via
+    `asyncio.to_thread()`, one call at a time.
+    """
+
+    def __init__(self, sender: Sender) -> None:
+        # asyncio is slow to import, so it's only imported once it's needed.
+        import asyncio
+
+        #: The wrapped synchronous sender
+        self.sender: Sender = sender
+        self._lock = asyncio.Lock()
+        self._to_thread = asyncio.to_thread
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.sender!r})"
+
+    async def __aenter__(self) -> Self:
+        async with self._lock:
+            await self._to_thread(self.sender.__enter__)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> bool | None:
+        async with self._lock:
+            return await self._to_thread(
+                self.sender.__exit__, exc_type, exc_val, exc_tb
+            )
+
+    async def send(self, msg: EmailMessage) -> Any:
+        async with self._lock:
+            return await self._to_thread(self.sender.send, msg)
+
+    async def warmup(self) -> None:
+        """
+        Call `warmup()` on the wrapped sender in a worker thread
+
+        .. versionadded:: 0.7.0
+        """
+        from .core import warmup
+
+        async with self._lock:
+            await self._to_thread(warmup, self.sender)
+
+
 def resolve_path(path: AnyPath, basepath: AnyPath | None = None) -> Path:
     """
     Convert a path to a `pathlib.Path` instance and resolve it using the same
@@ -1,6 +1,33 @@
+from __future__ import annotations
+from collections.abc import Callable
 from email.message import EmailMessage
+import os
 from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
 import pytest
+from pytest_mock import MockerFixture
+from outgoing import (
+    from_dict,
+    invalidate_config_cache,
+    invalidate_sender_cache,
+    refresh_registry,
+    set_password_cache,
+)
+from outgoing import core
+from outgoing.senders.mailboxes import MailboxSender
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches() -> None:
+    # Tests mock out sender classes & rewrite files, so make sure nothing is
+    # left cached from previous tests
+    refresh_registry()
+    invalidate_config_cache()
+    invalidate_sender_cache()
+    set_password_cache(None)
+    core.netrc_cache.invalidate()
+    core.default_netrc_cache.invalidate()
 
 
 @pytest.fixture()
@@ -42,3 +69,58 @@ def test_email2() -> EmailMessage:
     msg["From"] = "my.beloved@love.love"
     msg.set_content("Hot pockets?  Thou disgusteth me.\n\nPineapple pizza or RIOT.\n")
     return msg
+
+
+@pytest.fixture()
+def make_sender(tmp_path: Path) -> Callable[..., MailboxSender]:
+    """
+    Returns a function for constructing a mailbox sender with the given method
+    & configuration fields.  The mailbox is at :file:`inbox` in ``tmp_path``
+    unless a ``path`` is passed.
+    """
+
+    def make(method: str, **kwargs: Any) -> MailboxSender:
+        sender = from_dict(
+            {"method": method, "path": "inbox", **kwargs},
+            configpath=str(tmp_path / "foo.txt"),
+        )
+        assert isinstance(sender, MailboxSender)
+        return sender
+
+    return make
+
+
+@pytest.fixture()
+def fsync(mocker: MockerFixture) -> MagicMock:
+    return mocker.spy(os, "fsync")
+
+
+@pytest.fixture()
+def kernel_copiers(mocker: MockerFixture) -> list[MagicMock]:
+    """Spies on the functions for copying between files in the kernel"""
+    copiers = []
+    for name in ["copy_file_range", "sendfile"]:
+        if hasattr(os, name):
+            copiers.append(mocker.spy(os, name))
+    if not copiers:
+        pytest.skip("No kernel copying functions on this platform")
+    return copiers
+
+
+@pytest.fixture()
+def raw_email() -> bytes:
+    """
+    A serialized e-mail for passing to the mailbox senders' ``send_bytes()`` &
+    ``send_file()``.  Its body is::
+
+        From here on, nothing is parsed.
+        >From the top
+    """
+    return (
+        b"From: alice@example.com\n"
+        b"To: bob@example.com\n"
+        b"Subject: Raw\n"
+        b"\n"
+        b"From here on, nothing is parsed.\n"
+        b">From the top\n"
+    )
@@ -0,0 +1,79 @@
+import asyncio
+from email.message import EmailMessage
+from mailbox import mbox
+from pathlib import Path
+from mailbits import email2dict
+import pytest
+from outgoing import (
+    AsyncSender,
+    ThreadedAsyncSender,
+    from_config_file_async,
+    from_dict_async,
+)
+from outgoing.errors import InvalidConfigError
+from outgoing.senders.async_smtp import AsyncSMTPSender
+from outgoing.senders.mailboxes import MboxSender
+
+
+def test_from_dict_async_threaded(
+    monkeypatch: pytest.MonkeyPatch,
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    sender = from_dict_async(
+        {"method": "mbox", "path": "inbox"},
+        configpath=str(tmp_path / "foo.txt"),
+    )
+    assert isinstance(sender, AsyncSender)
+    assert isinstance(sender, ThreadedAsyncSender)
+    assert isinstance(sender.sender, MboxSender)
+    assert sender.sender.path == tmp_path / "inbox"
+
+    async def main() -> None:
+        async with sender as s:
+            assert s is sender
+            await asyncio.gather(sender.send(test_email1), sender.send(test_email2))
+
+    asyncio.run(main())
+    inbox = mbox("inbox")
+    inbox.lock()
+    msgs = list(inbox)
+    inbox.close()
+    assert len(msgs) == 2
+    assert sorted(m["Subject"] for m in msgs) == ["Meet me", "No."]
+    for m in msgs:
+        msgdict = email2dict(m)
+        msgdict["unixfrom"] = None
+        if m["Subject"] == test_email1["Subject"]:
+            assert email2dict(test_email1) == msgdict
+        else:
+            assert email2dict(test_email2) == msgdict
+
+
+def test_from_dict_async_unknown_method() -> None:
+    with pytest.raises(InvalidConfigError) as excinfo:
+        from_dict_async({"method": "foobar"}, configpath="foo.toml")
+    assert (
+        str(excinfo.value)
+        == "foo.toml: Invalid configuration: Unsupported method 'foobar'"
+    )
+
+
+def test_from_dict_async_missing_method() -> None:
+    with pytest.raises(InvalidConfigError) as excinfo:
+        from_dict_async({})
+    assert (
+        str(excinfo.value)
+        == "Invalid configuration: Required 'method' field not present"
+    )
+
+
+def test_from_config_file_async(tmp_path: Path) -> None:
+    cfg = tmp_path / "foo.toml"
+    cfg.write_text('[outgoing]\nmethod = "smtp"\nhost = "mx.example.com"\n')
+    sender = from_config_file_async(cfg, fallback=False)
+    assert isinstance(sender, AsyncSMTPSender)
+    assert sender.configpath == cfg
+    assert sender.host == "mx.example.com"
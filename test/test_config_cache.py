@@ -0,0 +1,123 @@
+from __future__ import annotations
+from collections.abc import Iterator
+import os
+from pathlib import Path
+import pytest
+from pytest_mock import MockerFixture
+from outgoing import (
+    from_config_file,
+    invalidate_config_cache,
+    set_config_cache_size,
+)
+from outgoing import core
+from outgoing.cache import FileCache
+from outgoing.errors import MissingConfigError
+from outgoing.senders.null import NullSender
+
+CONFIG = (
+    "[outgoing]\n"
+    'method = "null"\n'
+    "\n"
+    "[other]\n"
+    'method = "null"\n'
+)
+
+
+@pytest.fixture(autouse=True)
+def restore_maxsize() -> Iterator[None]:
+    maxsize = core.config_cache.maxsize
+    yield
+    set_config_cache_size(maxsize)
+
+
+def test_config_parsed_once(mocker: MockerFixture, tmp_path: Path) -> None:
+    cfg = tmp_path / "outgoing.toml"
+    cfg.write_text(CONFIG)
+    spy = mocker.spy(core, "toml_load")
+    for section in ["outgoing", "other", "outgoing"]:
+        assert isinstance(from_config_file(cfg, section=section), NullSender)
+    assert spy.call_count == 1
+
+
+def test_config_changed(mocker: MockerFixture, tmp_path: Path) -> None:
+    cfg = tmp_path / "outgoing.toml"
+    cfg.write_text(CONFIG)
+    spy = mocker.spy(core, "toml_load")
+    from_config_file(cfg, section="other")
+    cfg.write_text('[outgoing]\nmethod = "null"\n')
+    with pytest.raises(MissingConfigError):
+        from_config_file(cfg, section="other", fallback=False)
+    assert spy.call_count == 2
+
+
+def test_config_replaced(mocker: MockerFixture, tmp_path: Path) -> None:
+    cfg = tmp_path / "outgoing.toml"
+    cfg.write_text(CONFIG)
+    spy = mocker.spy(core, "toml_load")
+    from_config_file(cfg, section="other")
+    new = tmp_path / "new.toml"
+    new.write_text(CONFIG.replace("[other]", "[third]"))
+    # Give the replacement the same size & mtime so that only the inode
+    # differs
+    st = cfg.stat()
+    os.utime(new, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(new, cfg)
+    with pytest.raises(MissingConfigError):
+        from_config_file(cfg, section="other", fallback=False)
+    assert spy.call_count == 2
+
+
+def test_invalidate_config_cache(mocker: MockerFixture, tmp_path: Path) -> None:
+    cfg = tmp_path / "outgoing.toml"
+    cfg.write_text(CONFIG)
+    spy = mocker.spy(core, "toml_load")
+    from_config_file(cfg)
+    invalidate_config_cache(cfg)
+    from_config_file(cfg)
+    assert spy.call_count == 2
+
+
+def test_config_cache_missing_file(tmp_home: Path) -> None:
+    cfg = tmp_home / "outgoing.toml"
+    with pytest.raises(MissingConfigError):
+        from_config_file(cfg)
+    cfg.write_text(CONFIG)
+    assert isinstance(from_config_file(cfg), NullSender)
+
+
+def test_config_cache_disabled(mocker: MockerFixture, tmp_path: Path) -> None:
+    set_config_cache_size(0)
+    cfg = tmp_path / "outgoing.toml"
+    cfg.write_text(CONFIG)
+    spy = mocker.spy(core, "toml_load")
+    from_config_file(cfg)
+    from_config_file(cfg)
+    assert spy.call_count == 2
+    assert len(core.config_cache) == 0
+
+
+def test_file_cache_lru(tmp_path: Path) -> None:
+    loads: list[str] = []
+
+    def loader(p: Path) -> str:
+        loads.append(p.name)
+        return p.read_text()
+
+    cache = FileCache(loader, maxsize=2)
+    for name in "abc":
+        (tmp_path / name).write_text(name)
+    assert cache.get(tmp_path / "a") == "a"
+    assert cache.get(tmp_path / "b") == "b"
+    assert cache.get(tmp_path / "a") == "a"
+    assert cache.get(tmp_path / "c") == "c"
+    assert len(cache) == 2
+    # "b" was the least recently used, so it should have been evicted:
+    assert cache.get(tmp_path / "a") == "a"
+    assert cache.get(tmp_path / "b") == "b"
+    assert loads == ["a", "b", "c", "b"]
+
+
+def test_file_cache_bad_maxsize() -> None:
+    cache = FileCache(str)
+    with pytest.raises(ValueError):
+        cache.maxsize = -1
@@ -16,6 +16,14 @@ def test_from_default_config_file(tmp_home: Path) -> None:
     assert sender.model_dump() == {
         "configpath": defconf,
         "path": defconf.with_name("inbox"),
+        "locking": "context",
+        "flush_every": None,
+        "flush_interval": None,
+        "rotate_bytes": None,
+        "rotate_messages": None,
+        "rotate_time": None,
+        "rotate_compress": None,
+        "compression": None,
     }
 
 
@@ -31,6 +39,10 @@ def test_from_custom_config_file(tmp_home: Path) -> None:
         "configpath": myconf,
         "path": tmp_home / "dirmail",
         "folder": None,
+        "locking": "context",
+        "flush_every": None,
+        "flush_interval": None,
+        "durability": "per-message",
     }
 
 
@@ -43,6 +55,14 @@ def test_from_nonexistent_custom_config_file(tmp_home: Path) -> None:
     assert sender.model_dump() == {
         "configpath": defconf,
         "path": defconf.with_name("inbox"),
+        "locking": "context",
+        "flush_every": None,
+        "flush_interval": None,
+        "rotate_bytes": None,
+        "rotate_messages": None,
+        "rotate_time": None,
+        "rotate_compress": None,
+        "compression": None,
     }
 
 
@@ -95,6 +115,10 @@ def test_from_custom_json_config_file(tmp_path: Path) -> None:
         "configpath": myconf,
         "path": tmp_path / "dirmail",
         "folder": None,
+        "locking": "context",
+        "flush_every": None,
+        "flush_interval": None,
+        "durability": "per-message",
     }
 
 
@@ -123,6 +147,10 @@ def test_from_custom_section(tmp_path: Path) -> None:
         "configpath": tmp_path / "foo.toml",
         "path": tmp_path / "dirmail",
         "folder": None,
+        "locking": "context",
+        "flush_every": None,
+        "flush_interval": None,
+        "durability": "per-message",
     }
 
 
@@ -141,6 +169,10 @@ def test_from_none_section(tmp_path: Path) -> None:
         "configpath": tmp_path / "foo.toml",
         "path": tmp_path / "dirmail",
         "folder": None,
+        "locking": "context",
+        "flush_every": None,
+        "flush_interval": None,
+        "durability": "per-message",
     }
 
 
@@ -156,6 +188,14 @@ def test_from_no_section_custom_config_file(tmp_home: Path) -> None:
     assert sender.model_dump() == {
         "configpath": defconf,
         "path": defconf.with_name("inbox"),
+        "locking": "context",
+        "flush_every": None,
+        "flush_interval": None,
+        "rotate_bytes": None,
+        "rotate_messages": None,
+        "rotate_time": None,
+        "rotate_compress": None,
+        "compression": None,
     }
 
 
@@ -0,0 +1,113 @@
+from __future__ import annotations
+from pathlib import Path
+import threading
+from typing import Any
+from pytest_mock import MockerFixture
+from outgoing import Sender, get_sender, invalidate_sender_cache
+from outgoing import core
+from outgoing.senders.mailboxes import MboxSender
+from outgoing.senders.null import NullSender
+
+CONFIG = (
+    "[outgoing]\n"
+    'method = "mbox"\n'
+    'path = "inbox"\n'
+    "\n"
+    "[other]\n"
+    'method = "null"\n'
+)
+
+
+def test_get_sender_memoized(mocker: MockerFixture, tmp_path: Path) -> None:
+    cfg = tmp_path / "outgoing.toml"
+    cfg.write_text(CONFIG)
+    spy = mocker.spy(core, "from_dict")
+    sender = get_sender(cfg)
+    assert isinstance(sender, MboxSender)
+    assert sender.path == tmp_path / "inbox"
+    assert get_sender(cfg) is sender
+    assert get_sender(str(cfg)) is sender
+    other = get_sender(cfg, section="other")
+    assert isinstance(other, NullSender)
+    assert get_sender(cfg, section="other") is other
+    assert spy.call_count == 2
+
+
+def test_get_sender_section_unchanged(mocker: MockerFixture, tmp_path: Path) -> None:
+    cfg = tmp_path / "outgoing.toml"
+    cfg.write_text(CONFIG)
+    sender = get_sender(cfg)
+    spy = mocker.spy(core, "from_dict")
+    cfg.write_text(CONFIG.replace('method = "null"', 'method = "null"\n# Comment'))
+    assert get_sender(cfg) is sender
+    assert spy.call_count == 0
+
+
+def test_get_sender_section_changed(tmp_path: Path) -> None:
+    cfg = tmp_path / "outgoing.toml"
+    cfg.write_text(CONFIG)
+    sender = get_sender(cfg)
+    cfg.write_text(CONFIG.replace('"inbox"', '"outbox"'))
+    sender2 = get_sender(cfg)
+    assert sender2 is not sender
+    assert isinstance(sender2, MboxSender)
+    assert sender2.path == tmp_path / "outbox"
+
+
+def test_invalidate_sender_cache(tmp_path: Path) -> None:
+    cfg = tmp_path / "outgoing.toml"
+    cfg.write_text(CONFIG)
+    sender = get_sender(cfg)
+    invalidate_sender_cache()
+    assert get_sender(cfg) is not sender
+
+
+def test_get_sender_threads(mocker: MockerFixture, tmp_path: Path) -> None:
+    cfg = tmp_path / "outgoing.toml"
+    cfg.write_text(CONFIG)
+    spy = mocker.spy(core, "from_dict")
+    senders = []
+
+    def get() -> None:
+        senders.append(get_sender(cfg))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(senders) == 8
+    assert all(s is senders[0] for s in senders)
+    assert spy.call_count >= 1
+    assert get_sender(cfg) is senders[0]
+
+
+def test_get_sender_constructs_unlocked(mocker: MockerFixture, tmp_path: Path) -> None:
+    cfg = tmp_path / "outgoing.toml"
+    cfg.write_text(CONFIG)
+    sender = get_sender(cfg)
+    started = threading.Event()
+    release = threading.Event()
+    from_dict = core.from_dict
+
+    def slow_from_dict(*args: Any, **kwargs: Any) -> Any:
+        started.set()
+        release.wait()
+        return from_dict(*args, **kwargs)
+
+    mocker.patch.object(core, "from_dict", side_effect=slow_from_dict)
+    builder = threading.Thread(target=get_sender, args=(cfg, "other"))
+    builder.start()
+    try:
+        assert started.wait(5)
+        # Getting an already-cached sender doesn't wait for the construction
+        # of another one to finish:
+        results: list[Sender] = []
+        getter = threading.Thread(target=lambda: results.append(get_sender(cfg)))
+        getter.start()
+        getter.join(5)
+        assert results == [sender]
+    finally:
+        release.set()
+        builder.join()
+    assert isinstance(get_sender(cfg, section="other"), NullSender)
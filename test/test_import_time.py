@@ -0,0 +1,61 @@
+from __future__ import annotations
+import subprocess
+import sys
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    sys.implementation.name != "cpython",
+    reason="-X importtime is only supported by CPython",
+)
+
+#: Upper limit, in microseconds, on the cumulative time for a bare ``import
+#: outgoing``.  This is far above what the import actually takes; it exists to
+#: catch eager imports of heavy dependencies creeping back in.
+IMPORT_BUDGET_US = 50_000
+
+
+def import_times(stmt: str) -> dict[str, int]:
+    """
+    Run ``stmt`` in a fresh interpreter with ``-X importtime`` and return a
+    `dict` mapping each module imported to its cumulative import time in
+    microseconds
+    """
+    r = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in r.stderr.splitlines():
+        if line.startswith("import time:"):
+            _, cumulative, module = line[len("import time:") :].split("|")
+            if cumulative.strip().isdigit():
+                times[module.strip()] = int(cumulative)
+    if not times:
+        pytest.fail(f"No -X importtime output from {sys.executable}")
+    return times
+
+
+def test_import_outgoing() -> None:
+    times = import_times("import outgoing")
+    assert times["outgoing"] < IMPORT_BUDGET_US
+    assert not any(
+        mod.startswith(("outgoing.", "pydantic", "platformdirs")) for mod in times
+    )
+
+
+@pytest.mark.parametrize(
+    "stmt",
+    [
+        "import outgoing.__main__",
+        "from outgoing import from_config_file, resolve_password",
+    ],
+)
+def test_deferred_imports(stmt: str) -> None:
+    times = import_times(stmt)
+    for mod in times:
+        assert not mod.startswith(
+            ("asyncio", "dotenv", "keyring", "outgoing.passwords", "outgoing.senders")
+        ), f"{mod} imported eagerly"
@@ -2,7 +2,9 @@ from netrc import NetrcParseError
 from pathlib import Path
 import sys
 import pytest
+from pytest_mock import MockerFixture
 from outgoing import lookup_netrc
+from outgoing import core
 from outgoing.errors import NetrcLookupError
 
 
@@ -69,3 +71,31 @@ def test_lookup_netrc_no_password(tmp_home: Path, username: str | None) -> None:
     with pytest.raises(NetrcLookupError) as excinfo:
         lookup_netrc("api.example.com", username=username)
     assert str(excinfo.value) == "No password given in netrc entry"
+
+
+def test_lookup_netrc_cached(mocker: MockerFixture, tmp_home: Path) -> None:
+    (tmp_home / ".netrc").write_text(
+        "machine api.example.com\nlogin myname\npassword hunter2\n"
+        "machine mx.example.com\nlogin me\npassword 12345\n"
+    )
+    (tmp_home / ".netrc").chmod(0o600)
+    spy = mocker.spy(core, "netrc")
+    assert lookup_netrc("api.example.com") == ("myname", "hunter2")
+    assert lookup_netrc("mx.example.com") == ("me", "12345")
+    assert lookup_netrc("api.example.com", username="myname") == (
+        "myname",
+        "hunter2",
+    )
+    assert spy.call_count == 1
+
+
+def test_lookup_netrc_path_changed(mocker: MockerFixture, tmp_path: Path) -> None:
+    rc = tmp_path / "net.rc"
+    rc.write_text("machine api.example.com\nlogin myname\npassword hunter2\n")
+    spy = mocker.spy(core, "netrc")
+    assert lookup_netrc("api.example.com", path=rc) == ("myname", "hunter2")
+    assert lookup_netrc("api.example.com", path=str(rc)) == ("myname", "hunter2")
+    assert spy.call_count == 1
+    rc.write_text("machine api.example.com\nlogin myname\npassword correcthorse\n")
+    assert lookup_netrc("api.example.com", path=rc) == ("myname", "correcthorse")
+    assert spy.call_count == 2
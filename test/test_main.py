@@ -2,9 +2,12 @@ from email.message import EmailMessage
 from io import BytesIO
 import logging
 from pathlib import Path
+import subprocess
+import sys
 from mailbits import email2dict
 import pytest
 from pytest_mock import MockerFixture
+import outgoing.__main__
 from outgoing import DEFAULT_CONFIG_SECTION, get_default_configpath
 from outgoing.__main__ import Command, main
 
@@ -62,6 +65,17 @@ from outgoing.__main__ import Command, main
                 messages=["-"],
             ),
         ),
+        (
+            ["--warmup"],
+            Command(
+                config=get_default_configpath(),
+                env=None,
+                log_level=logging.INFO,
+                section=DEFAULT_CONFIG_SECTION,
+                messages=["-"],
+                warmup=True,
+            ),
+        ),
     ],
 )
 def test_parse_args(argv: list[str], cmd: Command) -> None:
@@ -228,3 +242,71 @@ def test_main_custom_dotenv(
         mocker.call.send_message(mocker.ANY),
         mocker.call.quit(),
     ]
+
+
+def test_main_mbox_raw(
+    monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture, tmp_path: Path
+) -> None:
+    parse = mocker.spy(outgoing.__main__, "message_from_binary_file")
+    monkeypatch.chdir(tmp_path)
+    Path("cfg.toml").write_text('[outgoing]\nmethod = "mbox"\npath = "inbox"\n')
+    raw = (
+        b"From: alice@example.com\n"
+        b"Subject:   Odd   spacing\n"
+        b"\n"
+        b"From the desk of Alice\n"
+    )
+    Path("msg.eml").write_bytes(raw)
+    assert main(["--config", "cfg.toml", "msg.eml"]) == 0
+    assert parse.call_count == 0
+    content = Path("inbox").read_bytes()
+    assert content.startswith(b"From MAILER-DAEMON ")
+    assert content.split(b"\n", 1)[1] == (
+        b"From: alice@example.com\n"
+        b"Subject:   Odd   spacing\n"
+        b"\n"
+        b">From the desk of Alice\n"
+        b"\n"
+    )
+
+
+def test_main_maildir_from_line(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    Path("cfg.toml").write_text('[outgoing]\nmethod = "maildir"\npath = "inbox"\n')
+    raw = (
+        b"From: alice@example.com\n"
+        b"Subject: Hello\n"
+        b"\n"
+        b"From the desk of Alice\n"
+    )
+    Path("msg.eml").write_bytes(
+        b"From alice@example.com Sat Oct 17 12:34:56 2026\n" + raw
+    )
+    assert main(["--config", "cfg.toml", "msg.eml"]) == 0
+    (path,) = (tmp_path / "inbox" / "new").iterdir()
+    assert path.read_bytes() == raw
+
+
+def test_main_no_mailbox_import(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    # Checking whether the sender is a mailbox sender must not import the
+    # mailbox module for other senders.
+    monkeypatch.chdir(tmp_path)
+    Path("cfg.toml").write_text('[outgoing]\nmethod = "null"\n')
+    Path("msg.eml").write_bytes(b"Subject: Hi\n\nHello\n")
+    r = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from outgoing.__main__ import main\n"
+            "assert main(['--config', 'cfg.toml', 'msg.eml']) == 0\n"
+            "assert 'outgoing.senders.mailboxes' not in sys.modules\n",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert r.returncode == 0, r.stderr
@@ -0,0 +1,118 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any
+import pytest
+from pytest_mock import MockerFixture
+from outgoing import (
+    purge_password_cache,
+    register_password_scheme,
+    resolve_password,
+    set_password_cache,
+)
+from outgoing import core
+from outgoing.cache import SecretCache
+from outgoing.errors import InvalidPasswordError
+
+
+class CountingScheme:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, spec: Any, host: str | None, username: str | None) -> str:
+        self.calls += 1
+        if spec == "missing":
+            raise InvalidPasswordError("No such password")
+        return f"{spec}:{host}:{username}:{self.calls}"
+
+
+@pytest.fixture()
+def scheme(monkeypatch: pytest.MonkeyPatch) -> CountingScheme:
+    monkeypatch.setattr(core.password_scheme_registry, "_registered", {})
+    s = CountingScheme()
+    register_password_scheme("counting", s)
+    return s
+
+
+def test_password_cache_disabled(scheme: CountingScheme) -> None:
+    assert resolve_password({"counting": "x"}, host="h") == "x:h:None:1"
+    assert resolve_password({"counting": "x"}, host="h") == "x:h:None:2"
+    assert scheme.calls == 2
+
+
+def test_password_cache(scheme: CountingScheme, tmp_path: Path) -> None:
+    set_password_cache(60)
+    assert resolve_password({"counting": "x"}, host="h") == "x:h:None:1"
+    assert resolve_password({"counting": "x"}, host="h") == "x:h:None:1"
+    assert resolve_password({"counting": "x"}, host="h2") == "x:h2:None:2"
+    assert resolve_password({"counting": "x"}, host="h", username="u") == "x:h:u:3"
+    assert (
+        resolve_password({"counting": "x"}, host="h", configpath=tmp_path / "a")
+        == "x:h:None:4"
+    )
+    assert resolve_password({"counting": "y"}, host="h") == "y:h:None:5"
+    assert resolve_password({"counting": "x"}, host="h") == "x:h:None:1"
+    assert scheme.calls == 5
+    purge_password_cache()
+    assert resolve_password({"counting": "x"}, host="h") == "x:h:None:6"
+
+
+def test_password_cache_unhashable_spec(scheme: CountingScheme) -> None:
+    set_password_cache(60)
+    spec = {"service": "api", "username": "me"}
+    first = resolve_password({"counting": spec})
+    assert resolve_password({"counting": dict(reversed(spec.items()))}) == first
+    assert scheme.calls == 1
+
+
+def test_password_cache_errors_not_cached(scheme: CountingScheme) -> None:
+    set_password_cache(60)
+    for _ in range(2):
+        with pytest.raises(InvalidPasswordError):
+            resolve_password({"counting": "missing"})
+    assert scheme.calls == 2
+
+
+def test_password_cache_expiry(mocker: MockerFixture, scheme: CountingScheme) -> None:
+    m = mocker.patch("outgoing.cache.time")
+    m.monotonic.return_value = 100.0
+    set_password_cache(30)
+    assert resolve_password({"counting": "x"}) == "x:None:None:1"
+    m.monotonic.return_value = 129.0
+    assert resolve_password({"counting": "x"}) == "x:None:None:1"
+    m.monotonic.return_value = 130.0
+    assert resolve_password({"counting": "x"}) == "x:None:None:2"
+    assert scheme.calls == 2
+
+
+def test_password_cache_maxsize(scheme: CountingScheme) -> None:
+    set_password_cache(60, maxsize=2)
+    resolve_password({"counting": "a"})
+    resolve_password({"counting": "b"})
+    resolve_password({"counting": "a"})
+    resolve_password({"counting": "c"})
+    assert scheme.calls == 3
+    resolve_password({"counting": "a"})
+    assert scheme.calls == 3
+    resolve_password({"counting": "b"})
+    assert scheme.calls == 4
+
+
+def test_password_cache_plain_strings_not_cached() -> None:
+    set_password_cache(60)
+    assert resolve_password("hunter2") == "hunter2"
+    assert core._password_cache is not None
+    assert len(core._password_cache) == 0
+
+
+def test_secret_cache_repr() -> None:
+    cache: SecretCache[str] = SecretCache(60, maxsize=10)
+    cache.put("key", "hunter2")
+    assert cache.get("key") == "hunter2"
+    assert repr(cache) == "SecretCache(ttl=60, maxsize=10, entries=1)"
+    assert "hunter2" not in repr(cache._entries)
+
+
+@pytest.mark.parametrize("ttl,maxsize", [(0, 10), (-1, 10), (60, 0)])
+def test_secret_cache_invalid(ttl: float, maxsize: int) -> None:
+    with pytest.raises(ValueError):
+        SecretCache(ttl, maxsize)
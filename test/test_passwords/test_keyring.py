@@ -103,7 +103,7 @@ def test_keyring_backend_envvar_override(
 
 def test_keyring_default_backend(mocker: MockerFixture) -> None:
     keyring = mocker.MagicMock(**{"get_password.return_value": "hunter2"})
-    get_keyring = mocker.patch("outgoing.passwords.get_keyring", return_value=keyring)
+    get_keyring = mocker.patch("keyring.get_keyring", return_value=keyring)
     assert (
         resolve_password(
             {
@@ -0,0 +1,106 @@
+from __future__ import annotations
+from collections.abc import Iterator
+from email.message import EmailMessage
+import logging
+from typing import Any
+import pytest
+from pytest_mock import MockerFixture
+from outgoing import (
+    from_dict,
+    from_dict_async,
+    refresh_registry,
+    register_password_scheme,
+    register_sender,
+    resolve_password,
+)
+from outgoing import core
+from outgoing.errors import InvalidConfigError, InvalidPasswordError
+from outgoing.senders.null import NullSender
+
+log = logging.getLogger(__name__)
+
+
+class CustomSender(NullSender):
+    greeting: str = "hello"
+
+    def send(self, msg: EmailMessage) -> None:
+        log.info("%s: %s", self.greeting, msg["Subject"])
+
+
+@pytest.fixture(autouse=True)
+def clean_registrations(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    for reg in (core.sender_registry, core.password_scheme_registry):
+        monkeypatch.setattr(reg, "_registered", {})
+    yield
+
+
+def test_entry_points_scanned_once(mocker: MockerFixture) -> None:
+    spy = mocker.spy(core, "entry_points")
+    for _ in range(3):
+        assert isinstance(from_dict({"method": "null"}), NullSender)
+    assert spy.call_count == 1
+    refresh_registry()
+    assert isinstance(from_dict({"method": "null"}), NullSender)
+    assert spy.call_count == 2
+
+
+def test_register_sender(
+    caplog: pytest.LogCaptureFixture, test_email1: EmailMessage
+) -> None:
+    caplog.set_level(logging.INFO, logger=__name__)
+    with pytest.raises(InvalidConfigError):
+        from_dict({"method": "custom"})
+    register_sender("custom", CustomSender)
+    sender = from_dict({"method": "custom", "greeting": "hi"})
+    assert isinstance(sender, CustomSender)
+    sender.send(test_email1)
+    assert caplog.record_tuples == [
+        (__name__, logging.INFO, f"hi: {test_email1['Subject']}")
+    ]
+
+
+def test_register_sender_overrides_entry_point() -> None:
+    register_sender("null", CustomSender)
+    assert isinstance(from_dict({"method": "null"}), CustomSender)
+    refresh_registry()
+    assert isinstance(from_dict({"method": "null"}), CustomSender)
+
+
+def test_register_password_scheme() -> None:
+    def reverse_scheme(spec: Any, host: str | None, **_kwargs: Any) -> str:
+        return f"{spec[::-1]}@{host}"
+
+    register_password_scheme("reverse", reverse_scheme)
+    assert (
+        resolve_password({"reverse": "2retnuh"}, host="api.example.com")
+        == "hunter2@api.example.com"
+    )
+
+
+def test_refresh_registry_clears_scheme_kwargs() -> None:
+    def reverse_scheme(spec: Any, **_kwargs: Any) -> str:
+        return str(spec[::-1])
+
+    register_password_scheme("reverse", reverse_scheme)
+    assert resolve_password({"reverse": "2retnuh"}) == "hunter2"
+    assert core._scheme_kwargs.cache_info().currsize > 0
+    refresh_registry()
+    assert core._scheme_kwargs.cache_info().currsize == 0
+
+
+@pytest.mark.parametrize("method", [["smtp"], {"a": 1}, 42])
+def test_from_dict_non_str_method(method: Any) -> None:
+    with pytest.raises(InvalidConfigError) as excinfo:
+        from_dict({"method": method})
+    assert excinfo.value.details == f"Unsupported method {method!r}"
+
+
+@pytest.mark.parametrize("method", [["smtp"], {"a": 1}])
+def test_from_dict_async_non_str_method(method: Any) -> None:
+    with pytest.raises(InvalidConfigError):
+        from_dict_async({"method": method})
+
+
+def test_resolve_password_non_str_scheme() -> None:
+    with pytest.raises(InvalidPasswordError):
+        resolve_password({("env",): "PASSWORD"})  # type: ignore[dict-item]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+from email.message import EmailMessage
+import logging
+from mailbox import mbox
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+import pytest
+from outgoing import from_dict, send_many
+
+
+class FlakySender:
+    def __init__(self) -> None:
+        self.entered = 0
+        self.sent: list[EmailMessage] = []
+
+    def __enter__(self) -> FlakySender:
+        self.entered += 1
+        return self
+
+    def __exit__(
+        self,
+        _exc_type: type[BaseException] | None,
+        _exc_val: BaseException | None,
+        _exc_tb: TracebackType | None,
+    ) -> None:
+        pass
+
+    def send(self, msg: EmailMessage) -> Any:
+        if msg["Subject"] == "No.":
+            raise ValueError("Rejected")
+        self.sent.append(msg)
+        return len(self.sent)
+
+
+def test_send_many_fallback(
+    test_email1: EmailMessage, test_email2: EmailMessage
+) -> None:
+    sender = FlakySender()
+    results = send_many(sender, [test_email1, test_email2, test_email1])
+    assert results[0] == 1
+    assert isinstance(results[1], ValueError)
+    assert str(results[1]) == "Rejected"
+    assert results[2] == 2
+    assert sender.entered == 1
+    assert sender.sent == [test_email1, test_email1]
+
+
+def test_send_many_mbox(
+    caplog: pytest.LogCaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    caplog.set_level(logging.DEBUG, logger="outgoing")
+    monkeypatch.chdir(tmp_path)
+    sender = from_dict(
+        {"method": "mbox", "path": "inbox"}, configpath=str(tmp_path / "foo.txt")
+    )
+    assert send_many(sender, [test_email1, test_email2]) == [None, None]
+    inbox = mbox("inbox")
+    inbox.lock()
+    assert [m["Subject"] for m in inbox] == ["Meet me", "No."]
+    inbox.close()
+    assert [
+        msg for _, level, msg in caplog.record_tuples if level == logging.DEBUG
+    ] == [
+        f"Opening mbox at {tmp_path / 'inbox'}",
+        f"Closing mbox at {tmp_path / 'inbox'}",
+    ]
@@ -0,0 +1,151 @@
+from __future__ import annotations
+import asyncio
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from pathlib import Path
+import subprocess
+import sys
+import time
+from mailbits import email2dict
+import pytest
+from outgoing import from_dict_async
+from outgoing.senders.async_command import AsyncCommandSender
+from outgoing.senders.command import CommandError
+
+
+def test_async_command_construct(tmp_path: Path) -> None:
+    sender = from_dict_async(
+        {"method": "command", "concurrency": 4, "timeout": 10},
+        configpath=tmp_path / "foo.toml",
+    )
+    assert isinstance(sender, AsyncCommandSender)
+    assert sender.model_dump() == {
+        "configpath": tmp_path / "foo.toml",
+        "command": ["sendmail", "-i", "-t"],
+        "concurrency": 4,
+        "timeout": 10,
+        "output_limit": 65536,
+    }
+
+
+@pytest.mark.parametrize("shell", [False, True])
+def test_async_command_send(
+    shell: bool, test_email1: EmailMessage, tmp_path: Path
+) -> None:
+    outfile = tmp_path / "out.eml"
+    argv = [
+        sys.executable,
+        "-c",
+        "import shutil, sys;"
+        f" shutil.copyfileobj(sys.stdin.buffer, open({str(outfile)!r}, 'wb'));"
+        " print('done', file=sys.stderr)",
+    ]
+    sender = from_dict_async(
+        {
+            "method": "command",
+            "command": subprocess.list2cmdline(argv) if shell else argv,
+        },
+        configpath=tmp_path / "foo.toml",
+    )
+
+    async def main() -> subprocess.CompletedProcess[bytes]:
+        async with sender:
+            r = await sender.send(test_email1)
+            assert isinstance(r, subprocess.CompletedProcess)
+            return r
+
+    r = asyncio.run(main())
+    assert r.returncode == 0
+    assert r.stderr.strip() == b"done"
+    sent = message_from_bytes(outfile.read_bytes(), policy=policy.default)
+    assert email2dict(test_email1) == email2dict(sent)
+
+
+def test_async_command_send_failure(
+    test_email1: EmailMessage, tmp_path: Path
+) -> None:
+    sender = from_dict_async(
+        {
+            "method": "command",
+            "command": [
+                sys.executable,
+                "-c",
+                "import sys; sys.stdin.buffer.read(); sys.exit('oops')",
+            ],
+        },
+        configpath=tmp_path / "foo.toml",
+    )
+    with pytest.raises(CommandError) as excinfo:
+        asyncio.run(sender.send(test_email1))
+    assert excinfo.value.returncode == 1
+    assert excinfo.value.stderr.strip() == b"oops"
+    assert str(excinfo.value).endswith("\noops")
+
+
+def test_async_command_send_timeout(
+    test_email1: EmailMessage, tmp_path: Path
+) -> None:
+    sender = from_dict_async(
+        {
+            "method": "command",
+            "command": [sys.executable, "-c", "import time; time.sleep(30)"],
+            "timeout": 0.5,
+        },
+        configpath=tmp_path / "foo.toml",
+    )
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(sender.send(test_email1))
+
+
+def test_async_command_concurrency(test_email1: EmailMessage, tmp_path: Path) -> None:
+    sender = from_dict_async(
+        {
+            "method": "command",
+            "command": [
+                sys.executable,
+                "-c",
+                "import sys, time; sys.stdin.buffer.read(); time.sleep(1)",
+            ],
+            "concurrency": 4,
+        },
+        configpath=tmp_path / "foo.toml",
+    )
+
+    async def main() -> None:
+        await asyncio.gather(*(sender.send(test_email1) for _ in range(4)))
+
+    start = time.monotonic()
+    asyncio.run(main())
+    # Run one at a time, the commands would take at least 4 seconds.
+    assert time.monotonic() - start < 3
+
+
+def test_async_command_send_large(test_email1: EmailMessage, tmp_path: Path) -> None:
+    test_email1.set_content("A line of text that is repeated.\n" * 100_000)
+    sender = from_dict_async(
+        {
+            "method": "command",
+            "command": [
+                sys.executable,
+                "-c",
+                "import shutil, sys;"
+                " shutil.copyfileobj(sys.stdin.buffer, sys.stdout.buffer)",
+            ],
+            "output_limit": 1000,
+        },
+        configpath=tmp_path / "foo.toml",
+    )
+    r = asyncio.run(sender.send(test_email1))
+    assert r.stdout == bytes(test_email1)[-1000:]
+
+
+def test_async_command_send_ignores_input(
+    test_email1: EmailMessage, tmp_path: Path
+) -> None:
+    test_email1.set_content("A line of text that is repeated.\n" * 100_000)
+    sender = from_dict_async(
+        {"method": "command", "command": [sys.executable, "-c", "pass"]},
+        configpath=tmp_path / "foo.toml",
+    )
+    r = asyncio.run(sender.send(test_email1))
+    assert r.returncode == 0
@@ -0,0 +1,220 @@
+from __future__ import annotations
+import asyncio
+from email.message import EmailMessage
+from pathlib import Path
+import smtplib
+from mailbits import email2dict
+from pydantic import SecretStr
+import pytest
+from pytest_mock import MockerFixture
+from smtpdfix import AuthController
+from outgoing import AsyncSender, from_dict_async
+from outgoing.senders.async_smtp import (
+    AsyncSMTPClient,
+    AsyncSMTPPoolSender,
+    AsyncSMTPSender,
+)
+
+smtpdfix_headers = ["x-mailfrom", "x-peer", "x-rcptto"]
+
+
+def assert_received(smtpd: AuthController, *msgs: EmailMessage) -> None:
+    assert len(smtpd.messages) == len(msgs)
+    for received, msg in zip(smtpd.messages, msgs):
+        msgdict = email2dict(received)
+        for h in smtpdfix_headers:
+            msgdict["headers"].pop(h, None)
+        assert email2dict(msg) == msgdict
+
+
+def test_async_smtp_construct(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("MY_PASSWORD", "hunter2")
+    sender = from_dict_async(
+        {
+            "method": "smtp",
+            "host": "mx.example.com",
+            "ssl": "starttls",
+            "username": "me",
+            "password": {"env": "MY_PASSWORD"},
+        },
+        configpath=str(tmp_path / "foo.txt"),
+    )
+    assert isinstance(sender, AsyncSender)
+    assert isinstance(sender, AsyncSMTPSender)
+    assert sender.model_dump() == {
+        "configpath": tmp_path / "foo.txt",
+        "host": "mx.example.com",
+        "username": "me",
+        "password": SecretStr("hunter2"),
+        "port": 587,
+        "ssl": "starttls",
+        "netrc": False,
+        "ssl_verify": False,
+        "ssl_cafile": None,
+        "ssl_certfile": None,
+        "ssl_keyfile": None,
+        "ssl_ciphers": None,
+    }
+    assert sender._client is None
+
+
+def test_async_smtp_pool_construct() -> None:
+    sender = from_dict_async(
+        {"method": "smtp-pool", "host": "mx.example.com", "pool_size": 2}
+    )
+    assert isinstance(sender, AsyncSMTPPoolSender)
+    assert sender.pool_size == 2
+
+
+def test_async_smtp_send_no_ssl_no_auth(
+    smtpd: AuthController, test_email1: EmailMessage, test_email2: EmailMessage
+) -> None:
+    sender = from_dict_async(
+        {"method": "smtp", "host": smtpd.hostname, "port": smtpd.port}
+    )
+
+    async def main() -> None:
+        async with sender:
+            await sender.send(test_email1)
+            await sender.send(test_email2)
+
+    asyncio.run(main())
+    assert_received(smtpd, test_email1, test_email2)
+
+
+def test_async_smtp_send_no_ssl_auth(
+    smtpd: AuthController, test_email1: EmailMessage
+) -> None:
+    smtpd.config.enforce_auth = True
+    smtpd.config.auth_require_tls = False
+    smtpd.config.login_username = "luser"
+    smtpd.config.login_password = "hunter2"
+    sender = from_dict_async(
+        {
+            "method": "smtp",
+            "host": smtpd.hostname,
+            "port": smtpd.port,
+            "username": "luser",
+            "password": "hunter2",
+        }
+    )
+
+    async def main() -> None:
+        async with sender:
+            await sender.send(test_email1)
+
+    asyncio.run(main())
+    assert_received(smtpd, test_email1)
+
+
+def test_async_smtp_send_starttls_auth(
+    smtpd: AuthController, test_email1: EmailMessage
+) -> None:
+    smtpd.config.use_starttls = True
+    smtpd.config.enforce_auth = True
+    smtpd.config.login_username = "luser"
+    smtpd.config.login_password = "hunter2"
+    sender = from_dict_async(
+        {
+            "method": "smtp",
+            "host": smtpd.hostname,
+            "port": smtpd.port,
+            "username": "luser",
+            "password": "hunter2",
+            "ssl": "starttls",
+        }
+    )
+
+    async def main() -> None:
+        async with sender:
+            await sender.send(test_email1)
+
+    asyncio.run(main())
+    assert_received(smtpd, test_email1)
+
+
+def test_async_smtp_send_concurrent_no_context(
+    smtpd: AuthController, test_email1: EmailMessage
+) -> None:
+    sender = from_dict_async(
+        {"method": "smtp", "host": smtpd.hostname, "port": smtpd.port}
+    )
+
+    async def main() -> None:
+        await asyncio.gather(*(sender.send(test_email1) for _ in range(5)))
+
+    asyncio.run(main())
+    assert_received(smtpd, *[test_email1] * 5)
+
+
+def test_async_smtp_pool_send(
+    smtpd: AuthController, test_email1: EmailMessage
+) -> None:
+    sender = from_dict_async(
+        {
+            "method": "smtp-pool",
+            "host": smtpd.hostname,
+            "port": smtpd.port,
+            "pool_size": 2,
+        }
+    )
+    assert isinstance(sender, AsyncSMTPPoolSender)
+
+    async def main() -> None:
+        async with sender:
+            await asyncio.gather(*(sender.send(test_email1) for _ in range(5)))
+            assert 1 <= len(sender._idle) <= 2
+
+    asyncio.run(main())
+    assert_received(smtpd, *[test_email1] * 5)
+
+
+def test_async_smtp_pool_refused_keeps_connection(
+    mocker: MockerFixture,
+    smtpd: AuthController,
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+) -> None:
+    sender = from_dict_async(
+        {
+            "method": "smtp-pool",
+            "host": smtpd.hostname,
+            "port": smtpd.port,
+            "pool_size": 1,
+        }
+    )
+    assert isinstance(sender, AsyncSMTPPoolSender)
+    real_send = AsyncSMTPClient.send_message
+    calls = 0
+
+    async def send_message(
+        self: AsyncSMTPClient, msg: EmailMessage
+    ) -> dict[str, tuple[int, bytes]]:
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise smtplib.SMTPRecipientsRefused({"bob@example.com": (550, b"No")})
+        return await real_send(self, msg)
+
+    mocker.patch.object(AsyncSMTPClient, "send_message", send_message)
+
+    async def main() -> None:
+        async with sender:
+            await sender.send(test_email1)
+            ((client, _),) = sender._idle
+            with pytest.raises(smtplib.SMTPRecipientsRefused):
+                await sender.send(test_email2)
+            assert [c for c, _ in sender._idle] == [client]
+            await sender.send(test_email2)
+            assert [c for c, _ in sender._idle] == [client]
+
+    asyncio.run(main())
+    assert_received(smtpd, test_email1, test_email2)
+
+
+def test_async_smtp_close_unopened() -> None:
+    sender = from_dict_async({"method": "smtp", "host": "mx.example.com"})
+    assert isinstance(sender, AsyncSMTPSender)
+    with pytest.raises(ValueError) as excinfo:
+        asyncio.run(sender.close())
+    assert str(excinfo.value) == "AsyncSMTPSender is not open"
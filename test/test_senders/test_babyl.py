@@ -1,11 +1,14 @@
+from __future__ import annotations
 from email.message import EmailMessage
+import io
 import logging
-from mailbox import Babyl
+from mailbox import Babyl, BabylMessage
 from pathlib import Path
+from typing import Callable
 from mailbits import email2dict
 import pytest
 from outgoing import Sender, from_dict
-from outgoing.senders.mailboxes import BabylSender
+from outgoing.senders.mailboxes import BabylSender, MailboxSender
 
 
 def test_babyl_construct(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
@@ -22,6 +25,9 @@ def test_babyl_construct(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Non
     assert sender.model_dump() == {
         "configpath": tmp_path / "foo.txt",
         "path": tmp_path / "inbox",
+        "locking": "context",
+        "flush_every": None,
+        "flush_interval": None,
     }
     assert sender._mbox is None
 
@@ -132,3 +138,86 @@ def test_babyl_close_unopened(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -
     with pytest.raises(ValueError) as excinfo:
         sender.close()
     assert str(excinfo.value) == "Mailbox is not open"
+
+
+def messages(path: Path) -> list[BabylMessage]:
+    box = Babyl(path)
+    try:
+        return list(box)
+    finally:
+        box.close()
+
+
+def test_babyl_locking_message(
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("babyl", locking="message")
+    with sender:
+        sender.send(test_email1)
+        sender.send(test_email2)
+    msgs = messages(tmp_path / "inbox")
+    assert [m["Subject"] for m in msgs] == ["Meet me", "No."]
+
+
+def test_babyl_send_bytes(
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("babyl")
+    with sender:
+        sender.send(test_email1)
+        sender.send_bytes(raw_email)
+    msgs = messages(tmp_path / "inbox")
+    assert [m["Subject"] for m in msgs] == ["Meet me", "Raw"]
+    assert msgs[1].get_payload() == "From here on, nothing is parsed.\n>From the top\n"
+
+
+def test_babyl_send_file(
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    src = tmp_path / "msg.eml"
+    src.write_bytes(raw_email)
+    sender = make_sender("babyl")
+    with src.open("rb") as fp:
+        sender.send_file(fp)
+    sender.send(test_email1)
+    msgs = messages(tmp_path / "inbox")
+    assert [m["Subject"] for m in msgs] == ["Raw", "Meet me"]
+    assert msgs[0].get_payload() == "From here on, nothing is parsed.\n>From the top\n"
+
+
+def test_babyl_send_entry_points_agree(
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    test_email1.set_content("From the top\nFrom the bottom\n")
+    data = bytes(test_email1)
+    make_sender("babyl", path=str(tmp_path / "0")).send(test_email1)
+    make_sender("babyl", path=str(tmp_path / "1")).send_bytes(data)
+    make_sender("babyl", path=str(tmp_path / "2")).send_file(io.BytesIO(data))
+    content = (tmp_path / "0").read_bytes()
+    assert (tmp_path / "1").read_bytes() == content
+    assert (tmp_path / "2").read_bytes() == content
+
+
+def test_babyl_send_raw_from_line(
+    make_sender: Callable[..., MailboxSender], raw_email: bytes, tmp_path: Path
+) -> None:
+    data = b"From alice@example.com Sat Oct 17 12:34:56 2026\n" + raw_email
+    sender = make_sender("babyl")
+    sender.send_bytes(data)
+    sender.send_file(io.BytesIO(data))
+    assert b"From alice@" not in (tmp_path / "inbox").read_bytes()
+    assert [m["From"] for m in messages(tmp_path / "inbox")] == [
+        "alice@example.com",
+        "alice@example.com",
+    ]
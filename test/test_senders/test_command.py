@@ -1,12 +1,24 @@
 from __future__ import annotations
 from email.message import EmailMessage
 import logging
+from mailbox import mbox
 from pathlib import Path
+import shlex
 import subprocess
+import sys
+import threading
+from typing import Any
+from mailbits import email2dict
 import pytest
 from pytest_mock import MockerFixture
-from outgoing import Sender, from_dict
-from outgoing.senders.command import CommandSender
+from outgoing import Sender, from_dict, send_many
+from outgoing.errors import UnsupportedEmailError
+from outgoing.senders.command import (
+    CommandError,
+    CommandRejectedError,
+    CommandSender,
+    TailBuffer,
+)
 
 
 def test_command_construct_default(tmp_path: Path) -> None:
@@ -16,6 +28,12 @@ def test_command_construct_default(tmp_path: Path) -> None:
     assert sender.model_dump() == {
         "configpath": tmp_path / "foo.toml",
         "command": ["sendmail", "-i", "-t"],
+        "batch_command": None,
+        "concurrency": 1,
+        "timeout": None,
+        "output_limit": 65536,
+        "persistent": False,
+        "framing": "length",
     }
 
 
@@ -30,40 +48,46 @@ def test_command_construct(command: str | list[str], tmp_path: Path) -> None:
     assert sender.model_dump() == {
         "configpath": tmp_path / "foo.toml",
         "command": command,
+        "batch_command": None,
+        "concurrency": 1,
+        "timeout": None,
+        "output_limit": 65536,
+        "persistent": False,
+        "framing": "length",
     }
 
 
-@pytest.mark.parametrize(
-    "command,shell",
-    [
-        ("~/my/command --option", True),
-        (["~/my/command", "--option"], False),
-    ],
-)
+def copy_stdin_command(outfile: Path, shell: bool) -> str | list[str]:
+    """
+    Return a command that copies its stdin to ``outfile``, either as a string
+    for the shell or as a list of arguments
+    """
+    argv = [
+        sys.executable,
+        "-c",
+        "import shutil, sys;"
+        f" shutil.copyfileobj(sys.stdin.buffer, open({str(outfile)!r}, 'wb'))",
+    ]
+    return shlex.join(argv) if shell else argv
+
+
+@pytest.mark.parametrize("shell", [False, True])
 def test_command_send(
     caplog: pytest.LogCaptureFixture,
-    command: str | list[str],
     shell: bool,
-    mocker: MockerFixture,
     test_email1: EmailMessage,
     tmp_path: Path,
 ) -> None:
     caplog.set_level(logging.DEBUG, logger="outgoing")
-    m = mocker.patch("subprocess.run")
+    outfile = tmp_path / "out.eml"
+    command = copy_stdin_command(outfile, shell)
     sender = from_dict(
         {"method": "command", "command": command}, configpath=tmp_path / "foo.toml"
     )
     with sender as s:
         assert sender is s
         sender.send(test_email1)
-    m.assert_called_once_with(
-        command,
-        shell=shell,
-        input=bytes(test_email1),
-        check=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
+    assert outfile.read_bytes() == bytes(test_email1)
     assert caplog.record_tuples == [
         (
             "outgoing.senders.command",
@@ -73,30 +97,395 @@ def test_command_send(
     ]
 
 
-@pytest.mark.parametrize(
-    "command,shell",
-    [
-        ("~/my/command --option", True),
-        (["~/my/command", "--option"], False),
-    ],
-)
+@pytest.mark.parametrize("shell", [False, True])
 def test_command_send_no_context(
-    command: str | list[str],
-    shell: bool,
+    shell: bool, test_email1: EmailMessage, tmp_path: Path
+) -> None:
+    outfile = tmp_path / "out.eml"
+    sender = from_dict(
+        {"method": "command", "command": copy_stdin_command(outfile, shell)},
+        configpath=tmp_path / "foo.toml",
+    )
+    sender.send(test_email1)
+    assert outfile.read_bytes() == bytes(test_email1)
+
+
+def test_command_send_many(
     mocker: MockerFixture,
     test_email1: EmailMessage,
+    test_email2: EmailMessage,
     tmp_path: Path,
 ) -> None:
-    m = mocker.patch("subprocess.run")
+    m = mocker.patch.object(
+        CommandSender,
+        "send",
+        side_effect=[None, subprocess.CalledProcessError(1, "cmd"), None],
+    )
     sender = from_dict(
-        {"method": "command", "command": command}, configpath=tmp_path / "foo.toml"
+        {"method": "command", "command": ["mysendmail"]},
+        configpath=tmp_path / "foo.toml",
     )
-    sender.send(test_email1)
-    m.assert_called_once_with(
-        command,
-        shell=shell,
-        input=bytes(test_email1),
-        check=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
+    results = send_many(sender, [test_email1, test_email2, test_email1])
+    assert results[0] is None
+    assert isinstance(results[1], subprocess.CalledProcessError)
+    assert results[2] is None
+    assert m.call_count == 3
+
+
+def test_command_send_many_batch(
+    caplog: pytest.LogCaptureFixture,
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    caplog.set_level(logging.DEBUG, logger="outgoing")
+    outfile = tmp_path / "out.mbox"
+    sender = from_dict(
+        {
+            "method": "command",
+            "batch_command": [
+                sys.executable,
+                "-c",
+                "import shutil, sys;"
+                f" shutil.copyfileobj(sys.stdin.buffer, open({str(outfile)!r}, 'wb'))",
+            ],
+        },
+        configpath=tmp_path / "foo.toml",
+    )
+    assert isinstance(sender, CommandSender)
+    assert send_many(sender, [test_email1, test_email2]) == [None, None]
+    inbox = mbox(outfile)
+    msgs = list(inbox)
+    inbox.close()
+    assert len(msgs) == 2
+    for m, expected in zip(msgs, [test_email1, test_email2]):
+        msgdict = email2dict(m)
+        msgdict["unixfrom"] = None
+        assert email2dict(expected) == msgdict
+    assert caplog.record_tuples == [
+        (
+            "outgoing.senders.command",
+            logging.INFO,
+            f"Sending 2 e-mail(s) via batch command {sender.batch_command!r}",
+        )
+    ]
+
+
+def test_command_send_many_batch_failure(
+    test_email1: EmailMessage, test_email2: EmailMessage, tmp_path: Path
+) -> None:
+    sender = from_dict(
+        {"method": "command", "batch_command": [sys.executable, "-c", "exit(1)"]},
+        configpath=tmp_path / "foo.toml",
+    )
+    results = send_many(sender, [test_email1, test_email2])
+    assert len(results) == 2
+    assert isinstance(results[0], subprocess.CalledProcessError)
+    assert results[0] is results[1]
+
+
+def test_command_send_result(test_email1: EmailMessage, tmp_path: Path) -> None:
+    sender = from_dict(
+        {
+            "method": "command",
+            "command": [
+                sys.executable,
+                "-c",
+                "import sys; sys.stdin.buffer.read(); print('queued');"
+                " print('warning', file=sys.stderr)",
+            ],
+        },
+        configpath=tmp_path / "foo.toml",
+    )
+    r = sender.send(test_email1)
+    assert isinstance(r, subprocess.CompletedProcess)
+    assert r.returncode == 0
+    assert r.stdout.strip() == b"queued"
+    assert r.stderr.strip() == b"warning"
+
+
+def test_command_send_timeout(test_email1: EmailMessage, tmp_path: Path) -> None:
+    sender = from_dict(
+        {
+            "method": "command",
+            "command": [sys.executable, "-c", "import time; time.sleep(30)"],
+            "timeout": 0.5,
+        },
+        configpath=tmp_path / "foo.toml",
+    )
+    with pytest.raises(subprocess.TimeoutExpired):
+        sender.send(test_email1)
+
+
+def test_command_send_many_concurrent(
+    mocker: MockerFixture,
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    # Each call waits until three calls are running at once, so the test only
+    # passes if the commands are actually run concurrently.
+    barrier = threading.Barrier(3, timeout=5)
+
+    def send(msg: EmailMessage) -> Any:
+        barrier.wait()
+        if msg["Subject"] == "No.":
+            raise subprocess.CalledProcessError(75, "cmd", stderr=b"deferred")
+        return subprocess.CompletedProcess("cmd", 0, b"", b"")
+
+    m = mocker.patch.object(CommandSender, "send", side_effect=send)
+    sender = from_dict(
+        {"method": "command", "command": ["mysendmail"], "concurrency": 3},
+        configpath=tmp_path / "foo.toml",
+    )
+    results = send_many(sender, [test_email1, test_email2, test_email1])
+    assert m.call_count == 3
+    assert isinstance(results[0], subprocess.CompletedProcess)
+    assert isinstance(results[1], subprocess.CalledProcessError)
+    assert results[1].returncode == 75
+    assert results[1].stderr == b"deferred"
+    assert isinstance(results[2], subprocess.CompletedProcess)
+
+
+def test_command_send_large(test_email1: EmailMessage, tmp_path: Path) -> None:
+    # Larger than a pipe's buffer, with output to match, to check that
+    # writing the input & reading the output don't deadlock
+    test_email1.set_content("A line of text that is repeated.\n" * 100_000)
+    sender = from_dict(
+        {
+            "method": "command",
+            "command": [
+                sys.executable,
+                "-c",
+                "import shutil, sys;"
+                " shutil.copyfileobj(sys.stdin.buffer, sys.stdout.buffer)",
+            ],
+            "output_limit": 1000,
+        },
+        configpath=tmp_path / "foo.toml",
+    )
+    r = sender.send(test_email1)
+    assert r.stdout == bytes(test_email1)[-1000:]
+
+
+def test_command_send_failure_tail(test_email1: EmailMessage, tmp_path: Path) -> None:
+    sender = from_dict(
+        {
+            "method": "command",
+            "command": [
+                sys.executable,
+                "-c",
+                "import sys\n"
+                "for i in range(1000):\n"
+                "    print(f'Problem #{i}', file=sys.stderr)\n"
+                "sys.exit(75)\n",
+            ],
+            "output_limit": 30,
+        },
+        configpath=tmp_path / "foo.toml",
+    )
+    with pytest.raises(CommandError) as excinfo:
+        sender.send(test_email1)
+    assert isinstance(excinfo.value, subprocess.CalledProcessError)
+    assert excinfo.value.returncode == 75
+    stderr = excinfo.value.stderr.replace(b"\r\n", b"\n")
+    assert stderr.endswith(b"Problem #998\nProblem #999\n")
+    assert len(excinfo.value.stderr) == 30
+    assert str(excinfo.value).endswith("\nProblem #998\nProblem #999")
+
+
+def test_command_send_ignores_input(test_email1: EmailMessage, tmp_path: Path) -> None:
+    test_email1.set_content("A line of text that is repeated.\n" * 100_000)
+    sender = from_dict(
+        {"method": "command", "command": [sys.executable, "-c", "pass"]},
+        configpath=tmp_path / "foo.toml",
+    )
+    r = sender.send(test_email1)
+    assert r.returncode == 0
+
+
+def test_tail_buffer() -> None:
+    buf = TailBuffer(5)
+    buf.write(b"abc")
+    assert buf.getvalue() == b"abc"
+    buf.write(b"defg")
+    assert buf.getvalue() == b"cdefg"
+    buf.write(b"0123456789")
+    assert buf.getvalue() == b"56789"
+    assert buf.total == 17
+
+
+#: A script for a persistent command that reads framed e-mails from stdin,
+#: appends each one to the mbox given as its first argument, and acknowledges
+#: them.  E-mails with an ``X-Test: reject`` header are rejected, and an
+#: ``X-Test: die`` header makes the script exit without replying.
+PERSISTENT_SCRIPT = r"""
+import mailbox, os, sys
+from email import message_from_bytes, policy
+framing, path = sys.argv[1:]
+fin = sys.stdin.buffer
+pending = b""
+while True:
+    if framing == "length":
+        line = fin.readline()
+        if not line:
+            break
+        data = fin.read(int(line))
+    else:
+        while b"\0" not in pending:
+            chunk = os.read(fin.fileno(), 65536)
+            if not chunk:
+                sys.exit(0)
+            pending += chunk
+        data, _, pending = pending.partition(b"\0")
+    msg = message_from_bytes(data, policy=policy.default)
+    if msg["X-Test"] == "die":
+        print("dying", file=sys.stderr, flush=True)
+        sys.exit(3)
+    elif msg["X-Test"] == "reject":
+        print("error: go away", flush=True)
+    else:
+        box = mailbox.mbox(path)
+        box.add(msg)
+        box.close()
+        print(f"OK pid={os.getpid()}", flush=True)
+"""
+
+
+def read_subjects(path: Path) -> list[str]:
+    box = mbox(path)
+    try:
+        return [msg["Subject"] for msg in box]
+    finally:
+        box.close()
+
+
+def persistent_sender(
+    tmp_path: Path, framing: str = "length", **kwargs: Any
+) -> CommandSender:
+    sender = from_dict(
+        {
+            "method": "command",
+            "command": [
+                sys.executable,
+                "-c",
+                PERSISTENT_SCRIPT,
+                framing,
+                str(tmp_path / "inbox"),
+            ],
+            "persistent": True,
+            "framing": framing,
+            **kwargs,
+        },
+        configpath=tmp_path / "foo.toml",
+    )
+    assert isinstance(sender, CommandSender)
+    return sender
+
+
+@pytest.mark.parametrize("framing", ["length", "nul"])
+def test_command_persistent(
+    framing: str,
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = persistent_sender(tmp_path, framing)
+    with sender:
+        r1 = sender.send(test_email1)
+        r2 = sender.send(test_email2)
+    assert r1.startswith("OK pid=")
+    assert r1 == r2
+    assert sender._process is None
+    box = mbox(tmp_path / "inbox")
+    msgdicts = [email2dict(msg) for msg in box]
+    box.close()
+    for md in msgdicts:
+        md["unixfrom"] = None
+    assert msgdicts == [email2dict(test_email1), email2dict(test_email2)]
+
+
+def test_command_persistent_send_many(
+    test_email1: EmailMessage, test_email2: EmailMessage, tmp_path: Path
+) -> None:
+    sender = persistent_sender(tmp_path)
+    with sender:
+        results = send_many(sender, [test_email1, test_email2, test_email1])
+    assert len(set(results)) == 1
+    assert read_subjects(tmp_path / "inbox") == ["Meet me", "No.", "Meet me"]
+
+
+def test_command_persistent_no_context(
+    test_email1: EmailMessage, test_email2: EmailMessage, tmp_path: Path
+) -> None:
+    sender = persistent_sender(tmp_path)
+    r1 = sender.send(test_email1)
+    assert sender._process is None
+    r2 = sender.send(test_email2)
+    assert r1 != r2
+    assert read_subjects(tmp_path / "inbox") == ["Meet me", "No."]
+
+
+def test_command_persistent_rejected(
+    test_email1: EmailMessage, tmp_path: Path
+) -> None:
+    sender = persistent_sender(tmp_path)
+    with sender:
+        test_email1["X-Test"] = "reject"
+        with pytest.raises(CommandRejectedError) as excinfo:
+            sender.send(test_email1)
+        assert excinfo.value.reply == "error: go away"
+        assert str(excinfo.value) == "Command rejected e-mail: error: go away"
+        del test_email1["X-Test"]
+        sender.send(test_email1)
+    assert read_subjects(tmp_path / "inbox") == ["Meet me"]
+
+
+def test_command_persistent_restart(
+    caplog: pytest.LogCaptureFixture,
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    caplog.set_level(logging.INFO, logger="outgoing.senders.command")
+    sender = persistent_sender(tmp_path)
+    with sender:
+        r1 = sender.send(test_email1)
+        test_email2["X-Test"] = "die"
+        with pytest.raises(CommandError) as excinfo:
+            sender.send(test_email2)
+        assert excinfo.value.returncode == 3
+        assert excinfo.value.stderr.strip() == b"dying"
+        del test_email2["X-Test"]
+        r2 = sender.send(test_email2)
+    assert r1 != r2
+    assert "exited with status 3; restarting" in caplog.text
+    assert read_subjects(tmp_path / "inbox") == ["Meet me", "No."]
+
+
+def test_command_persistent_timeout(test_email1: EmailMessage, tmp_path: Path) -> None:
+    sender = from_dict(
+        {
+            "method": "command",
+            "command": [sys.executable, "-c", "import time; time.sleep(30)"],
+            "persistent": True,
+            "timeout": 0.5,
+        },
+        configpath=tmp_path / "foo.toml",
     )
+    assert isinstance(sender, CommandSender)
+    with sender:
+        with pytest.raises(subprocess.TimeoutExpired):
+            sender.send(test_email1)
+        assert sender._process is None
+
+
+def test_command_persistent_nul_unsupported(
+    test_email1: EmailMessage, tmp_path: Path
+) -> None:
+    test_email1.set_content(b"Null\0byte", "application", "octet-stream", cte="8bit")
+    sender = persistent_sender(tmp_path, "nul")
+    with sender:
+        with pytest.raises(UnsupportedEmailError):
+            sender.send(test_email1)
+    assert not (tmp_path / "inbox").exists()
@@ -1,12 +1,28 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from email.message import EmailMessage
+import io
 import logging
 from mailbox import Maildir
 from operator import itemgetter
+import os
 from pathlib import Path
+import re
+import socket
+import time
+from typing import Callable
+from unittest.mock import MagicMock
 from mailbits import email2dict
 import pytest
+from pytest_mock import MockerFixture
 from outgoing import Sender, from_dict
-from outgoing.senders.mailboxes import MaildirSender
+from outgoing.errors import InvalidConfigError
+from outgoing.senders import mailboxes
+from outgoing.senders.mailboxes import (
+    MailboxSender,
+    MaildirSender,
+    _AppendOnlyMaildir,
+)
 
 
 @pytest.mark.parametrize("folder", [None, "work"])
@@ -28,6 +44,10 @@ def test_maildir_construct(
         "configpath": tmp_path / "foo.txt",
         "path": tmp_path / "inbox",
         "folder": folder,
+        "locking": "context",
+        "flush_every": None,
+        "flush_interval": None,
+        "durability": "per-message",
     }
     assert sender._mbox is None
 
@@ -233,3 +253,281 @@ def test_maildir_close_unopened(
     with pytest.raises(ValueError) as excinfo:
         sender.close()
     assert str(excinfo.value) == "Mailbox is not open"
+
+
+@pytest.mark.parametrize("durability", ["none", "per-message", "group"])
+def test_maildir_send_threaded(
+    durability: str, test_email1: EmailMessage, tmp_path: Path
+) -> None:
+    sender = from_dict(
+        {
+            "method": "maildir",
+            "path": str(tmp_path / "inbox"),
+            "durability": durability,
+            "flush_every": 7,
+        }
+    )
+    msgs = []
+    for i in range(200):
+        msg = EmailMessage()
+        msg["Subject"] = f"Message {i}"
+        msg.set_content(test_email1.get_content())
+        msgs.append(msg)
+    with sender, ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(sender.send, msgs))
+    assert os.listdir(tmp_path / "inbox" / "tmp") == []
+    inbox = Maildir(tmp_path / "inbox")
+    assert sorted(m["Subject"] for m in inbox) == sorted(
+        m["Subject"] for m in msgs
+    )
+
+
+def test_maildir_naming(test_email1: EmailMessage, tmp_path: Path) -> None:
+    sender = from_dict({"method": "maildir", "path": str(tmp_path / "inbox")})
+    sender.send(test_email1)
+    (name,) = os.listdir(tmp_path / "inbox" / "new")
+    hostname = socket.gethostname().replace("/", r"\057").replace(":", r"\072")
+    assert re.fullmatch(
+        rf"\d+\.M\d+P{os.getpid()}Q\d+\.{re.escape(hostname)}", name
+    )
+
+
+def test_maildir_naming_clash(
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    clock = mocker.patch("outgoing.senders.mailboxes.time")
+    clock.time.return_value = 1234567890.5
+    monkeypatch.setattr(mailboxes, "_maildir_seq", iter([5, 5, 6]))
+    sender = from_dict({"method": "maildir", "path": str(tmp_path / "inbox")})
+    with sender:
+        sender.send(test_email1)
+        # Simulate the first file still being in tmp/ when the next name is
+        # generated
+        (name,) = os.listdir(tmp_path / "inbox" / "new")
+        (tmp_path / "inbox" / "tmp" / name).touch()
+        sender.send(test_email1)
+    (tmp_path / "inbox" / "tmp" / name).unlink()
+    assert sorted(
+        re.sub(r"\..*", "", n.split("P", 1)[1])
+        for n in os.listdir(tmp_path / "inbox" / "new")
+    ) == [f"{os.getpid()}Q5", f"{os.getpid()}Q6"]
+
+
+def test_maildir_add_bytes(test_email1: EmailMessage, tmp_path: Path) -> None:
+    box = _AppendOnlyMaildir(str(tmp_path / "inbox"), "per-message")
+    key = box.add_bytes(bytes(test_email1))
+    inbox = Maildir(tmp_path / "inbox")
+    assert email2dict(inbox[key]) == email2dict(test_email1)
+
+
+def test_maildir_send_looks_up_folder_once(
+    mocker: MockerFixture, test_email1: EmailMessage, tmp_path: Path
+) -> None:
+    get_folder = mocker.spy(Maildir, "get_folder")
+    sender = from_dict(
+        {"method": "maildir", "path": str(tmp_path / "inbox"), "folder": "work"}
+    )
+    sender.send(test_email1)
+    sender.send(test_email1)
+    assert get_folder.call_count == 1
+    assert len(Maildir(tmp_path / "inbox").get_folder("work")) == 2
+
+
+def test_maildir_durability_invalid(make_sender: Callable[..., MailboxSender]) -> None:
+    with pytest.raises(InvalidConfigError):
+        make_sender("maildir", durability="paranoid")
+
+
+def test_maildir_durability_none(
+    fsync: MagicMock,
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+) -> None:
+    sender = make_sender("maildir", durability="none", flush_every=2)
+    with sender:
+        for _ in range(3):
+            sender.send(test_email1)
+    assert fsync.call_count == 0
+
+
+def test_maildir_durability_per_message(
+    fsync: MagicMock,
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("maildir", durability="per-message", flush_every=2)
+    with sender:
+        sender.send(test_email1)
+        # One sync for the file, one for new/
+        assert fsync.call_count == 2
+        assert len(os.listdir(tmp_path / "inbox" / "new")) == 1
+        sender.send(test_email1)
+        assert fsync.call_count == 4
+    assert fsync.call_count == 4
+    assert len(Maildir(tmp_path / "inbox")) == 2
+
+
+def test_maildir_durability_group(
+    fsync: MagicMock,
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("maildir", durability="group", flush_every=2)
+    with sender:
+        sender.send(test_email1)
+        assert fsync.call_count == 0
+        assert os.listdir(tmp_path / "inbox" / "new") == []
+        assert len(os.listdir(tmp_path / "inbox" / "tmp")) == 1
+        sender.send(test_email1)
+        # Two files plus new/
+        assert fsync.call_count == 3
+        assert len(os.listdir(tmp_path / "inbox" / "new")) == 2
+        assert os.listdir(tmp_path / "inbox" / "tmp") == []
+        sender.send(test_email1)
+        assert fsync.call_count == 3
+    assert fsync.call_count == 5
+    assert len(os.listdir(tmp_path / "inbox" / "new")) == 3
+    assert os.listdir(tmp_path / "inbox" / "tmp") == []
+    box = Maildir(tmp_path / "inbox")
+    assert [msg["Subject"] for msg in box] == ["Meet me"] * 3
+
+
+def test_maildir_send_bytes(
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("maildir")
+    with sender:
+        sender.send(test_email1)
+        sender.send_bytes(raw_email)
+    box = Maildir(tmp_path / "inbox")
+    msgs = [box[k] for k in sorted(box.keys())]
+    assert [m["Subject"] for m in msgs] == ["Meet me", "Raw"]
+    assert msgs[1].get_payload() == "From here on, nothing is parsed.\n>From the top\n"
+
+
+def test_maildir_send_file(
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    src = tmp_path / "msg.eml"
+    src.write_bytes(raw_email)
+    sender = make_sender("maildir")
+    with src.open("rb") as fp:
+        sender.send_file(fp)
+    sender.send(test_email1)
+    box = Maildir(tmp_path / "inbox")
+    msgs = [box[k] for k in sorted(box.keys())]
+    assert [m["Subject"] for m in msgs] == ["Raw", "Meet me"]
+    assert msgs[0].get_payload() == "From here on, nothing is parsed.\n>From the top\n"
+
+
+def test_maildir_send_file_kernel_copy(
+    kernel_copiers: list[MagicMock],
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    tmp_path: Path,
+) -> None:
+    src = tmp_path / "msg.eml"
+    src.write_bytes(raw_email)
+    sender = make_sender("maildir")
+    with src.open("rb") as fp:
+        sender.send_file(fp)
+    assert sum(c.call_count for c in kernel_copiers) > 0
+    (path,) = (tmp_path / "inbox" / "new").iterdir()
+    assert path.read_bytes() == raw_email
+
+
+def test_maildir_send_file_not_regular(
+    make_sender: Callable[..., MailboxSender], raw_email: bytes, tmp_path: Path
+) -> None:
+    sender = make_sender("maildir")
+    sender.send_file(io.BytesIO(raw_email))
+    (path,) = (tmp_path / "inbox" / "new").iterdir()
+    assert path.read_bytes() == raw_email
+
+
+def test_maildir_send_file_offset(
+    make_sender: Callable[..., MailboxSender], raw_email: bytes, tmp_path: Path
+) -> None:
+    src = tmp_path / "msg.eml"
+    src.write_bytes(b"garbage\n" + raw_email)
+    sender = make_sender("maildir")
+    with src.open("rb") as fp:
+        fp.readline()
+        sender.send_file(fp)
+        assert fp.read() == b""
+    (path,) = (tmp_path / "inbox" / "new").iterdir()
+    assert path.read_bytes() == raw_email
+
+
+def test_maildir_send_entry_points_agree(
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    test_email1.set_content("From the top\nFrom the bottom\n")
+    data = bytes(test_email1)
+    make_sender("maildir", path=str(tmp_path / "0")).send(test_email1)
+    make_sender("maildir", path=str(tmp_path / "1")).send_bytes(data)
+    make_sender("maildir", path=str(tmp_path / "2")).send_file(io.BytesIO(data))
+    contents = [
+        path.read_bytes()
+        for i in range(3)
+        for path in (tmp_path / str(i) / "new").iterdir()
+    ]
+    assert contents == [contents[0]] * 3
+
+
+@pytest.mark.parametrize("via", ["bytes", "file"])
+def test_maildir_send_raw_from_line(
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    tmp_path: Path,
+    via: str,
+) -> None:
+    # A leading mbox From_ line isn't part of the e-mail, so it's dropped.
+    data = b"From alice@example.com Sat Oct 17 12:34:56 2026\n" + raw_email
+    sender = make_sender("maildir")
+    if via == "bytes":
+        sender.send_bytes(data)
+    else:
+        src = tmp_path / "msg.eml"
+        src.write_bytes(data)
+        with src.open("rb") as fp:
+            sender.send_file(fp)
+    (path,) = (tmp_path / "inbox" / "new").iterdir()
+    assert path.read_bytes() == raw_email
+
+
+def test_maildir_durability_group_interval(
+    fsync: MagicMock,
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("maildir", durability="group", flush_interval=0.05)
+    with sender:
+        sender.send(test_email1)
+        assert os.listdir(tmp_path / "inbox" / "new") == []
+        # The e-mail is delivered once the interval is up, even though nothing
+        # else is sent & the sender is still open:
+        deadline = time.monotonic() + 5
+        while not os.listdir(tmp_path / "inbox" / "new"):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        with sender._lock:
+            # Wait for the flush to finish
+            pass
+        assert os.listdir(tmp_path / "inbox" / "tmp") == []
+        # The file plus new/
+        assert fsync.call_count == 2
@@ -1,11 +1,34 @@
+from __future__ import annotations
+import bz2
 from email.message import EmailMessage
+import gzip
+import io
 import logging
-from mailbox import mbox
+import lzma
+import mailbox
+from mailbox import mbox, mboxMessage
+import os
 from pathlib import Path
+import threading
+import time
+from typing import Callable
+from unittest.mock import MagicMock
 from mailbits import email2dict
 import pytest
+from pytest_mock import MockerFixture
 from outgoing import Sender, from_dict
-from outgoing.senders.mailboxes import MboxSender
+from outgoing.errors import InvalidConfigError
+from outgoing.senders.mailboxes import MailboxSender, MboxSender, _AppendOnlyMbox
+
+DECOMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    "gzip": gzip.decompress,
+    "bz2": bz2.decompress,
+    "xz": lzma.decompress,
+}
+
+#: The body of the ``raw_email`` fixture as stored by `MboxSender`, which
+#: escapes "From " lines (but, like the stdlib, not ">From " lines)
+ESCAPED_BODY = ">From here on, nothing is parsed.\n>From the top\n"
 
 
 def test_mbox_construct(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
@@ -22,6 +45,14 @@ def test_mbox_construct(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None
     assert sender.model_dump() == {
         "configpath": tmp_path / "foo.txt",
         "path": tmp_path / "inbox",
+        "locking": "context",
+        "flush_every": None,
+        "flush_interval": None,
+        "rotate_bytes": None,
+        "rotate_messages": None,
+        "rotate_time": None,
+        "rotate_compress": None,
+        "compression": None,
     }
     assert sender._mbox is None
 
@@ -140,3 +171,659 @@ def test_mbox_close_unopened(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) ->
     with pytest.raises(ValueError) as excinfo:
         sender.close()
     assert str(excinfo.value) == "Mailbox is not open"
+
+
+def test_mbox_send_does_not_scan(
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    inbox = mbox("inbox")
+    inbox.lock()
+    for _ in range(3):
+        inbox.add(test_email1)
+    inbox.close()
+    spy = mocker.spy(mbox, "_generate_toc")
+    sender = from_dict(
+        {
+            "method": "mbox",
+            "path": "inbox",
+        },
+        configpath=str(tmp_path / "foo.txt"),
+    )
+    with sender:
+        sender.send(test_email2)
+        sender.send(test_email2)
+    assert spy.call_count == 0
+    inbox = mbox("inbox")
+    inbox.lock()
+    msgs = list(inbox)
+    inbox.close()
+    assert len(msgs) == 5
+    for m, expected in zip(msgs, [test_email1] * 3 + [test_email2] * 2):
+        msgdict = email2dict(m)
+        msgdict["unixfrom"] = None
+        assert email2dict(expected) == msgdict
+
+
+@pytest.fixture()
+def sync_flush(mocker: MockerFixture) -> MagicMock:
+    # `_sync_flush()` is what the stdlib single-file mailboxes call to sync
+    # their files to disk when flushed after adding messages.
+    sync = mailbox._sync_flush  # type: ignore[attr-defined]
+    return mocker.patch("mailbox._sync_flush", wraps=sync)
+
+
+def messages(path: Path) -> list[mboxMessage]:
+    box = mbox(path)
+    try:
+        return list(box)
+    finally:
+        box.close()
+
+
+def subjects(path: Path) -> list[str]:
+    return [msg["Subject"] for msg in messages(path)]
+
+
+def segments(tmp_path: Path) -> list[Path]:
+    return sorted(
+        (p for p in tmp_path.glob("inbox.*") if p.suffix != ".lock"),
+        key=lambda p: p.stat().st_mtime_ns,
+    )
+
+
+def decompressed_box(
+    path: Path, compression: str, tmp_path: Path
+) -> list[mboxMessage]:
+    plain = tmp_path / "decompressed"
+    plain.write_bytes(DECOMPRESSORS[compression](path.read_bytes()))
+    return messages(plain)
+
+
+@pytest.mark.parametrize("key", ["flush_every", "flush_interval"])
+def test_mbox_flush_invalid(key: str, tmp_path: Path) -> None:
+    with pytest.raises(InvalidConfigError):
+        from_dict({"method": "mbox", "path": str(tmp_path / "inbox"), key: 0})
+
+
+def test_mbox_invalid_locking(make_sender: Callable[..., MailboxSender]) -> None:
+    with pytest.raises(InvalidConfigError):
+        make_sender("mbox", locking="never")
+
+
+def test_mbox_locking_context(
+    make_sender: Callable[..., MailboxSender],
+    mocker: MockerFixture,
+    sync_flush: MagicMock,
+    test_email1: EmailMessage,
+) -> None:
+    lock = mocker.spy(mailbox._singlefileMailbox, "lock")
+    unlock = mocker.spy(mailbox._singlefileMailbox, "unlock")
+    sender = make_sender("mbox")
+    with sender:
+        sender.send(test_email1)
+        sender.send(test_email1)
+        assert lock.call_count == 1
+        assert unlock.call_count == 0
+        assert sync_flush.call_count == 0
+    assert unlock.call_count == 1
+    assert sync_flush.call_count == 1
+
+
+def test_mbox_locking_message(
+    make_sender: Callable[..., MailboxSender],
+    mocker: MockerFixture,
+    sync_flush: MagicMock,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    makebox = mocker.spy(MboxSender, "_makebox")
+    lock = mocker.spy(mailbox._singlefileMailbox, "lock")
+    unlock = mocker.spy(mailbox._singlefileMailbox, "unlock")
+    sender = make_sender("mbox", locking="message")
+    with sender:
+        assert lock.call_count == 0
+        sender.send(test_email1)
+        assert lock.call_count == 1
+        assert unlock.call_count == 1
+        sender.send(test_email1)
+        assert lock.call_count == 2
+        assert unlock.call_count == 2
+    assert makebox.call_count == 1
+    assert unlock.call_count == 2
+    assert sync_flush.call_count == 1
+    assert subjects(tmp_path / "inbox") == ["Meet me", "Meet me"]
+
+
+def test_mbox_flush_every(
+    make_sender: Callable[..., MailboxSender],
+    sync_flush: MagicMock,
+    test_email1: EmailMessage,
+) -> None:
+    sender = make_sender("mbox", flush_every=2)
+    with sender:
+        sender.send(test_email1)
+        assert sync_flush.call_count == 0
+        sender.send(test_email1)
+        assert sync_flush.call_count == 1
+        sender.send(test_email1)
+        assert sync_flush.call_count == 1
+    assert sync_flush.call_count == 2
+
+
+def test_mbox_flush_interval(
+    make_sender: Callable[..., MailboxSender],
+    mocker: MockerFixture,
+    sync_flush: MagicMock,
+    test_email1: EmailMessage,
+) -> None:
+    clock = mocker.patch("outgoing.senders.mailboxes.time")
+    clock.monotonic.return_value = 1000.0
+    sender = make_sender("mbox", flush_interval=30)
+    with sender:
+        clock.monotonic.return_value = 1010.0
+        sender.send(test_email1)
+        assert sync_flush.call_count == 0
+        clock.monotonic.return_value = 1030.0
+        sender.send(test_email1)
+        assert sync_flush.call_count == 1
+        clock.monotonic.return_value = 1059.0
+        sender.send(test_email1)
+        assert sync_flush.call_count == 1
+    assert sync_flush.call_count == 2
+
+
+def test_mbox_flush_interval_timer(
+    make_sender: Callable[..., MailboxSender],
+    sync_flush: MagicMock,
+    test_email1: EmailMessage,
+) -> None:
+    sender = make_sender("mbox", flush_interval=0.05)
+    with sender:
+        sender.send(test_email1)
+        assert sync_flush.call_count == 0
+        # The mailbox is flushed once the interval is up, even though nothing
+        # else is sent:
+        deadline = time.monotonic() + 5
+        while sync_flush.call_count == 0:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert sender._flush_timer is None
+    assert sync_flush.call_count == 1
+
+
+def test_mbox_send_bytes(
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("mbox")
+    with sender:
+        sender.send(test_email1)
+        sender.send_bytes(raw_email)
+    msgs = messages(tmp_path / "inbox")
+    assert [m["Subject"] for m in msgs] == ["Meet me", "Raw"]
+    assert msgs[1].get_payload() == ESCAPED_BODY
+
+
+def test_mbox_send_file(
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    src = tmp_path / "msg.eml"
+    src.write_bytes(raw_email)
+    sender = make_sender("mbox")
+    with src.open("rb") as fp:
+        sender.send_file(fp)
+    sender.send(test_email1)
+    msgs = messages(tmp_path / "inbox")
+    assert [m["Subject"] for m in msgs] == ["Raw", "Meet me"]
+    assert msgs[0].get_payload() == ESCAPED_BODY
+
+
+def test_mbox_send_entry_points_agree(
+    make_sender: Callable[..., MailboxSender],
+    mocker: MockerFixture,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    # Make the generated From_ lines all the same:
+    mocker.patch("time.asctime", return_value="Sat Oct 17 12:34:56 2026")
+    test_email1.set_content("From the top\nFrom the bottom\n")
+    data = bytes(test_email1)
+    make_sender("mbox", path=str(tmp_path / "0")).send(test_email1)
+    make_sender("mbox", path=str(tmp_path / "1")).send_bytes(data)
+    make_sender("mbox", path=str(tmp_path / "2")).send_file(io.BytesIO(data))
+    content = (tmp_path / "0").read_bytes()
+    assert (tmp_path / "1").read_bytes() == content
+    assert (tmp_path / "2").read_bytes() == content
+
+
+def test_mbox_send_file_from_line(
+    make_sender: Callable[..., MailboxSender], raw_email: bytes, tmp_path: Path
+) -> None:
+    sender = make_sender("mbox")
+    sender.send_file(
+        io.BytesIO(b"From alice@example.com Sat Oct 17 12:34:56 2026\n" + raw_email)
+    )
+    sender.send_file(io.BytesIO(raw_email.removesuffix(b"\n")))
+    content = (tmp_path / "inbox").read_bytes()
+    assert content.startswith(
+        b"From alice@example.com Sat Oct 17 12:34:56 2026\nFrom: alice@"
+    )
+    assert content.count(b"\n>From here on, nothing is parsed.\n") == 2
+    # Like the stdlib, only "From " lines are escaped, not ">From " lines.
+    assert content.count(b"\n>From the top\n") == 2
+    msgs = messages(tmp_path / "inbox")
+    assert [m["Subject"] for m in msgs] == ["Raw", "Raw"]
+    assert msgs[0].get_from() == "alice@example.com Sat Oct 17 12:34:56 2026"
+    assert msgs[1].get_from().startswith("MAILER-DAEMON ")
+
+
+def test_mbox_send_file_failure_truncates(
+    make_sender: Callable[..., MailboxSender],
+    mocker: MockerFixture,
+    raw_email: bytes,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("mbox")
+    with sender:
+        sender.send_bytes(raw_email)
+        size = (tmp_path / "inbox").stat().st_size
+        fp = io.BytesIO(raw_email)
+        mocker.patch.object(fp, "readline", side_effect=OSError("Oops"))
+        with pytest.raises(OSError):
+            sender.send_file(fp)
+    assert (tmp_path / "inbox").stat().st_size == size
+    assert subjects(tmp_path / "inbox") == ["Raw"]
+
+
+@pytest.mark.parametrize(
+    "key,value",
+    [
+        ("rotate_bytes", 0),
+        ("rotate_messages", 0),
+        ("rotate_time", ""),
+        ("rotate_compress", "zip"),
+    ],
+)
+def test_mbox_rotate_invalid(key: str, value: object, tmp_path: Path) -> None:
+    with pytest.raises(InvalidConfigError):
+        from_dict({"method": "mbox", "path": str(tmp_path / "inbox"), key: value})
+
+
+def test_mbox_rotate_messages(
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("mbox", rotate_messages=2)
+    with sender:
+        for msg in [test_email1, test_email2, test_email1, test_email2, test_email1]:
+            sender.send(msg)
+    segs = segments(tmp_path)
+    assert len(segs) == 2
+    # Segments started within the same second get numbered suffixes:
+    assert segs[1].name == segs[0].name + ".1"
+    assert [subjects(p) for p in segs] == [["Meet me", "No."]] * 2
+    assert subjects(tmp_path / "inbox") == ["Meet me"]
+    assert not (tmp_path / "inbox.lock").exists()
+
+
+def test_mbox_rotate_messages_preexisting(
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    box = mailbox.mbox(tmp_path / "inbox")
+    try:
+        box.add(test_email1)
+        box.add(test_email1)
+    finally:
+        box.close()
+    sender = make_sender("mbox", rotate_messages=3)
+    with sender:
+        sender.send(test_email2)
+        assert segments(tmp_path) == []
+        sender.send(test_email2)
+    (seg,) = segments(tmp_path)
+    assert subjects(seg) == ["Meet me", "Meet me", "No."]
+    assert subjects(tmp_path / "inbox") == ["No."]
+
+
+def test_mbox_count_messages(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr("outgoing.senders.mailboxes.CHUNK_SIZE", 7)
+    (tmp_path / "inbox").write_bytes(
+        b"From a@example.com Sat Oct 17 12:34:56 2026\n"
+        b"Subject: One\n"
+        b"\n"
+        b">From the top\n"
+        b"\n"
+        b"From b@example.com Sat Oct 17 12:34:57 2026\n"
+        b"Subject: Two\n"
+        b"\n"
+        b"Fro\n"
+        b"\n"
+    )
+    box = _AppendOnlyMbox(str(tmp_path / "inbox"))
+    try:
+        assert box.message_count() == 2
+        box.add(b"Subject: Three\n\nFrom here\n")
+        assert box.message_count() == 3
+    finally:
+        box.close()
+
+
+def test_mbox_rotate_bytes(
+    make_sender: Callable[..., MailboxSender], test_email1: EmailMessage, tmp_path: Path
+) -> None:
+    sender = make_sender("mbox", rotate_bytes=1)
+    for _ in range(3):
+        sender.send(test_email1)
+    segs = segments(tmp_path)
+    assert len(segs) == 2
+    for p in segs:
+        assert subjects(p) == ["Meet me"]
+    assert subjects(tmp_path / "inbox") == ["Meet me"]
+
+
+def test_mbox_rotate_time(
+    make_sender: Callable[..., MailboxSender],
+    mocker: MockerFixture,
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    strftime = mocker.patch(
+        "outgoing.senders.mailboxes.time.strftime", return_value="2026-10"
+    )
+    sender = make_sender("mbox", rotate_time="%Y-%m")
+    with sender:
+        sender.send(test_email1)
+        sender.send(test_email1)
+        assert segments(tmp_path) == []
+        strftime.return_value = "2026-11"
+        sender.send(test_email2)
+        sender.send(test_email2)
+    assert [p.name for p in segments(tmp_path)] == ["inbox.2026-10"]
+    assert subjects(tmp_path / "inbox.2026-10") == ["Meet me", "Meet me"]
+    assert subjects(tmp_path / "inbox") == ["No.", "No."]
+
+
+def test_mbox_rotate_time_preexisting(
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    box = mailbox.mbox(tmp_path / "inbox")
+    try:
+        box.add(test_email1)
+    finally:
+        box.close()
+    then = time.mktime((2020, 1, 1, 12, 0, 0, 0, 0, -1))
+    os.utime(tmp_path / "inbox", (then, then))
+    sender = make_sender("mbox", rotate_time="%Y-%m-%d")
+    sender.send(test_email2)
+    assert subjects(tmp_path / "inbox.2020-01-01") == ["Meet me"]
+    assert subjects(tmp_path / "inbox") == ["No."]
+
+
+def test_mbox_rotate_empty_file(
+    make_sender: Callable[..., MailboxSender], test_email1: EmailMessage, tmp_path: Path
+) -> None:
+    (tmp_path / "inbox").touch()
+    then = time.mktime((2020, 1, 1, 12, 0, 0, 0, 0, -1))
+    os.utime(tmp_path / "inbox", (then, then))
+    sender = make_sender("mbox", rotate_time="%Y-%m-%d", rotate_bytes=1)
+    sender.send(test_email1)
+    assert segments(tmp_path) == []
+    assert subjects(tmp_path / "inbox") == ["Meet me"]
+
+
+@pytest.mark.parametrize("locking", ["context", "message"])
+def test_mbox_rotate_locking(
+    locking: str,
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("mbox", locking=locking, rotate_messages=1)
+    with sender:
+        for _ in range(3):
+            sender.send(test_email1)
+            if locking == "message":
+                assert not (tmp_path / "inbox.lock").exists()
+            else:
+                assert (tmp_path / "inbox.lock").exists()
+    assert not (tmp_path / "inbox.lock").exists()
+    assert len(segments(tmp_path)) == 2
+    assert subjects(tmp_path / "inbox") == ["Meet me"]
+
+
+def test_mbox_rotated_by_other_sender(
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    rotating = make_sender("mbox", locking="message", rotate_messages=1)
+    plain = make_sender("mbox", locking="message")
+    with rotating, plain:
+        plain.send(test_email1)
+        rotating.send(test_email2)
+        # `plain` still has the rotated file open, but it has to switch to the
+        # new file once it locks the mailbox.
+        plain.send(test_email1)
+    (seg,) = segments(tmp_path)
+    assert subjects(seg) == ["Meet me"]
+    assert subjects(tmp_path / "inbox") == ["No.", "Meet me"]
+
+
+@pytest.mark.parametrize(
+    "method,ext,decompress",
+    [
+        ("gzip", ".gz", gzip.decompress),
+        ("bz2", ".bz2", bz2.decompress),
+        ("xz", ".xz", lzma.decompress),
+    ],
+)
+def test_mbox_rotate_compress(
+    method: str,
+    ext: str,
+    decompress: Callable[[bytes], bytes],
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("mbox", rotate_messages=1, rotate_compress=method)
+    with sender:
+        sender.send(test_email1)
+        sender.send(test_email2)
+    (seg,) = segments(tmp_path)
+    assert seg.name.endswith(ext)
+    assert not seg.with_suffix("").exists()
+    plain = tmp_path / "segment"
+    plain.write_bytes(decompress(seg.read_bytes()))
+    assert subjects(plain) == ["Meet me"]
+    assert subjects(tmp_path / "inbox") == ["No."]
+
+
+def test_mbox_rotate_compress_failure(
+    caplog: pytest.LogCaptureFixture,
+    make_sender: Callable[..., MailboxSender],
+    mocker: MockerFixture,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    mocker.patch("gzip.GzipFile.write", side_effect=OSError("Disk full"))
+    sender = make_sender("mbox", rotate_messages=1, rotate_compress="gzip")
+    with sender:
+        sender.send(test_email1)
+        sender.send(test_email1)
+    (seg,) = segments(tmp_path)
+    assert subjects(seg) == ["Meet me"]
+    assert "Failed to compress mbox segment" in caplog.text
+
+
+def test_mbox_rotate_compress_wait(
+    make_sender: Callable[..., MailboxSender],
+    mocker: MockerFixture,
+    test_email1: EmailMessage,
+) -> None:
+    started = threading.Event()
+    release = threading.Event()
+
+    def compress_segment(_path: str, _method: str) -> None:
+        started.set()
+        release.wait()
+
+    compress = mocker.patch(
+        "outgoing.senders.mailboxes._compress_segment", side_effect=compress_segment
+    )
+    sender = make_sender("mbox", rotate_messages=1, rotate_compress="gzip")
+    assert isinstance(sender, MboxSender)
+    with sender:
+        sender.send(test_email1)
+        sender.send(test_email1)
+        assert started.wait(5)
+        waiter = threading.Thread(target=sender.wait)
+        waiter.start()
+        waiter.join(0.1)
+        assert waiter.is_alive()
+        release.set()
+        waiter.join(5)
+        assert not waiter.is_alive()
+    compress.assert_called_once()
+
+
+def test_mbox_compression_invalid(make_sender: Callable[..., MailboxSender]) -> None:
+    with pytest.raises(InvalidConfigError):
+        make_sender("mbox", compression="zip")
+
+
+def test_mbox_compression_rotate_compress(
+    make_sender: Callable[..., MailboxSender]
+) -> None:
+    with pytest.raises(InvalidConfigError) as excinfo:
+        make_sender(
+            "mbox", compression="gzip", rotate_messages=1, rotate_compress="gzip"
+        )
+    assert "rotate_compress cannot be set when compression is set" in str(
+        excinfo.value
+    )
+
+
+@pytest.mark.parametrize("compression", ["gzip", "bz2", "xz"])
+def test_mbox_compression(
+    compression: str,
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("mbox", compression=compression)
+    with sender:
+        sender.send(test_email1)
+    first = (tmp_path / "inbox").read_bytes()
+    with sender:
+        sender.send(test_email2)
+        sender.send_bytes(raw_email)
+        sender.send_file(io.BytesIO(raw_email))
+    # Adding e-mails never rewrites what's already in the file:
+    assert (tmp_path / "inbox").read_bytes().startswith(first)
+    msgs = decompressed_box(tmp_path / "inbox", compression, tmp_path)
+    assert [m["Subject"] for m in msgs] == ["Meet me", "No.", "Raw", "Raw"]
+    for m in msgs[2:]:
+        assert m.get_payload() == ESCAPED_BODY
+
+
+@pytest.mark.parametrize("compression", ["gzip", "bz2", "xz"])
+def test_mbox_compression_members(
+    compression: str,
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("mbox", compression=compression)
+    sizes = []
+    for _ in range(3):
+        sender.send(test_email1)
+        sizes.append((tmp_path / "inbox").stat().st_size)
+    # Each e-mail is compressed on its own, so each one adds the same amount
+    # to the file, and the last one decompresses by itself:
+    assert sizes[2] - sizes[1] == sizes[1] - sizes[0] == sizes[0]
+    last = (tmp_path / "inbox").read_bytes()[sizes[1] :]
+    assert DECOMPRESSORS[compression](last).startswith(b"From MAILER-DAEMON ")
+
+
+def test_mbox_compression_failure(
+    make_sender: Callable[..., MailboxSender],
+    mocker: MockerFixture,
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("mbox", compression="gzip")
+    with sender:
+        sender.send(test_email1)
+        size = (tmp_path / "inbox").stat().st_size
+        mocker.patch.object(
+            mailbox.mbox, "_dump_message", side_effect=RuntimeError("Oops")
+        )
+        with pytest.raises(RuntimeError):
+            sender.send(test_email2)
+    assert (tmp_path / "inbox").stat().st_size == size
+    msgs = decompressed_box(tmp_path / "inbox", "gzip", tmp_path)
+    assert [m["Subject"] for m in msgs] == ["Meet me"]
+
+
+def test_mbox_compression_rotate_messages(
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    make_sender("mbox", compression="xz").send(test_email1)
+    sender = make_sender("mbox", compression="xz", rotate_messages=2)
+    with sender:
+        sender.send(test_email1)
+        sender.send(test_email2)
+    (seg,) = [p for p in tmp_path.glob("inbox.*") if p.suffix != ".lock"]
+    assert seg.suffix == ".xz"
+    msgs = decompressed_box(seg, "xz", tmp_path)
+    assert [m["Subject"] for m in msgs] == ["Meet me", "Meet me"]
+    msgs = decompressed_box(tmp_path / "inbox", "xz", tmp_path)
+    assert [m["Subject"] for m in msgs] == ["No."]
+
+
+def test_mbox_compression_segment_collision(
+    make_sender: Callable[..., MailboxSender],
+    mocker: MockerFixture,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    mocker.patch(
+        "outgoing.senders.mailboxes.time.strftime", return_value="20261017T123456"
+    )
+    (tmp_path / "inbox.20261017T123456.gz").write_bytes(b"")
+    (tmp_path / "inbox.20261017T123456.1").write_bytes(b"")
+    sender = make_sender("mbox", compression="gzip", rotate_messages=1)
+    with sender:
+        sender.send(test_email1)
+        sender.send(test_email1)
+    seg = tmp_path / "inbox.20261017T123456.2.gz"
+    assert [m["Subject"] for m in decompressed_box(seg, "gzip", tmp_path)] == [
+        "Meet me"
+    ]
@@ -1,13 +1,20 @@
 from __future__ import annotations
 from email.message import EmailMessage
+import io
 import logging
+import mailbox
 from mailbox import MH
 from operator import itemgetter
 from pathlib import Path
+from typing import Callable
+from unittest.mock import MagicMock
 from mailbits import email2dict
 import pytest
+from pytest_mock import MockerFixture
 from outgoing import Sender, from_dict
-from outgoing.senders.mailboxes import MHSender
+from outgoing.errors import InvalidConfigError
+from outgoing.senders import mailboxes
+from outgoing.senders.mailboxes import MailboxSender, MHSender
 
 
 @pytest.mark.parametrize("folder", [None, "work", ["important", "work"]])
@@ -29,6 +36,11 @@ def test_mh_construct(
         "configpath": tmp_path / "foo.txt",
         "path": tmp_path / "inbox",
         "folder": folder,
+        "locking": "context",
+        "flush_every": None,
+        "flush_interval": None,
+        "durability": "per-message",
+        "sequences": True,
     }
     assert sender._mbox is None
 
@@ -338,3 +350,257 @@ def test_mh_close_unopened(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> N
     with pytest.raises(ValueError) as excinfo:
         sender.close()
     assert str(excinfo.value) == "Mailbox is not open"
+
+
+def mh_keys(box: MH) -> list[int]:
+    # typeshed declares MH keys as strings, but they're actually ints.
+    return sorted(int(k) for k in box.keys())
+
+
+def test_mh_send_lists_folder_once(
+    mocker: MockerFixture, test_email1: EmailMessage, tmp_path: Path
+) -> None:
+    keys = mocker.spy(MH, "keys")
+    sender = from_dict({"method": "mh", "path": str(tmp_path / "inbox")})
+    for _ in range(3):
+        sender.send(test_email1)
+    with sender:
+        for _ in range(3):
+            sender.send(test_email1)
+    assert keys.call_count == 1
+    assert mh_keys(MH(tmp_path / "inbox")) == [1, 2, 3, 4, 5, 6]
+
+
+def test_mh_send_skips_numbers_used_elsewhere(
+    test_email1: EmailMessage, test_email2: EmailMessage, tmp_path: Path
+) -> None:
+    inbox = MH(tmp_path / "inbox")
+    inbox.add(test_email2)
+    sender = from_dict({"method": "mh", "path": str(tmp_path / "inbox")})
+    sender.send(test_email1)
+    inbox.add(test_email2)
+    sender.send(test_email1)
+    assert [(k, inbox[str(k)]["Subject"]) for k in mh_keys(inbox)] == [
+        (1, "No."),
+        (2, "Meet me"),
+        (3, "No."),
+        (4, "Meet me"),
+    ]
+
+
+def test_mh_send_rescans_after_many_clashes(
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(mailboxes, "MH_RESCAN_AFTER", 3)
+    sender = from_dict({"method": "mh", "path": str(tmp_path / "inbox")})
+    sender.send(test_email1)
+    for i in range(2, 11):
+        (tmp_path / "inbox" / str(i)).write_bytes(bytes(test_email1))
+    keys = mocker.spy(MH, "keys")
+    sender.send(test_email1)
+    assert keys.call_count == 1
+    assert mh_keys(MH(tmp_path / "inbox")) == list(range(1, 12))
+
+
+def test_mh_send_walks_folders_once(
+    mocker: MockerFixture, test_email1: EmailMessage, tmp_path: Path
+) -> None:
+    get_folder = mocker.spy(MH, "get_folder")
+    sender = from_dict(
+        {
+            "method": "mh",
+            "path": str(tmp_path / "inbox"),
+            "folder": ["work", "important"],
+        }
+    )
+    sender.send(test_email1)
+    assert get_folder.call_count == 2
+    sender.send(test_email1)
+    assert get_folder.call_count == 2
+    folder = MH(tmp_path / "inbox").get_folder("work").get_folder("important")
+    assert mh_keys(folder) == [1, 2]
+
+
+@pytest.mark.parametrize("sequences,locks", [(True, 1), (False, 0)])
+def test_mh_sequences(
+    locks: int,
+    mocker: MockerFixture,
+    sequences: bool,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    lock = mocker.spy(mailbox.MH, "lock")
+    sender = from_dict(
+        {"method": "mh", "path": str(tmp_path / "inbox"), "sequences": sequences}
+    )
+    with sender:
+        sender.send(test_email1)
+    assert lock.call_count == locks
+    assert mh_keys(MH(tmp_path / "inbox")) == [1]
+
+
+def test_mh_durability_invalid(make_sender: Callable[..., MailboxSender]) -> None:
+    with pytest.raises(InvalidConfigError):
+        make_sender("mh", durability="paranoid")
+
+
+def test_mh_durability_none(
+    fsync: MagicMock,
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+) -> None:
+    sender = make_sender("mh", durability="none", flush_every=2)
+    with sender:
+        for _ in range(3):
+            sender.send(test_email1)
+        assert fsync.call_count == 0
+    # Unlocking an MH mailbox always syncs its .mh_sequences file.
+    assert fsync.call_count == 1
+
+
+def test_mh_durability_per_message(
+    fsync: MagicMock,
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("mh", durability="per-message", flush_every=2)
+    with sender:
+        sender.send(test_email1)
+        assert fsync.call_count == 2
+        sender.send(test_email1)
+        assert fsync.call_count == 4
+    # Plus .mh_sequences:
+    assert fsync.call_count == 5
+    assert mh_keys(MH(tmp_path / "inbox")) == [1, 2]
+
+
+def test_mh_durability_group(
+    fsync: MagicMock,
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("mh", durability="group", flush_every=2)
+    with sender:
+        sender.send(test_email1)
+        assert fsync.call_count == 0
+        sender.send(test_email1)
+        assert fsync.call_count == 3
+        sender.send(test_email1)
+        assert fsync.call_count == 3
+    # The last file, the folder, and .mh_sequences:
+    assert fsync.call_count == 6
+    box = MH(tmp_path / "inbox")
+    assert mh_keys(box) == [1, 2, 3]
+    assert [msg["Subject"] for msg in box] == ["Meet me"] * 3
+
+
+def test_mh_durability_failed_add(
+    make_sender: Callable[..., MailboxSender],
+    mocker: MockerFixture,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("mh", durability="group", flush_every=2)
+    with sender:
+        sender.send(test_email1)
+        mocker.patch.object(
+            mailbox.MH, "_dump_message", side_effect=RuntimeError("Oops")
+        )
+        with pytest.raises(RuntimeError):
+            sender.send(test_email1)
+    assert mh_keys(MH(tmp_path / "inbox")) == [1]
+
+
+def test_mh_send_bytes(
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("mh")
+    with sender:
+        sender.send(test_email1)
+        sender.send_bytes(raw_email)
+    box = MH(tmp_path / "inbox")
+    assert [box[str(k)]["Subject"] for k in mh_keys(box)] == ["Meet me", "Raw"]
+    assert box["2"].get_payload() == "From here on, nothing is parsed.\n>From the top\n"
+
+
+def test_mh_send_file(
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    src = tmp_path / "msg.eml"
+    src.write_bytes(raw_email)
+    sender = make_sender("mh")
+    with src.open("rb") as fp:
+        sender.send_file(fp)
+    sender.send(test_email1)
+    box = MH(tmp_path / "inbox")
+    assert [box[str(k)]["Subject"] for k in mh_keys(box)] == ["Raw", "Meet me"]
+    assert box["1"].get_payload() == "From here on, nothing is parsed.\n>From the top\n"
+
+
+def test_mh_send_file_kernel_copy(
+    kernel_copiers: list[MagicMock],
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    tmp_path: Path,
+) -> None:
+    src = tmp_path / "msg.eml"
+    src.write_bytes(raw_email)
+    sender = make_sender("mh")
+    with src.open("rb") as fp:
+        sender.send_file(fp)
+    assert sum(c.call_count for c in kernel_copiers) > 0
+    assert (tmp_path / "inbox" / "1").read_bytes() == raw_email
+
+
+def test_mh_send_file_not_regular(
+    make_sender: Callable[..., MailboxSender], raw_email: bytes, tmp_path: Path
+) -> None:
+    sender = make_sender("mh")
+    sender.send_file(io.BytesIO(raw_email))
+    assert (tmp_path / "inbox" / "1").read_bytes() == raw_email
+
+
+def test_mh_send_entry_points_agree(
+    make_sender: Callable[..., MailboxSender],
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    test_email1.set_content("From the top\nFrom the bottom\n")
+    data = bytes(test_email1)
+    make_sender("mh", path=str(tmp_path / "0")).send(test_email1)
+    make_sender("mh", path=str(tmp_path / "1")).send_bytes(data)
+    make_sender("mh", path=str(tmp_path / "2")).send_file(io.BytesIO(data))
+    content = (tmp_path / "0" / "1").read_bytes()
+    assert (tmp_path / "1" / "1").read_bytes() == content
+    assert (tmp_path / "2" / "1").read_bytes() == content
+
+
+@pytest.mark.parametrize("via", ["bytes", "file"])
+def test_mh_send_raw_from_line(
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    tmp_path: Path,
+    via: str,
+) -> None:
+    # A leading mbox From_ line isn't part of the e-mail, so it's dropped.
+    data = b"From alice@example.com Sat Oct 17 12:34:56 2026\n" + raw_email
+    sender = make_sender("mh")
+    if via == "bytes":
+        sender.send_bytes(data)
+    else:
+        src = tmp_path / "msg.eml"
+        src.write_bytes(data)
+        with src.open("rb") as fp:
+            sender.send_file(fp)
+    assert (tmp_path / "inbox" / "1").read_bytes() == raw_email
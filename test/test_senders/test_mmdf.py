@@ -1,11 +1,19 @@
+from __future__ import annotations
 from email.message import EmailMessage
+import io
 import logging
-from mailbox import MMDF
+from mailbox import MMDF, MMDFMessage
 from pathlib import Path
+from typing import Callable
 from mailbits import email2dict
 import pytest
+from pytest_mock import MockerFixture
 from outgoing import Sender, from_dict
-from outgoing.senders.mailboxes import MMDFSender
+from outgoing.senders.mailboxes import MailboxSender, MMDFSender
+
+#: The body of the ``raw_email`` fixture as stored by `MMDFSender`, which
+#: escapes "From " lines (but, like the stdlib, not ">From " lines)
+ESCAPED_BODY = ">From here on, nothing is parsed.\n>From the top\n"
 
 
 def test_mmdf_construct(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
@@ -22,6 +30,9 @@ def test_mmdf_construct(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None
     assert sender.model_dump() == {
         "configpath": tmp_path / "foo.txt",
         "path": tmp_path / "inbox",
+        "locking": "context",
+        "flush_every": None,
+        "flush_interval": None,
     }
     assert sender._mbox is None
 
@@ -140,3 +151,119 @@ def test_mmdf_close_unopened(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) ->
     with pytest.raises(ValueError) as excinfo:
         sender.close()
     assert str(excinfo.value) == "Mailbox is not open"
+
+
+def test_mmdf_send_does_not_scan(
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    inbox = MMDF("inbox")
+    inbox.lock()
+    for _ in range(3):
+        inbox.add(test_email1)
+    inbox.close()
+    spy = mocker.spy(MMDF, "_generate_toc")
+    sender = from_dict(
+        {
+            "method": "mmdf",
+            "path": "inbox",
+        },
+        configpath=str(tmp_path / "foo.txt"),
+    )
+    with sender:
+        sender.send(test_email2)
+    sender.send(test_email2)
+    assert spy.call_count == 0
+    inbox = MMDF("inbox")
+    inbox.lock()
+    msgs = list(inbox)
+    inbox.close()
+    assert len(msgs) == 5
+    for m, expected in zip(msgs, [test_email1] * 3 + [test_email2] * 2):
+        msgdict = email2dict(m)
+        msgdict["unixfrom"] = None
+        assert email2dict(expected) == msgdict
+
+
+def messages(path: Path) -> list[MMDFMessage]:
+    box = MMDF(path)
+    try:
+        return list(box)
+    finally:
+        box.close()
+
+
+def test_mmdf_send_bytes(
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    sender = make_sender("mmdf")
+    with sender:
+        sender.send(test_email1)
+        sender.send_bytes(raw_email)
+    msgs = messages(tmp_path / "inbox")
+    assert [m["Subject"] for m in msgs] == ["Meet me", "Raw"]
+    assert msgs[1].get_payload() == ESCAPED_BODY
+
+
+def test_mmdf_send_file(
+    make_sender: Callable[..., MailboxSender],
+    raw_email: bytes,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    src = tmp_path / "msg.eml"
+    src.write_bytes(raw_email)
+    sender = make_sender("mmdf")
+    with src.open("rb") as fp:
+        sender.send_file(fp)
+    sender.send(test_email1)
+    msgs = messages(tmp_path / "inbox")
+    assert [m["Subject"] for m in msgs] == ["Raw", "Meet me"]
+    assert msgs[0].get_payload() == ESCAPED_BODY
+
+
+def test_mmdf_send_file_not_regular(
+    make_sender: Callable[..., MailboxSender], raw_email: bytes, tmp_path: Path
+) -> None:
+    sender = make_sender("mmdf")
+    sender.send_file(io.BytesIO(raw_email))
+    (msg,) = messages(tmp_path / "inbox")
+    assert msg["Subject"] == "Raw"
+    assert msg.get_payload() == ESCAPED_BODY
+
+
+def test_mmdf_send_file_no_final_newline(
+    make_sender: Callable[..., MailboxSender], raw_email: bytes, tmp_path: Path
+) -> None:
+    sender = make_sender("mmdf")
+    sender.send_file(io.BytesIO(raw_email.removesuffix(b"\n")))
+    content = (tmp_path / "inbox").read_bytes()
+    assert content.startswith(b"\x01\x01\x01\x01\nFrom MAILER-DAEMON ")
+    assert content.endswith(
+        b"\n\n>From here on, nothing is parsed.\n>From the top\n\x01\x01\x01\x01\n"
+    )
+
+
+def test_mmdf_send_entry_points_agree(
+    make_sender: Callable[..., MailboxSender],
+    mocker: MockerFixture,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    # Make the generated From_ lines all the same:
+    mocker.patch("time.asctime", return_value="Sat Oct 17 12:34:56 2026")
+    test_email1.set_content("From the top\nFrom the bottom\n")
+    data = bytes(test_email1)
+    make_sender("mmdf", path=str(tmp_path / "0")).send(test_email1)
+    make_sender("mmdf", path=str(tmp_path / "1")).send_bytes(data)
+    make_sender("mmdf", path=str(tmp_path / "2")).send_file(io.BytesIO(data))
+    content = (tmp_path / "0").read_bytes()
+    assert (tmp_path / "1").read_bytes() == content
+    assert (tmp_path / "2").read_bytes() == content
@@ -38,6 +38,15 @@ def test_smtp_construct_default_ssl(
         "port": 25,
         "ssl": False,
         "netrc": False,
+        "ssl_verify": False,
+        "ssl_cafile": None,
+        "ssl_certfile": None,
+        "ssl_keyfile": None,
+        "ssl_ciphers": None,
+        "pipelining": False,
+        "chunking": False,
+        "chunk_size": 1048576,
+        "keepalive": None,
     }
     assert sender._client is None
 
@@ -63,6 +72,15 @@ def test_smtp_construct_no_ssl(monkeypatch: pytest.MonkeyPatch, tmp_path: Path)
         "port": 25,
         "ssl": False,
         "netrc": False,
+        "ssl_verify": False,
+        "ssl_cafile": None,
+        "ssl_certfile": None,
+        "ssl_keyfile": None,
+        "ssl_ciphers": None,
+        "pipelining": False,
+        "chunking": False,
+        "chunk_size": 1048576,
+        "keepalive": None,
     }
     assert sender._client is None
 
@@ -88,6 +106,15 @@ def test_smtp_construct_ssl(tmp_path: Path) -> None:
         "port": 465,
         "ssl": True,
         "netrc": False,
+        "ssl_verify": False,
+        "ssl_cafile": None,
+        "ssl_certfile": None,
+        "ssl_keyfile": None,
+        "ssl_ciphers": None,
+        "pipelining": False,
+        "chunking": False,
+        "chunk_size": 1048576,
+        "keepalive": None,
     }
     assert sender._client is None
 
@@ -114,6 +141,15 @@ def test_smtp_construct_starttls(tmp_path: Path) -> None:
         "port": 587,
         "ssl": "starttls",
         "netrc": tmp_path / "net.rc",
+        "ssl_verify": False,
+        "ssl_cafile": None,
+        "ssl_certfile": None,
+        "ssl_keyfile": None,
+        "ssl_ciphers": None,
+        "pipelining": False,
+        "chunking": False,
+        "chunk_size": 1048576,
+        "keepalive": None,
     }
     assert sender._client is None
 
@@ -138,6 +174,15 @@ def test_smtp_construct_explicit_port(ssl: bool | str, tmp_path: Path) -> None:
         "port": 1337,
         "ssl": ssl,
         "netrc": False,
+        "ssl_verify": False,
+        "ssl_cafile": None,
+        "ssl_certfile": None,
+        "ssl_keyfile": None,
+        "ssl_ciphers": None,
+        "pipelining": False,
+        "chunking": False,
+        "chunk_size": 1048576,
+        "keepalive": None,
     }
 
 
@@ -232,9 +277,12 @@ def test_smtp_send_ssl_no_auth(
     caplog.set_level(logging.DEBUG, logger="outgoing")
     m = mocker.patch("smtplib.SMTP_SSL", autospec=True)
     sender = from_dict({"method": "smtp", "host": "mx.example.com", "ssl": True})
+    assert isinstance(sender, SMTPSender)
     with sender:
         sender.send(test_email1)
-    assert m.call_args_list == [mocker.call("mx.example.com", 465)]
+    assert m.call_args_list == [
+        mocker.call("mx.example.com", 465, context=sender.get_ssl_context())
+    ]
     assert m.return_value.method_calls == [
         mocker.call.send_message(test_email1),
         mocker.call.quit(),
@@ -274,9 +322,12 @@ def test_smtp_send_ssl_auth(
             "ssl": True,
         }
     )
+    assert isinstance(sender, SMTPSender)
     with sender:
         sender.send(test_email1)
-    assert m.call_args_list == [mocker.call("mx.example.com", 465)]
+    assert m.call_args_list == [
+        mocker.call("mx.example.com", 465, context=sender.get_ssl_context())
+    ]
     assert m.return_value.method_calls == [
         mocker.call.login("luser", "54321"),
         mocker.call.send_message(test_email1),
@@ -308,11 +359,12 @@ def test_smtp_send_starttls_no_auth(
     caplog.set_level(logging.DEBUG, logger="outgoing")
     m = mocker.patch("smtplib.SMTP", autospec=True)
     sender = from_dict({"method": "smtp", "host": "mx.example.com", "ssl": "starttls"})
+    assert isinstance(sender, SMTPSender)
     with sender:
         sender.send(test_email1)
     assert m.call_args_list == [mocker.call("mx.example.com", 587)]
     assert m.return_value.method_calls == [
-        mocker.call.starttls(),
+        mocker.call.starttls(context=sender.get_ssl_context()),
         mocker.call.send_message(test_email1),
         mocker.call.quit(),
     ]
@@ -350,11 +402,12 @@ def test_smtp_send_starttls_auth(
             "ssl": "starttls",
         }
     )
+    assert isinstance(sender, SMTPSender)
     with sender:
         sender.send(test_email1)
     assert m.call_args_list == [mocker.call("mx.example.com", 587)]
     assert m.return_value.method_calls == [
-        mocker.call.starttls(),
+        mocker.call.starttls(context=sender.get_ssl_context()),
         mocker.call.login("luser", "54321"),
         mocker.call.send_message(test_email1),
         mocker.call.quit(),
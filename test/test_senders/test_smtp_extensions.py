@@ -0,0 +1,347 @@
+from __future__ import annotations
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+import smtplib
+import socket
+import threading
+import time
+from typing import Any
+from mailbits import email2dict
+import pytest
+from outgoing import from_dict
+from outgoing.senders.smtp import SMTPSender
+
+
+@dataclass
+class Received:
+    mail_command: str
+    to_addrs: list[str]
+    data: bytes
+
+    @property
+    def from_addr(self) -> str:
+        return self.mail_command[10:].split()[0].strip("<>")
+
+
+@dataclass
+class LaggyServer:
+    """
+    A minimal SMTP server that waits ``latency`` seconds after each time it
+    receives data from a client before acting on it, in order to simulate a
+    server on the far end of a slow network.  Recipients containing "refuse"
+    are refused.
+    """
+
+    latency: float = 0
+    extensions: list[str] = field(default_factory=lambda: ["PIPELINING"])
+    #: The number of separate times the server received data from a client
+    reads: int = 0
+    #: All command lines received, in order
+    commands: list[str] = field(default_factory=list)
+    messages: list[Received] = field(default_factory=list)
+    sock: socket.socket = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    @property
+    def port(self) -> int:
+        port = self.sock.getsockname()[1]
+        assert isinstance(port, int)
+        return port
+
+    def serve(self) -> None:
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn: socket.socket) -> None:
+        with conn:
+            conn.sendall(b"220 localhost ESMTP\r\n")
+            buf = b""
+            envelope: Received | None = None
+            in_data = False
+            bdat_remaining = 0
+            bdat_last = False
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    return
+                self.reads += 1
+                time.sleep(self.latency)
+                buf += chunk
+                replies: list[bytes] = []
+                while True:
+                    if bdat_remaining:
+                        if not buf:
+                            break
+                        chunk, buf = buf[:bdat_remaining], buf[bdat_remaining:]
+                        bdat_remaining -= len(chunk)
+                        if envelope is not None:
+                            envelope.data += chunk
+                        if bdat_remaining:
+                            break
+                        if envelope is None or not envelope.to_addrs:
+                            replies.append(b"503 No valid recipients")
+                        else:
+                            replies.append(b"250 OK")
+                            if bdat_last:
+                                self.messages.append(envelope)
+                                envelope = None
+                        continue
+                    if in_data:
+                        end = buf.find(b"\r\n.\r\n")
+                        if end == -1:
+                            break
+                        assert envelope is not None
+                        data = buf[: end + 2].replace(b"\r\n..", b"\r\n.")
+                        if data.startswith(b".."):
+                            data = data[1:]
+                        buf = buf[end + 5 :]
+                        in_data = False
+                        if envelope.to_addrs:
+                            envelope.data = data
+                            self.messages.append(envelope)
+                        envelope = None
+                        replies.append(b"250 OK")
+                        continue
+                    line, sep, rest = buf.partition(b"\r\n")
+                    if not sep:
+                        break
+                    buf = rest
+                    cmd = line.decode("utf-8")
+                    self.commands.append(cmd)
+                    verb = cmd.split(" ", 1)[0].upper()
+                    if verb == "EHLO":
+                        replies.append(b"250-localhost")
+                        for ext in self.extensions:
+                            replies.append(f"250-{ext}".encode("us-ascii"))
+                        replies.append(b"250 SIZE 100000000")
+                    elif verb == "MAIL":
+                        envelope = Received(cmd, [], b"")
+                        replies.append(b"250 OK")
+                    elif verb == "BDAT":
+                        _, size, *last = cmd.split()
+                        bdat_remaining = int(size)
+                        bdat_last = last == ["LAST"]
+                        if not bdat_remaining:
+                            replies.append(b"250 OK")
+                            if bdat_last and envelope is not None:
+                                self.messages.append(envelope)
+                                envelope = None
+                    elif verb == "RCPT":
+                        addr = cmd[8:].strip("<>")
+                        if envelope is None:
+                            replies.append(b"503 Need MAIL first")
+                        elif "refuse" in addr:
+                            replies.append(b"550 No such user")
+                        else:
+                            envelope.to_addrs.append(addr)
+                            replies.append(b"250 OK")
+                    elif verb == "DATA":
+                        if envelope is None or not envelope.to_addrs:
+                            replies.append(b"554 No valid recipients")
+                            envelope = None
+                        else:
+                            replies.append(b"354 Go ahead")
+                            in_data = True
+                    elif verb in ("RSET", "NOOP"):
+                        envelope = None
+                        replies.append(b"250 OK")
+                    elif verb == "QUIT":
+                        conn.sendall(b"221 Bye\r\n")
+                        return
+                    else:
+                        replies.append(b"502 Unknown command")
+                if replies:
+                    conn.sendall(b"".join(r + b"\r\n" for r in replies))
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+@pytest.fixture()
+def laggy() -> Iterator[LaggyServer]:
+    server = LaggyServer()
+    yield server
+    server.close()
+
+
+def make_sender(server: LaggyServer, **kwargs: Any) -> SMTPSender:
+    sender = from_dict(
+        {
+            "method": "smtp",
+            "host": "127.0.0.1",
+            "port": server.port,
+            "pipelining": True,
+            **kwargs,
+        }
+    )
+    assert isinstance(sender, SMTPSender)
+    return sender
+
+
+def make_email(recipients: list[str]) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = "Meeting"
+    msg["From"] = "me@here.qq"
+    msg["To"] = ", ".join(recipients)
+    msg.set_content("Meet me at the usual place.\n.\n..\nThat is all.\n")
+    return msg
+
+
+def assert_received(received: Received, msg: EmailMessage, to_addrs: list[str]) -> None:
+    assert received.from_addr == "me@here.qq"
+    assert received.to_addrs == to_addrs
+    data = received.data.replace(b"\r\n", b"\n")
+    assert email2dict(message_from_bytes(data, policy=policy.default)) == (
+        email2dict(msg)
+    )
+
+
+def test_smtp_pipelining(laggy: LaggyServer) -> None:
+    recipients = [f"user{i}@there.qq" for i in range(5)]
+    msg = make_email(recipients)
+    with make_sender(laggy) as sender:
+        sender.send(msg)
+        reads = laggy.reads
+        sender.send(msg)
+        # One read for MAIL/RCPT/DATA, one for the message body
+        assert laggy.reads - reads == 2
+    assert len(laggy.messages) == 2
+    for received in laggy.messages:
+        assert_received(received, msg, recipients)
+
+
+def test_smtp_pipelining_some_refused(laggy: LaggyServer) -> None:
+    msg = make_email(["one@there.qq", "refuse@there.qq", "two@there.qq"])
+    with make_sender(laggy) as sender:
+        sender.send(msg)
+        sender.send(msg)
+    assert len(laggy.messages) == 2
+    for received in laggy.messages:
+        assert_received(received, msg, ["one@there.qq", "two@there.qq"])
+
+
+def test_smtp_pipelining_all_refused(laggy: LaggyServer) -> None:
+    msg = make_email(["refuse@there.qq", "refuse2@there.qq"])
+    with make_sender(laggy) as sender:
+        with pytest.raises(smtplib.SMTPRecipientsRefused) as excinfo:
+            sender.send(msg)
+        assert excinfo.value.recipients == {
+            "refuse@there.qq": (550, b"No such user"),
+            "refuse2@there.qq": (550, b"No such user"),
+        }
+        # The connection is still usable afterwards:
+        msg2 = make_email(["one@there.qq"])
+        sender.send(msg2)
+    assert len(laggy.messages) == 1
+    assert_received(laggy.messages[0], msg2, ["one@there.qq"])
+
+
+def test_smtp_pipelining_unsupported(laggy: LaggyServer) -> None:
+    laggy.extensions = []
+    msg = make_email(["one@there.qq", "two@there.qq"])
+    with make_sender(laggy) as sender:
+        sender.send(msg)
+        reads = laggy.reads
+        sender.send(msg)
+        # MAIL, RCPT, RCPT, DATA, and the body are sent separately
+        assert laggy.reads - reads == 5
+    assert len(laggy.messages) == 2
+    for received in laggy.messages:
+        assert_received(received, msg, ["one@there.qq", "two@there.qq"])
+
+
+def test_smtp_pipelining_round_trips(laggy: LaggyServer) -> None:
+    # With 30 recipients, sending without pipelining takes 32 round trips
+    # (MAIL, 30 RCPTs, and DATA) plus one for the body, while pipelining
+    # takes 2 in all no matter how many recipients there are.
+    msg = make_email([f"user{i}@there.qq" for i in range(30)])
+    round_trips = {}
+    for pipelining in (False, True):
+        with make_sender(laggy, pipelining=pipelining) as sender:
+            sender.send(msg)
+            reads = laggy.reads
+            sender.send(msg)
+            round_trips[pipelining] = laggy.reads - reads
+    assert round_trips == {False: 33, True: 2}
+
+
+def test_smtp_chunking(laggy: LaggyServer) -> None:
+    laggy.extensions = ["CHUNKING"]
+    msg = make_email(["one@there.qq", "two@there.qq"])
+    with make_sender(laggy, pipelining=False, chunking=True, chunk_size=64) as sender:
+        sender.send(msg)
+    assert len(laggy.messages) == 1
+    assert_received(laggy.messages[0], msg, ["one@there.qq", "two@there.qq"])
+    # No dot-stuffing:
+    assert b"\r\n.\r\n..\r\n" in laggy.messages[0].data
+    size = len(laggy.messages[0].data)
+    bdats = [c for c in laggy.commands if c.startswith("BDAT")]
+    full = (size - 1) // 64
+    assert bdats == ["BDAT 64"] * full + [f"BDAT {size - 64 * full} LAST"]
+    assert "DATA" not in laggy.commands
+
+
+def test_smtp_chunking_pipelining(laggy: LaggyServer) -> None:
+    laggy.extensions = ["PIPELINING", "CHUNKING"]
+    recipients = ["one@there.qq", "refuse@there.qq", "two@there.qq"]
+    msg = make_email(recipients)
+    with make_sender(laggy, chunking=True, chunk_size=100) as sender:
+        sender.send(msg)
+        sender.send(msg)
+    assert len(laggy.messages) == 2
+    for received in laggy.messages:
+        assert_received(received, msg, ["one@there.qq", "two@there.qq"])
+
+
+def test_smtp_chunking_unsupported(laggy: LaggyServer) -> None:
+    msg = make_email(["one@there.qq"])
+    with make_sender(laggy, chunking=True) as sender:
+        sender.send(msg)
+    assert len(laggy.messages) == 1
+    assert_received(laggy.messages[0], msg, ["one@there.qq"])
+    assert "DATA" in laggy.commands
+    assert not any(c.startswith("BDAT") for c in laggy.commands)
+
+
+def test_smtp_chunking_all_refused(laggy: LaggyServer) -> None:
+    laggy.extensions = ["CHUNKING"]
+    msg = make_email(["refuse@there.qq"])
+    with make_sender(laggy, pipelining=False, chunking=True) as sender:
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            sender.send(msg)
+    assert laggy.messages == []
+    assert not any(c.startswith("BDAT") for c in laggy.commands)
+
+
+@pytest.mark.parametrize("binarymime", [False, True])
+def test_smtp_chunking_binarymime(laggy: LaggyServer, binarymime: bool) -> None:
+    laggy.extensions = ["CHUNKING"]
+    if binarymime:
+        laggy.extensions.append("BINARYMIME")
+    blob = bytes(range(256)) * 4
+    msg = make_email(["one@there.qq"])
+    msg.add_attachment(
+        blob, maintype="application", subtype="octet-stream", cte="binary"
+    )
+    with make_sender(laggy, chunking=True, chunk_size=100) as sender:
+        sender.send(msg)
+    assert len(laggy.messages) == 1
+    received = laggy.messages[0]
+    if binarymime:
+        assert received.mail_command.endswith(" BODY=BINARYMIME")
+        parsed = message_from_bytes(received.data, policy=policy.default)
+        assert isinstance(parsed, EmailMessage)
+        (attachment,) = parsed.iter_attachments()
+        assert attachment.get_content() == blob
+    else:
+        assert "BODY=" not in received.mail_command
+        assert blob not in received.data
@@ -0,0 +1,186 @@
+from __future__ import annotations
+from email.message import EmailMessage
+import smtplib
+from typing import Any
+from unittest.mock import MagicMock
+import pytest
+from pytest_mock import MockerFixture
+from outgoing import from_dict
+from outgoing.errors import InvalidConfigError
+
+
+@pytest.fixture()
+def smtp_clients(mocker: MockerFixture) -> list[MagicMock]:
+    clients: list[MagicMock] = []
+    smtp_cls = smtplib.SMTP
+
+    def make_client(*_args: Any, **_kwargs: Any) -> MagicMock:
+        client = mocker.create_autospec(smtp_cls, instance=True)
+        client.noop.return_value = (250, b"OK")
+        clients.append(client)
+        return client
+
+    mocker.patch("smtplib.SMTP", side_effect=make_client)
+    return clients
+
+
+@pytest.fixture()
+def clock(mocker: MockerFixture) -> MagicMock:
+    m = mocker.patch("outgoing.senders.smtp.time")
+    m.monotonic.return_value = 1000.0
+    return m
+
+
+def test_smtp_keepalive_invalid() -> None:
+    with pytest.raises(InvalidConfigError):
+        from_dict({"method": "smtp", "host": "mx.example.com", "keepalive": 0})
+
+
+def test_smtp_keepalive_probe(
+    clock: MagicMock,
+    mocker: MockerFixture,
+    smtp_clients: list[MagicMock],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+) -> None:
+    sender = from_dict(
+        {"method": "smtp", "host": "mx.example.com", "keepalive": 30}
+    )
+    with sender:
+        clock.monotonic.return_value = 1010.0
+        sender.send(test_email1)
+        clock.monotonic.return_value = 1050.0
+        sender.send(test_email2)
+    assert len(smtp_clients) == 1
+    assert smtp_clients[0].method_calls == [
+        mocker.call.send_message(test_email1),
+        mocker.call.noop(),
+        mocker.call.send_message(test_email2),
+        mocker.call.quit(),
+    ]
+
+
+def test_smtp_keepalive_dead_on_probe(
+    clock: MagicMock,
+    mocker: MockerFixture,
+    smtp_clients: list[MagicMock],
+    test_email1: EmailMessage,
+) -> None:
+    sender = from_dict(
+        {
+            "method": "smtp",
+            "host": "mx.example.com",
+            "keepalive": 30,
+            "username": "luser",
+            "password": "hunter2",
+        }
+    )
+    with sender:
+        smtp_clients[0].noop.side_effect = smtplib.SMTPServerDisconnected()
+        clock.monotonic.return_value = 2000.0
+        sender.send(test_email1)
+    assert len(smtp_clients) == 2
+    assert smtp_clients[0].method_calls == [
+        mocker.call.login("luser", "hunter2"),
+        mocker.call.noop(),
+        mocker.call.close(),
+    ]
+    assert smtp_clients[1].method_calls == [
+        mocker.call.login("luser", "hunter2"),
+        mocker.call.send_message(test_email1),
+        mocker.call.quit(),
+    ]
+
+
+@pytest.mark.usefixtures("clock")
+def test_smtp_keepalive_retry(
+    mocker: MockerFixture,
+    smtp_clients: list[MagicMock],
+    test_email1: EmailMessage,
+) -> None:
+    sender = from_dict(
+        {"method": "smtp", "host": "mx.example.com", "keepalive": 30}
+    )
+    with sender:
+        smtp_clients[0].send_message.side_effect = smtplib.SMTPServerDisconnected()
+        sender.send(test_email1)
+    assert len(smtp_clients) == 2
+    assert smtp_clients[0].method_calls == [
+        mocker.call.send_message(test_email1),
+        mocker.call.close(),
+    ]
+    assert smtp_clients[1].method_calls == [
+        mocker.call.send_message(test_email1),
+        mocker.call.quit(),
+    ]
+
+
+@pytest.mark.usefixtures("clock")
+def test_smtp_keepalive_retry_once(
+    mocker: MockerFixture,
+    test_email1: EmailMessage,
+) -> None:
+    m = mocker.patch("smtplib.SMTP", autospec=True)
+    m.return_value.send_message.side_effect = smtplib.SMTPServerDisconnected()
+    m.return_value.quit.side_effect = smtplib.SMTPServerDisconnected()
+    sender = from_dict(
+        {"method": "smtp", "host": "mx.example.com", "keepalive": 30}
+    )
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        with sender:
+            sender.send(test_email1)
+    assert m.call_count == 2
+    assert m.return_value.send_message.call_count == 2
+
+
+def test_smtp_no_keepalive_no_retry(
+    smtp_clients: list[MagicMock], test_email1: EmailMessage
+) -> None:
+    sender = from_dict({"method": "smtp", "host": "mx.example.com"})
+    with sender:
+        smtp_clients[0].send_message.side_effect = smtplib.SMTPServerDisconnected()
+        with pytest.raises(smtplib.SMTPServerDisconnected):
+            sender.send(test_email1)
+    assert len(smtp_clients) == 1
+
+
+def test_smtp_close_disconnected(
+    mocker: MockerFixture, smtp_clients: list[MagicMock]
+) -> None:
+    sender = from_dict({"method": "smtp", "host": "mx.example.com"})
+    with sender:
+        smtp_clients[0].quit.side_effect = smtplib.SMTPServerDisconnected()
+    assert smtp_clients[0].method_calls == [mocker.call.quit(), mocker.call.close()]
+
+
+def test_smtp_pool_keepalive(
+    clock: MagicMock,
+    mocker: MockerFixture,
+    smtp_clients: list[MagicMock],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+) -> None:
+    sender = from_dict(
+        {"method": "smtp-pool", "host": "mx.example.com", "keepalive": 30}
+    )
+    with sender:
+        sender.send(test_email1)
+        clock.monotonic.return_value = 1010.0
+        sender.send(test_email1)
+        clock.monotonic.return_value = 1050.0
+        smtp_clients[0].send_message.side_effect = [
+            smtplib.SMTPServerDisconnected()
+        ]
+        sender.send(test_email2)
+    assert len(smtp_clients) == 2
+    assert smtp_clients[0].method_calls == [
+        mocker.call.send_message(test_email1),
+        mocker.call.send_message(test_email1),
+        mocker.call.noop(),
+        mocker.call.send_message(test_email2),
+        mocker.call.close(),
+    ]
+    assert smtp_clients[1].method_calls == [
+        mocker.call.send_message(test_email2),
+        mocker.call.quit(),
+    ]
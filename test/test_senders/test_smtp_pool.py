@@ -0,0 +1,263 @@
+from __future__ import annotations
+from email.message import EmailMessage
+from pathlib import Path
+import smtplib
+import threading
+from typing import Any
+from unittest.mock import MagicMock
+from pydantic import SecretStr
+import pytest
+from pytest_mock import MockerFixture
+from outgoing import Sender, from_dict, send_many
+from outgoing.errors import InvalidConfigError
+from outgoing.senders.smtp import SMTPPoolSender
+
+
+@pytest.fixture()
+def smtp_clients(mocker: MockerFixture) -> list[MagicMock]:
+    clients: list[MagicMock] = []
+    smtp_cls = smtplib.SMTP
+
+    def make_client(*_args: Any, **_kwargs: Any) -> MagicMock:
+        client = mocker.create_autospec(smtp_cls, instance=True)
+        client.noop.return_value = (250, b"OK")
+        clients.append(client)
+        return client
+
+    mocker.patch("smtplib.SMTP", side_effect=make_client)
+    return clients
+
+
+def test_smtp_pool_construct(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("MY_PASSWORD", "hunter2")
+    sender = from_dict(
+        {
+            "method": "smtp-pool",
+            "host": "mx.example.com",
+            "ssl": "starttls",
+            "username": "me",
+            "password": {"env": "MY_PASSWORD"},
+            "pool_size": 2,
+        },
+        configpath=str(tmp_path / "foo.txt"),
+    )
+    assert isinstance(sender, Sender)
+    assert isinstance(sender, SMTPPoolSender)
+    assert sender.model_dump() == {
+        "configpath": tmp_path / "foo.txt",
+        "host": "mx.example.com",
+        "username": "me",
+        "password": SecretStr("hunter2"),
+        "port": 587,
+        "ssl": "starttls",
+        "netrc": False,
+        "ssl_verify": False,
+        "ssl_cafile": None,
+        "ssl_certfile": None,
+        "ssl_keyfile": None,
+        "ssl_ciphers": None,
+        "pipelining": False,
+        "chunking": False,
+        "chunk_size": 1048576,
+        "keepalive": None,
+        "pool_size": 2,
+        "idle_timeout": 60,
+    }
+
+
+@pytest.mark.parametrize("field,value", [("pool_size", 0), ("idle_timeout", 0)])
+def test_smtp_pool_construct_invalid(field: str, value: int) -> None:
+    with pytest.raises(InvalidConfigError):
+        from_dict({"method": "smtp-pool", "host": "mx.example.com", field: value})
+
+
+def test_smtp_pool_reuse(
+    mocker: MockerFixture,
+    smtp_clients: list[MagicMock],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+) -> None:
+    sender = from_dict(
+        {
+            "method": "smtp-pool",
+            "host": "mx.example.com",
+            "username": "luser",
+            "password": "54321",
+        }
+    )
+    sender.send(test_email1)
+    sender.send(test_email2)
+    assert len(smtp_clients) == 1
+    assert smtp_clients[0].method_calls == [
+        mocker.call.login("luser", "54321"),
+        mocker.call.send_message(test_email1),
+        mocker.call.noop(),
+        mocker.call.send_message(test_email2),
+    ]
+    with sender:
+        pass
+    assert smtp_clients[0].method_calls[-1] == mocker.call.quit()
+
+
+def test_smtp_pool_dead_connection(
+    mocker: MockerFixture,
+    smtp_clients: list[MagicMock],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+) -> None:
+    sender = from_dict({"method": "smtp-pool", "host": "mx.example.com"})
+    with sender:
+        sender.send(test_email1)
+        smtp_clients[0].noop.side_effect = smtplib.SMTPServerDisconnected()
+        sender.send(test_email2)
+    assert len(smtp_clients) == 2
+    assert smtp_clients[0].method_calls == [
+        mocker.call.send_message(test_email1),
+        mocker.call.noop(),
+        mocker.call.close(),
+    ]
+    assert smtp_clients[1].method_calls == [
+        mocker.call.send_message(test_email2),
+        mocker.call.quit(),
+    ]
+
+
+def test_smtp_pool_idle_eviction(
+    mocker: MockerFixture,
+    smtp_clients: list[MagicMock],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+) -> None:
+    m = mocker.patch("outgoing.senders.smtp.time")
+    m.monotonic.side_effect = [100.0, 200.0, 210.0]
+    sender = from_dict(
+        {"method": "smtp-pool", "host": "mx.example.com", "idle_timeout": 30}
+    )
+    sender.send(test_email1)
+    sender.send(test_email2)
+    assert len(smtp_clients) == 2
+    assert smtp_clients[0].method_calls == [
+        mocker.call.send_message(test_email1),
+        mocker.call.quit(),
+    ]
+    assert smtp_clients[1].method_calls == [mocker.call.send_message(test_email2)]
+
+
+def test_smtp_pool_disconnect_during_send(
+    mocker: MockerFixture,
+    smtp_clients: list[MagicMock],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+) -> None:
+    sender = from_dict({"method": "smtp-pool", "host": "mx.example.com"})
+    with sender:
+        sender.send(test_email1)
+        smtp_clients[0].send_message.side_effect = smtplib.SMTPServerDisconnected()
+        with pytest.raises(smtplib.SMTPServerDisconnected):
+            sender.send(test_email2)
+        sender.send(test_email2)
+    assert len(smtp_clients) == 2
+    assert smtp_clients[0].method_calls == [
+        mocker.call.send_message(test_email1),
+        mocker.call.noop(),
+        mocker.call.send_message(test_email2),
+        mocker.call.close(),
+    ]
+    assert smtp_clients[1].method_calls == [
+        mocker.call.send_message(test_email2),
+        mocker.call.quit(),
+    ]
+
+
+def test_smtp_pool_concurrent_sends(
+    mocker: MockerFixture, test_email1: EmailMessage
+) -> None:
+    # Each send blocks until two are in flight at once, which can only happen
+    # if they are made over separate connections.
+    barrier = threading.Barrier(2, timeout=5)
+    m = mocker.patch("smtplib.SMTP", autospec=True)
+    m.return_value.send_message.side_effect = lambda _msg: barrier.wait()
+    sender = from_dict(
+        {"method": "smtp-pool", "host": "mx.example.com", "pool_size": 2}
+    )
+    threads = [
+        threading.Thread(target=sender.send, args=(test_email1,)) for _ in range(2)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert m.call_count == 2
+    assert m.return_value.send_message.call_count == 2
+    assert not barrier.broken
+
+
+def test_smtp_pool_refused_keeps_connection(
+    mocker: MockerFixture,
+    smtp_clients: list[MagicMock],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+) -> None:
+    sender = from_dict({"method": "smtp-pool", "host": "mx.example.com"})
+    assert isinstance(sender, SMTPPoolSender)
+    with sender:
+        sender.send(test_email1)
+        assert len(sender._idle) == 1
+        refused = smtplib.SMTPRecipientsRefused({"bob@example.com": (550, b"No")})
+        smtp_clients[0].send_message.side_effect = [refused, None]
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            sender.send(test_email2)
+        assert len(sender._idle) == 1
+        sender.send(test_email2)
+    assert len(smtp_clients) == 1
+    assert smtp_clients[0].method_calls == [
+        mocker.call.send_message(test_email1),
+        mocker.call.noop(),
+        mocker.call.send_message(test_email2),
+        mocker.call.rset(),
+        mocker.call.noop(),
+        mocker.call.send_message(test_email2),
+        mocker.call.quit(),
+    ]
+
+
+def test_smtp_pool_refused_closed_connection(
+    mocker: MockerFixture, smtp_clients: list[MagicMock], test_email1: EmailMessage
+) -> None:
+    sender = from_dict(
+        {"method": "smtp-pool", "host": "mx.example.com", "pool_size": 1}
+    )
+    assert isinstance(sender, SMTPPoolSender)
+    with sender:
+        sender.warmup()
+        # `smtplib` closes the connection when the server replies with 421.
+        smtp_clients[0].sock = None
+        smtp_clients[0].send_message.side_effect = smtplib.SMTPDataError(
+            421, b"Shutting down"
+        )
+        with pytest.raises(smtplib.SMTPDataError):
+            sender.send(test_email1)
+        assert sender._idle == []
+    assert mocker.call.rset() not in smtp_clients[0].method_calls
+
+
+def test_smtp_pool_send_many_keeps_connections(
+    mocker: MockerFixture,
+    smtp_clients: list[MagicMock],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+) -> None:
+    sender = from_dict({"method": "smtp-pool", "host": "mx.example.com"})
+    assert isinstance(sender, SMTPPoolSender)
+    refused = smtplib.SMTPRecipientsRefused({"bob@example.com": (550, b"No")})
+    results = send_many(sender, [test_email1, test_email2])
+    assert results == [None, None]
+    smtp_clients[0].send_message.side_effect = [refused, None]
+    results = send_many(sender, [test_email1, test_email2])
+    assert results[0] is refused
+    assert results[1] is None
+    assert len(smtp_clients) == 1
+    assert len(sender._idle) == 1
+    assert mocker.call.quit() not in smtp_clients[0].method_calls
+    sender.close()
+    assert smtp_clients[0].method_calls[-1] == mocker.call.quit()
@@ -0,0 +1,209 @@
+from __future__ import annotations
+import asyncio
+from email.message import EmailMessage
+import os
+from pathlib import Path
+import ssl
+from typing import Any
+import pytest
+from pytest_mock import MockerFixture
+from smtpdfix import AuthController
+from outgoing import from_dict, from_dict_async
+from outgoing.errors import InvalidConfigError
+from outgoing.senders.smtp import ResumingSSLContext, SMTPSender
+
+
+def test_smtp_ssl_context_default() -> None:
+    sender = from_dict({"method": "smtp", "host": "mx.example.com", "ssl": True})
+    assert isinstance(sender, SMTPSender)
+    ctx = sender.get_ssl_context()
+    assert isinstance(ctx, ResumingSSLContext)
+    assert ctx.verify_mode == ssl.CERT_NONE
+    assert not ctx.check_hostname
+    assert sender.get_ssl_context() is ctx
+
+
+def test_smtp_ssl_context_verify(mocker: MockerFixture, tmp_path: Path) -> None:
+    (tmp_path / "ca.pem").touch()
+    load = mocker.patch.object(ResumingSSLContext, "load_verify_locations")
+    set_ciphers = mocker.patch.object(ResumingSSLContext, "set_ciphers")
+    sender = from_dict(
+        {
+            "method": "smtp",
+            "host": "mx.example.com",
+            "ssl": "starttls",
+            "ssl_verify": True,
+            "ssl_cafile": "ca.pem",
+            "ssl_ciphers": "ECDHE+AESGCM",
+        },
+        configpath=tmp_path / "outgoing.toml",
+    )
+    assert isinstance(sender, SMTPSender)
+    ctx = sender.get_ssl_context()
+    assert ctx.verify_mode == ssl.CERT_REQUIRED
+    assert ctx.check_hostname
+    load.assert_called_once_with(cafile=tmp_path / "ca.pem")
+    set_ciphers.assert_called_once_with("ECDHE+AESGCM")
+
+
+def test_smtp_ssl_cafile_missing(tmp_path: Path) -> None:
+    with pytest.raises(InvalidConfigError):
+        from_dict(
+            {
+                "method": "smtp",
+                "host": "mx.example.com",
+                "ssl": True,
+                "ssl_verify": True,
+                "ssl_cafile": "nonexistent.pem",
+            },
+            configpath=tmp_path / "outgoing.toml",
+        )
+
+
+def test_smtp_ssl_cafile_without_verify(tmp_path: Path) -> None:
+    (tmp_path / "ca.pem").touch()
+    with pytest.raises(InvalidConfigError) as excinfo:
+        from_dict(
+            {
+                "method": "smtp",
+                "host": "mx.example.com",
+                "ssl": True,
+                "ssl_cafile": "ca.pem",
+            },
+            configpath=tmp_path / "outgoing.toml",
+        )
+    assert "ssl_cafile cannot be set unless ssl_verify is true" in str(excinfo.value)
+
+
+def test_resuming_ssl_context_injects_session(mocker: MockerFixture) -> None:
+    wrap = mocker.patch.object(ssl.SSLContext, "wrap_socket")
+    ctx = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    sock = mocker.sentinel.sock
+    session = mocker.sentinel.session
+    ctx.wrap_socket(sock, server_hostname="mx.example.com")
+    ctx.session = session
+    ctx.wrap_socket(sock, server_hostname="mx.example.com")
+    assert wrap.call_args_list == [
+        mocker.call(sock, server_hostname="mx.example.com", session=None),
+        mocker.call(sock, server_hostname="mx.example.com", session=session),
+    ]
+
+
+def test_smtp_context_reused(mocker: MockerFixture, test_email1: EmailMessage) -> None:
+    m = mocker.patch("smtplib.SMTP", autospec=True)
+    sender = from_dict(
+        {"method": "smtp-pool", "host": "mx.example.com", "ssl": "starttls"}
+    )
+    assert isinstance(sender, SMTPSender)
+    with sender:
+        m.return_value.send_message.side_effect = [ssl.SSLError(), None]
+        with pytest.raises(ssl.SSLError):
+            sender.send(test_email1)
+        sender.send(test_email1)
+    contexts = [
+        c.kwargs["context"]
+        for c in m.return_value.method_calls
+        if c == mocker.call.starttls(context=mocker.ANY)
+    ]
+    assert len(contexts) == 2
+    assert contexts[0] is contexts[1] is sender.get_ssl_context()
+
+
+@pytest.fixture()
+def tls_smtpd(mocker: MockerFixture, smtpd: AuthController) -> AuthController:
+    smtpd.config.use_starttls = True
+    # smtpdfix creates a new SSLContext for each connection by default, which
+    # prevents session resumption, so make it reuse one.
+    ctx = smtpd._get_ssl_context()
+    mocker.patch.object(smtpd, "_get_ssl_context", return_value=ctx)
+    return smtpd
+
+
+@pytest.fixture()
+def sessions_reused(mocker: MockerFixture) -> list[bool]:
+    reused: list[bool] = []
+    save_session = ResumingSSLContext.save_session
+
+    def spy(self: ResumingSSLContext, sslobj: Any) -> None:
+        reused.append(sslobj.session_reused)
+        save_session(self, sslobj)
+
+    mocker.patch.object(ResumingSSLContext, "save_session", spy)
+    return reused
+
+
+def test_smtp_fix_session_resumed(
+    tls_smtpd: AuthController,
+    sessions_reused: list[bool],
+    test_email1: EmailMessage,
+) -> None:
+    sender = from_dict(
+        {
+            "method": "smtp",
+            "host": tls_smtpd.hostname,
+            "port": tls_smtpd.port,
+            "ssl": "starttls",
+        }
+    )
+    sender.send(test_email1)
+    sender.send(test_email1)
+    assert len(tls_smtpd.messages) == 2
+    # Each connection saves its session after connecting and before quitting:
+    assert sessions_reused == [False, False, True, True]
+
+
+def test_smtp_fix_ssl_verify(
+    tls_smtpd: AuthController, test_email1: EmailMessage
+) -> None:
+    sender = from_dict(
+        {
+            "method": "smtp",
+            "host": tls_smtpd.hostname,
+            "port": tls_smtpd.port,
+            "ssl": "starttls",
+            "ssl_verify": True,
+            "ssl_cafile": os.environ["SMTPD_SSL_CERTIFICATE_FILE"],
+        }
+    )
+    sender.send(test_email1)
+    assert len(tls_smtpd.messages) == 1
+
+
+def test_smtp_fix_ssl_verify_fails(
+    tls_smtpd: AuthController, test_email1: EmailMessage
+) -> None:
+    sender = from_dict(
+        {
+            "method": "smtp",
+            "host": tls_smtpd.hostname,
+            "port": tls_smtpd.port,
+            "ssl": "starttls",
+            "ssl_verify": True,
+        }
+    )
+    with pytest.raises(ssl.SSLCertVerificationError):
+        sender.send(test_email1)
+    assert tls_smtpd.messages == []
+
+
+def test_async_smtp_fix_session_resumed(
+    tls_smtpd: AuthController,
+    sessions_reused: list[bool],
+    test_email1: EmailMessage,
+) -> None:
+    sender = from_dict_async(
+        {
+            "method": "smtp",
+            "host": tls_smtpd.hostname,
+            "port": tls_smtpd.port,
+            "ssl": "starttls",
+        }
+    )
+
+    async def main() -> None:
+        await sender.send(test_email1)
+        await sender.send(test_email1)
+
+    asyncio.run(main())
+    assert len(tls_smtpd.messages) == 2
+    assert sessions_reused == [False, False, True, True]
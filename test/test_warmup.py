@@ -0,0 +1,295 @@
+from __future__ import annotations
+import asyncio
+from email.message import EmailMessage
+import gc
+from mailbox import MH, Maildir
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+from unittest.mock import MagicMock
+import smtplib
+import pytest
+from pytest_mock import MockerFixture
+from smtpdfix import AuthController
+from outgoing import (
+    ThreadedAsyncSender,
+    from_config_file,
+    from_dict,
+    from_dict_async,
+    warmup,
+    warmup_async,
+)
+from outgoing.__main__ import main
+from outgoing.senders.async_smtp import AsyncSMTPPoolSender
+from outgoing.senders.smtp import SMTPPoolSender, SMTPSender
+
+
+class BareSender:
+    def __enter__(self) -> BareSender:
+        return self
+
+    def __exit__(
+        self,
+        _exc_type: type[BaseException] | None,
+        _exc_val: BaseException | None,
+        _exc_tb: TracebackType | None,
+    ) -> None:
+        pass
+
+    def send(self, msg: EmailMessage) -> Any:
+        pass
+
+
+@pytest.fixture()
+def smtp_clients(mocker: MockerFixture) -> list[MagicMock]:
+    clients: list[MagicMock] = []
+    smtp_cls = smtplib.SMTP
+
+    def make_client(*_args: Any, **_kwargs: Any) -> MagicMock:
+        client = mocker.create_autospec(smtp_cls, instance=True)
+        client.noop.return_value = (250, b"OK")
+        clients.append(client)
+        return client
+
+    mocker.patch("smtplib.SMTP", side_effect=make_client)
+    return clients
+
+
+def test_warmup_no_method() -> None:
+    warmup(BareSender())
+
+
+def test_warmup_null() -> None:
+    warmup(from_dict({"method": "null"}))
+
+
+def test_warmup_smtp(
+    mocker: MockerFixture,
+    smtp_clients: list[MagicMock],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+) -> None:
+    sender = from_dict(
+        {
+            "method": "smtp",
+            "host": "mx.example.com",
+            "username": "luser",
+            "password": "hunter2",
+        }
+    )
+    warmup(sender)
+    assert len(smtp_clients) == 1
+    assert smtp_clients[0].method_calls == [mocker.call.login("luser", "hunter2")]
+    warmup(sender)
+    assert len(smtp_clients) == 1
+    with sender:
+        sender.send(test_email1)
+        warmup(sender)
+        sender.send(test_email2)
+    assert len(smtp_clients) == 1
+    assert smtp_clients[0].method_calls == [
+        mocker.call.login("luser", "hunter2"),
+        mocker.call.send_message(test_email1),
+        mocker.call.send_message(test_email2),
+        mocker.call.quit(),
+    ]
+
+
+def test_warmup_smtp_send_outside_context(
+    mocker: MockerFixture,
+    smtp_clients: list[MagicMock],
+    test_email1: EmailMessage,
+    test_email2: EmailMessage,
+) -> None:
+    sender = from_dict({"method": "smtp", "host": "mx.example.com"})
+    warmup(sender)
+    sender.send(test_email1)
+    assert len(smtp_clients) == 1
+    sender.send(test_email2)
+    assert len(smtp_clients) == 2
+    assert smtp_clients[0].method_calls == [
+        mocker.call.send_message(test_email1),
+        mocker.call.quit(),
+    ]
+
+
+def test_warmup_smtp_close_unopened(
+    mocker: MockerFixture, smtp_clients: list[MagicMock]
+) -> None:
+    sender = from_dict({"method": "smtp", "host": "mx.example.com"})
+    assert isinstance(sender, SMTPSender)
+    warmup(sender)
+    assert len(smtp_clients) == 1
+    sender.close()
+    assert smtp_clients[0].method_calls == [mocker.call.quit()]
+    with pytest.raises(ValueError):
+        sender.close()
+
+
+def test_warmup_smtp_del_unopened(smtp_clients: list[MagicMock]) -> None:
+    sender = from_dict({"method": "smtp", "host": "mx.example.com"})
+    warmup(sender)
+    (client,) = smtp_clients
+    del sender
+    gc.collect()
+    client.close.assert_called_once_with()
+    client.quit.assert_not_called()
+
+
+def test_warmup_smtp_pool(
+    smtp_clients: list[MagicMock], test_email1: EmailMessage
+) -> None:
+    sender = from_dict(
+        {"method": "smtp-pool", "host": "mx.example.com", "pool_size": 3}
+    )
+    assert isinstance(sender, SMTPPoolSender)
+    with sender:
+        warmup(sender)
+        assert len(smtp_clients) == 3
+        assert len(sender._idle) == 3
+        sender.send(test_email1)
+        warmup(sender)
+    assert len(smtp_clients) == 3
+    assert sum(c.send_message.call_count for c in smtp_clients) == 1
+    for c in smtp_clients:
+        c.quit.assert_called_once_with()
+
+
+def test_warmup_smtp_pool_in_use(smtp_clients: list[MagicMock]) -> None:
+    sender = from_dict(
+        {"method": "smtp-pool", "host": "mx.example.com", "pool_size": 3}
+    )
+    assert isinstance(sender, SMTPPoolSender)
+    with sender:
+        # Simulate a send in progress on a connection checked out of the pool
+        client = sender._checkout()
+        warmup(sender)
+        assert len(smtp_clients) == 3
+        assert len(sender._idle) == 2
+        sender._checkin(client)
+        warmup(sender)
+        assert len(smtp_clients) == 3
+        assert len(sender._idle) == 3
+
+
+def test_warmup_maildir(tmp_path: Path) -> None:
+    sender = from_dict(
+        {"method": "maildir", "path": "inbox", "folder": "work"},
+        configpath=str(tmp_path / "foo.txt"),
+    )
+    warmup(sender)
+    for sub in ["new", "cur", "tmp"]:
+        assert (tmp_path / "inbox" / ".work" / sub).is_dir()
+    assert Maildir(tmp_path / "inbox").list_folders() == ["work"]
+
+
+def test_warmup_mh(tmp_path: Path) -> None:
+    sender = from_dict(
+        {"method": "mh", "path": "inbox", "folder": ["work", "important"]},
+        configpath=str(tmp_path / "foo.txt"),
+    )
+    warmup(sender)
+    assert MH(tmp_path / "inbox").get_folder("work").list_folders() == ["important"]
+
+
+def test_warmup_mbox(tmp_path: Path) -> None:
+    sender = from_dict(
+        {"method": "mbox", "path": "inbox"}, configpath=str(tmp_path / "foo.txt")
+    )
+    warmup(sender)
+    assert (tmp_path / "inbox").read_bytes() == b""
+
+
+def test_from_config_file_warm(tmp_path: Path) -> None:
+    cfg = tmp_path / "outgoing.toml"
+    cfg.write_text('[outgoing]\nmethod = "maildir"\npath = "inbox"\n')
+    from_config_file(cfg)
+    assert not (tmp_path / "inbox").exists()
+    from_config_file(cfg, warm=True)
+    assert (tmp_path / "inbox" / "new").is_dir()
+
+
+def test_main_warmup(
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    test_email1: EmailMessage,
+    tmp_path: Path,
+) -> None:
+    m = mocker.patch("outgoing.senders.null.NullSender", autospec=True)
+    monkeypatch.chdir(tmp_path)
+    Path("cfg.toml").write_text('[outgoing]\nmethod = "null"\n')
+    Path("msg.eml").write_bytes(bytes(test_email1))
+    assert main(["--config", "cfg.toml", "--warmup", "msg.eml"]) == 0
+    m.return_value.warmup.assert_called_once_with()
+    assert m.return_value.__enter__.return_value.send.call_count == 1
+
+
+def test_warmup_async_threaded(tmp_path: Path) -> None:
+    sender = from_dict_async(
+        {"method": "maildir", "path": "inbox"}, configpath=str(tmp_path / "foo.txt")
+    )
+    assert isinstance(sender, ThreadedAsyncSender)
+    asyncio.run(warmup_async(sender))
+    assert (tmp_path / "inbox" / "new").is_dir()
+
+
+def test_warmup_async_smtp(smtpd: AuthController, test_email1: EmailMessage) -> None:
+    sender = from_dict_async(
+        {"method": "smtp", "host": smtpd.hostname, "port": smtpd.port}
+    )
+
+    async def main() -> None:
+        await warmup_async(sender)
+        await sender.send(test_email1)
+
+    asyncio.run(main())
+    assert len(smtpd.messages) == 1
+
+
+def test_warmup_async_smtp_pool(
+    smtpd: AuthController, test_email1: EmailMessage
+) -> None:
+    sender = from_dict_async(
+        {
+            "method": "smtp-pool",
+            "host": smtpd.hostname,
+            "port": smtpd.port,
+            "pool_size": 2,
+        }
+    )
+    assert isinstance(sender, AsyncSMTPPoolSender)
+
+    async def main() -> None:
+        async with sender:
+            await warmup_async(sender)
+            assert len(sender._idle) == 2
+            await sender.send(test_email1)
+            assert len(sender._idle) == 2
+
+    asyncio.run(main())
+    assert len(smtpd.messages) == 1
+
+
+def test_warmup_async_smtp_pool_in_use(smtpd: AuthController) -> None:
+    sender = from_dict_async(
+        {
+            "method": "smtp-pool",
+            "host": smtpd.hostname,
+            "port": smtpd.port,
+            "pool_size": 2,
+        }
+    )
+    assert isinstance(sender, AsyncSMTPPoolSender)
+
+    async def main() -> None:
+        async with sender:
+            # Simulate a send in progress on a session checked out of the pool
+            async with sender._get_slots():
+                client = await sender._checkout()
+                await warmup_async(sender)
+                assert len(sender._idle) == 1
+                sender._idle.append((client, 0))
+            await warmup_async(sender)
+            assert len(sender._idle) == 2
+
+    asyncio.run(main())